@@ -0,0 +1,223 @@
+import time
+import argparse
+import sys
+import json
+from multiprocessing import freeze_support
+
+from decomposition import find_components, solve_components, summarize
+from heuristics import assignment_objective
+from loader import load_inputs
+from output import OUTPUT_FORMATS, encode_results
+from progress import ArgumentParser, ProgressReporter, peak_memory_mb, profile_path, profiled, write_line
+from scenarios import run_file
+from server import serve
+
+
+def process_file(file_path: str, courses_excel_path:str, excel_flag: bool, min_grade:float, preference_flag:bool, progress=None) -> tuple:
+    return load_inputs(file_path, courses_excel_path, excel_flag, min_grade, preference_flag, progress)
+
+
+def build_matrix(courses, candidates, preferences):
+    """Weight matrix with one row per class and one column per tutor, padded with a "no tutor" column per class"""
+    import numpy as np
+
+    course_index = {d: j for j, d in enumerate(courses)}
+    n_courses = len(courses)
+    n_candidates = len(candidates)
+
+    weights = np.full((n_courses, n_candidates + n_courses), -np.inf)
+
+    for i, a in enumerate(candidates):
+        for d, score in preferences[a].items():
+            weights[course_index[d], i] = score
+
+    # Deixar a disciplina sem monitor custa 1, como a variavel y_d do modelo inteiro
+    weights[np.arange(n_courses), n_candidates + np.arange(n_courses)] = -1.0
+
+    return weights
+
+
+def match(courses, candidates, preferences, progress=None):
+    """Optimal {Student ID: class} assignment of the weight matrix"""
+    # O scipy é importado só na hora de resolver para não pesar na inicialização
+    from scipy.optimize import linear_sum_assignment
+
+    if progress is not None:
+        progress.phase("build")
+    weights = build_matrix(courses, candidates, preferences)
+
+    if progress is not None:
+        progress.phase("solve")
+    rows, cols = linear_sum_assignment(weights, maximize=True)
+
+    if progress is not None:
+        progress.phase("postprocess", objective=float(weights[rows, cols].sum()))
+
+    assigned = {}
+    for j, i in zip(rows.tolist(), cols.tolist()):
+        if i < len(candidates):
+            assigned[candidates[i]] = courses[j]
+    return assigned
+
+
+def solve_component(component, cancel):
+    courses, candidates, preferences, _ = component
+    return list(match(courses, candidates, preferences).items()), None
+
+
+def run(courses, candidates, preferences, progress=None, components=None, workers=None, cancel=None):
+    # Com vários componentes, cada um tem a sua matriz, bem menor que a da instituição inteira
+    if components is not None and len(components) > 1:
+        if progress is not None:
+            progress.phase("decompose", **summarize(components))
+            progress.phase("solve")
+        results = solve_components(components, solve_component, workers, progress, cancel)
+        assigned = {a: d for pairs, _ in results for a, d in pairs}
+        if progress is not None:
+            progress.phase("postprocess", objective=assignment_objective(courses, preferences, list(assigned.items())))
+    else:
+        assigned = match(courses, candidates, preferences, progress)
+
+    result_rows = []
+
+    # Monitores alocados, na mesma ordem do modelo inteiro
+    alocacoes = [
+        (a, assigned[a], preferences.get(a, {}).get(assigned[a], {}), preferences.get(a, {}))
+        for a in candidates
+        if a in assigned
+    ]
+    for aloc in alocacoes:
+        result_rows.append(
+            {
+                "class": aloc[1],
+                "student": str(aloc[0]),
+                "grade": aloc[2],
+                "preference": aloc[3],
+            }
+        )
+
+    # Disciplinas sem monitores
+    allocated_courses = set(assigned.values())
+    disciplinas_sem_monitor = [d for d in courses if d not in allocated_courses]
+
+    for d in disciplinas_sem_monitor:
+        result_rows.append(
+            {
+                "class": d,
+                "student": "No tutor",
+                "grade": "No preference",
+                "preference": "No preference",
+            }
+        )
+    grades = [float(row["grade"]) for row in result_rows if row["grade"] != "No preference"]
+
+    metrics = {
+        "number_classes_allocated": len(alocacoes),
+        "total_classes": len(disciplinas_sem_monitor) + len(alocacoes),
+        "average_grade": sum(grades) / len(grades) if grades else None,
+    }
+    if components is not None and len(components) > 1:
+        metrics["components"] = summarize(components)
+
+    return metrics, result_rows
+
+
+def solve_request(inputs, params, progress, cancel, state):
+    """Entry point of the resident server mode"""
+    courses, candidates, preferences, _ = inputs
+    components = find_components(*inputs) if params.get("decompose", True) else None
+    # Os componentes costumam ser pequenos e rápidos: o pool só compensa quando pedido
+    return run(courses, candidates, preferences, progress, components, params.get("workers", 1), cancel)
+
+
+def parse_arguments(argv):
+    parser = ArgumentParser(description="Allocate tutors to classes with the Hungarian method.")
+    parser.add_argument("students_excel_path")
+    parser.add_argument("courses_excel_path")
+    parser.add_argument("min_grade", type=float)
+    parser.add_argument("preference_flag")
+    # Parâmetros do algoritmo genético que o aplicativo envia para todos os algoritmos
+    parser.add_argument("unused", nargs="*", help=argparse.SUPPRESS)
+    parser.add_argument(
+        "--no-decompose", action="store_true", help="Solve the whole matrix at once instead of one component at a time"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Solve independent components in a pool of N processes"
+    )
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=None,
+        help="Write JSON progress lines to stdout at most once every N seconds",
+    )
+    parser.add_argument(
+        "--profile", action="store_true", help="Write a cProfile dump (pstats) of the run next to the input tables"
+    )
+    parser.add_argument(
+        "--scenarios",
+        default=None,
+        help="JSON file with a list of scenarios (name, min_grade, preference_flag, params) to solve and compare",
+    )
+    parser.add_argument(
+        "--scenario-workers", type=int, default=None, help="Solve the scenarios in a pool of N processes (default: all CPUs)"
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=OUTPUT_FORMATS,
+        default="compact",
+        help="Tutors listed once and referenced by index (compact, columnar), or the previous row format (legacy)",
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    # Necessário para o pool de processos no executável do PyInstaller
+    freeze_support()
+
+    # Modo residente: lê requisições JSON do stdin até o aplicativo fechar o pipe
+    if sys.argv[1:2] == ["--serve"]:
+        serve(solve_request, "assignment", sys.argv[1:], deterministic=True)
+        sys.exit(0)
+
+    try:
+        start = time.time()
+
+        args = parse_arguments(sys.argv[1:])
+        students_excel_path = args.students_excel_path
+        courses_excel_path = args.courses_excel_path
+        min_grade = args.min_grade
+        preference_flag = bool(args.preference_flag)
+
+        excel_flag = True
+        if students_excel_path.endswith(".csv"):
+            excel_flag = False
+
+        profile = profile_path(students_excel_path, "assignment") if args.profile else None
+        progress = ProgressReporter(args.progress_interval)
+        progress.phase("load")
+        params = {"decompose": not args.no_decompose, "workers": args.workers}
+        with profiled(profile):
+            if args.scenarios is not None:
+                # Modo de cenários: as tabelas são lidas uma vez para todos os cenários do arquivo
+                data = run_file(solve_request, students_excel_path, courses_excel_path, excel_flag, args.scenarios, min_grade, preference_flag, params, args.scenario_workers, progress, args.output_format)
+                metrics = data
+            else:
+                inputs = process_file(students_excel_path, courses_excel_path, excel_flag, min_grade, preference_flag, progress)
+                metrics, result_rows = solve_request(inputs, params, progress, None, {})
+                data = {"metrics": metrics, **encode_results(result_rows, args.output_format)}
+        end = time.time()
+
+        metrics['execution_time'] = end - start
+        metrics['timings'] = progress.timings()
+        metrics['peak_memory_mb'] = peak_memory_mb()
+        if profile is not None:
+            metrics['profile'] = profile
+
+        result = {"success": True, "data": data}
+        write_line(result)
+        sys.exit(0)
+
+    except Exception as e:
+        result = {"success": False, "error": str(e)}
+        sys.stderr.write(json.dumps(result))
+        sys.exit(1)
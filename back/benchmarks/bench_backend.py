@@ -0,0 +1,46 @@
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from integer_programming import BACKENDS, SolverOptions, run
+from loader import build_inputs
+from progress import ProgressReporter
+from scenarios import objective
+from synthetic import make_instance, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the in-process HiGHS backend with CBC through PuLP, phase by phase, on the whole model."
+    )
+    parser.add_argument("--tutors", type=int, nargs="+", default=[1000, 3000, 10000])
+    args = parser.parse_args()
+
+    print(f"{'tutors':>7} {'backend':>8} {'build (s)':>10} {'solve (s)':>10} {'total (s)':>10} {'objective':>11}")
+    for n_tutors in args.tutors:
+        df, df_courses = make_instance(n_tutors, n_tutors // 4)
+        courses, candidates, preferences, _ = build_inputs(df.to_dict("list"), df_courses.to_dict("list"), 7.0, True)
+
+        objectives = []
+        for backend in BACKENDS:
+            # Sem intervalo o reporter só mede as fases, sem escrever eventos
+            progress = ProgressReporter()
+            total, (metrics, rows) = timed(run, courses, candidates, preferences, progress, SolverOptions(backend=backend))
+            if metrics["backend"] != backend:
+                raise Exception(f"{backend} fell back to {metrics['backend']}: {metrics.get('fallback')}")
+
+            timings = progress.timings()
+            objectives.append(objective(rows))
+            print(
+                f"{n_tutors:>7} {backend:>8} {timings.get('build', 0.0):>10.3f} {timings.get('solve', 0.0):>10.3f} "
+                f"{total:>10.3f} {objectives[-1]:>11.3f}"
+            )
+
+        if max(objectives) - min(objectives) > 1e-6:
+            raise Exception(f"Objectives of the backends differ: {objectives}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+from deap import base, creator, tools, algorithms
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from genetic import do_the_scheduled
+from loader import build_inputs
+from synthetic import make_instance
+
+
+def create_individual(d, da):
+    """List-based individual used by genetic.py before the integer encoding"""
+    i = [0] * len(d)
+    chosen = set()
+
+    if random.random() < 0.5:
+        d_random = d.copy()
+        random.shuffle(d_random)
+        keys = d_random
+    else:
+        keys = list(da)
+
+    for disc in keys:
+        a = list(set(da[disc]) - chosen)
+        if len(a) != 0:
+            selected = random.choice(a)
+            chosen.add(selected)
+            i[d.index(disc)] = selected
+        else:
+            i[d.index(disc)] = 0
+
+    return i
+
+
+def evaluate_individual(i, d, p):
+    rooms = 10 * sum(d[index] in p[value].keys() for index, value in enumerate(i) if value != 0)
+
+    chosen = [v for v in i if v != 0]
+    if len(set(chosen)) != len(chosen):
+        interests = 0.0
+    else:
+        interests = sum(p.get(value, {}).get(d[index], 0.0) for index, value in enumerate(i) if value != 0)
+
+    return (np.linalg.norm([rooms, interests]),)
+
+
+def do_the_scheduled_lists(courses, preferences, da, n_generations, population_size):
+    def mutate(ind):
+        if random.random() < 0.1:
+            random_course = random.choice(courses)
+            if da[random_course]:
+                ind[courses.index(random_course)] = random.choice(da[random_course])
+        return (ind,)
+
+    def selection_elitism(population, n_individuals):
+        elitism = int(0.2 * len(population))
+        return tools.selBest(population, elitism) + toolbox.population(n=n_individuals - elitism)
+
+    if not hasattr(creator, "FitnessMax"):
+        creator.create("FitnessMax", base.Fitness, weights=(1.0,))
+        creator.create("Individual", list, fitness=creator.FitnessMax)
+
+    toolbox = base.Toolbox()
+    toolbox.register("individual", tools.initIterate, creator.Individual, lambda: create_individual(courses, da))
+    toolbox.register("population", tools.initRepeat, list, toolbox.individual)
+    toolbox.register("evaluate", lambda ind: evaluate_individual(ind, courses, preferences))
+    toolbox.register("mate", tools.cxTwoPoint)
+    toolbox.register("mutate", mutate)
+    toolbox.register("select", selection_elitism)
+
+    pop = toolbox.population(n=population_size)
+    for ind in pop:
+        ind.fitness.values = toolbox.evaluate(ind)
+
+    pop, _ = algorithms.eaSimple(pop, toolbox, cxpb=0.7, mutpb=0.1, ngen=n_generations, verbose=False)
+    return tools.selBest(pop, 1)[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare generations per second of the list-based and encoded GA.")
+    parser.add_argument("--population", type=int, default=500)
+    parser.add_argument("--generations", type=int, default=10)
+    args = parser.parse_args()
+
+    sizes = [(100, 20), (300, 60), (1000, 200)]
+
+    print(f"{'tutors':>7} {'classes':>8} {'lists (gen/s)':>14} {'encoded (gen/s)':>16} {'speedup':>8}")
+    for n_tutors, n_courses in sizes:
+        df, df_courses = make_instance(n_tutors, n_courses)
+        courses, candidates, preferences, da = build_inputs(df, df_courses, 7.0, True)
+        da = dict(sorted(da.items(), key=lambda item: len(item[1])))
+
+        start = time.perf_counter()
+        do_the_scheduled_lists(courses, preferences, da, args.generations, args.population)
+        lists_rate = args.generations / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        do_the_scheduled(courses, preferences, da, args.generations, args.population)
+        encoded_rate = args.generations / (time.perf_counter() - start)
+
+        print(f"{len(candidates):>7} {len(courses):>8} {lists_rate:>14.2f} {encoded_rate:>16.2f} {encoded_rate / lists_rate:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
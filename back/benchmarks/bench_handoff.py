@@ -0,0 +1,42 @@
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loader import load_inputs, load_payload
+from synthetic import make_instance, timed
+
+
+def main():
+    sizes = [(100, 20), (1000, 200), (5000, 1000)]
+
+    print(f"{'tutors':>7} {'rows':>7} {'xlsx (s)':>9} {'json (s)':>9} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for n_tutors, n_courses in sizes:
+            df, df_courses = make_instance(n_tutors, n_courses)
+
+            # Caminho antigo: o front escreve dois XLSX e o sidecar lê os arquivos de volta
+            students_path = os.path.join(directory, "students.xlsx")
+            courses_path = os.path.join(directory, "courses.xlsx")
+            xlsx_time, expected = timed(
+                lambda: (
+                    df.to_excel(students_path, index=False),
+                    df_courses.to_excel(courses_path, index=False),
+                    load_inputs(students_path, courses_path, True, 7.0, True),
+                )[-1]
+            )
+
+            # Caminho novo: as tabelas chegam como colunas JSON na requisição
+            payload = {"students": df.to_dict("list"), "courses": df_courses.to_dict("list")}
+            json_time, result = timed(lambda: load_payload(json.loads(json.dumps(payload)), 7.0, True))
+
+            if result != expected:
+                raise Exception(f"JSON hand-off differs from the XLSX files for {n_tutors} tutors")
+
+            print(f"{n_tutors:>7} {len(df):>7} {xlsx_time:>9.3f} {json_time:>9.3f} {xlsx_time / json_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loader import build_inputs
+from synthetic import make_instance, timed
+
+
+def build_inputs_loops(df, df_courses, min_grade, preference_flag):
+    """Per-candidate/per-course filtering used by process_file before the shared loader"""
+    courses = []
+    for _, row in df_courses.iterrows():
+        course = row["Course Name"]
+        n = row["Number of Classes"]
+        for i in range(n):
+            courses.append(f"{course} - Class {i + 1}")
+
+    df = df[["Student ID", "Course Name", "Grade", "Preference"]]
+    df = df[df["Grade"] >= min_grade]
+
+    df_courses = df_courses.loc[df_courses.index.repeat(df_courses["Number of Classes"])].reset_index(drop=True)
+    df_courses["class_number"] = df_courses.groupby("Course Name").cumcount() + 1
+    df_courses = df_courses.drop(columns="Number of Classes")
+
+    df = pd.merge(df, df_courses, on="Course Name")
+    df["Course Name"] = df["Course Name"] + " - Class " + df["class_number"].astype(str)
+    df = df.drop(columns="class_number").drop_duplicates()
+
+    candidates = [i.item() for i in df["Student ID"].unique()]
+
+    preferences = {}
+    for candidate in candidates:
+        df_filtered = df[df["Student ID"] == candidate].copy()
+        preferences[int(candidate)] = {
+            row["Course Name"]: row["Grade"] * np.exp(-0.4 * (row["Preference"] - 1)) if preference_flag == True else row["Grade"] for _, row in df_filtered.iterrows()
+        }
+
+    da = {}
+    for course in courses:
+        df_filtered = df[df["Course Name"] == course].copy().sort_values("Student ID")
+        da[course] = [row["Student ID"] for _, row in df_filtered.iterrows() if row["Course Name"] == course]
+
+    return courses, candidates, preferences, da
+
+
+def main():
+    sizes = [(100, 20), (500, 80), (1000, 200), (2000, 400)]
+
+    print(f"{'tutors':>7} {'courses':>8} {'rows':>7} {'loops (s)':>10} {'loader (s)':>11} {'speedup':>8}")
+    for n_tutors, n_courses in sizes:
+        df, df_courses = make_instance(n_tutors, n_courses)
+
+        loops_time, expected = timed(build_inputs_loops, df, df_courses.copy(), 7.0, True)
+        loader_time, result = timed(build_inputs, df, df_courses.copy(), 7.0, True)
+
+        if result != expected:
+            raise Exception(f"Loader output differs from the reference for {n_tutors} tutors")
+
+        print(
+            f"{n_tutors:>7} {n_courses:>8} {len(df):>7} {loops_time:>10.3f} {loader_time:>11.4f} {loops_time / loader_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
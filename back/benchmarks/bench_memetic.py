@@ -0,0 +1,46 @@
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from genetic import run
+from integer_programming import run as run_milp
+from loader import build_inputs
+from scenarios import objective
+from synthetic import make_instance, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the GA alone, with a final local search polish and with memetic refinement of the elite."
+    )
+    parser.add_argument("--tutors", type=int, nargs="+", default=[1000, 3000])
+    parser.add_argument("--generations", type=int, default=50)
+    parser.add_argument("--population", type=int, default=300)
+    parser.add_argument("--memetic", type=int, nargs="+", default=[1, 5])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    modes = [("plain", {"memetic": 0, "polish": False}), ("polish", {"memetic": 0})]
+    modes += [(f"memetic {size}", {"memetic": size}) for size in args.memetic]
+
+    print(f"{'tutors':>7} {'mode':>11} {'time (s)':>9} {'objective':>10} {'gap':>8} {'moves':>8}")
+    for n_tutors in args.tutors:
+        df, df_courses = make_instance(n_tutors, n_tutors // 4)
+        courses, candidates, preferences, da = build_inputs(df.to_dict("list"), df_courses.to_dict("list"), 7.0, True)
+        optimum = objective(run_milp(courses, candidates, preferences)[1])
+
+        for name, settings in modes:
+            elapsed, (metrics, rows) = timed(
+                run, courses, preferences, da, args.generations, args.population, seed=args.seed, **settings
+            )
+            value = objective(rows)
+            print(
+                f"{n_tutors:>7} {name:>11} {elapsed:>9.3f} {value:>10.2f} "
+                f"{(optimum - value) / abs(optimum):>7.2%} {metrics['local_search_moves']:>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from pulp import LpProblem, LpMaximize, LpVariable, lpSum, LpBinary, value
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from integer_programming import assemble_model, build_model, get_solver
+from loader import build_inputs
+from symmetry import aggregate
+from synthetic import make_instance
+
+
+def build_dense_model(courses, candidates, preferences):
+    """Formulation used by integer_programming.run before the sparse model"""
+    course_candidates = {}
+    for candidate in candidates:
+        for course in courses:
+            if course in preferences[candidate].keys():
+                course_candidates[(candidate, course)] = 1
+            else:
+                course_candidates[(candidate, course)] = 0
+
+    modelo = LpProblem("Alocacao_de_Monitores", LpMaximize)
+
+    x_ad = LpVariable.dicts("x", [(a, d) for a in candidates for d in courses], cat=LpBinary)
+    y_d = LpVariable.dicts("y", courses, cat=LpBinary)
+
+    modelo += lpSum(
+        preferences[a][d] * x_ad[(a, d)] for a in candidates for d in courses if d in preferences[a].keys()
+    ) - lpSum(y_d[d] for d in courses)
+
+    for d in courses:
+        modelo += lpSum(x_ad[(a, d)] for a in candidates) + y_d[d] == 1, f"Restricao_disciplina_{d}"
+
+    for a in candidates:
+        modelo += lpSum(x_ad[(a, d)] for d in courses) <= 1, f"Restricao_monitor_{a}"
+
+    for a in candidates:
+        for d in courses:
+            modelo += x_ad[(a, d)] <= course_candidates[(a, d)], f"Restricao_disposicao_{a}_{d}"
+
+    return modelo
+
+
+def build_course_model(courses, candidates, preferences):
+    """One node per course with capacity Number of Classes, as integer_programming.run solves it"""
+    _, nodes, node_preferences, capacity = aggregate(courses, candidates, preferences)
+    return assemble_model(nodes, candidates, node_preferences, capacity=capacity).modelo
+
+
+def measure(build, courses, candidates, preferences, directory, name):
+    start = time.perf_counter()
+    modelo = build(courses, candidates, preferences)
+    if isinstance(modelo, tuple):
+        modelo = modelo[0]
+    build_time = time.perf_counter() - start
+
+    lp_path = os.path.join(directory, f"{name}.lp")
+    modelo.writeLP(lp_path)
+    lp_size = os.path.getsize(lp_path)
+
+    start = time.perf_counter()
+    modelo.solve(get_solver())
+    solve_time = time.perf_counter() - start
+
+    return {
+        "variables": modelo.numVariables(),
+        "constraints": modelo.numConstraints(),
+        "build": build_time,
+        "lp_mb": lp_size / 1e6,
+        "solve": solve_time,
+        "objective": value(modelo.objective),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the dense, sparse and course-level MILP formulations.")
+    parser.add_argument("--max-dense-pairs", type=int, default=200_000, help="Skip the dense model above this many candidate x class pairs")
+    args = parser.parse_args()
+
+    sizes = [(100, 20), (300, 60), (600, 120), (1000, 200), (2000, 400)]
+
+    print(f"{'tutors':>7} {'classes':>8} {'model':>7} {'vars':>9} {'cons':>9} {'build (s)':>10} {'lp (MB)':>8} {'solve (s)':>10} {'objective':>11}")
+    with tempfile.TemporaryDirectory() as directory:
+        for n_tutors, n_courses in sizes:
+            df, df_courses = make_instance(n_tutors, n_courses)
+            courses, candidates, preferences, _ = build_inputs(df, df_courses, 7.0, True)
+
+            models = [("sparse", build_model), ("course", build_course_model)]
+            if len(candidates) * len(courses) <= args.max_dense_pairs:
+                models.insert(0, ("dense", build_dense_model))
+
+            objectives = []
+            for name, build in models:
+                row = measure(build, courses, candidates, preferences, directory, name)
+                objectives.append(row["objective"])
+                print(
+                    f"{len(candidates):>7} {len(courses):>8} {name:>7} {row['variables']:>9} {row['constraints']:>9} "
+                    f"{row['build']:>10.3f} {row['lp_mb']:>8.2f} {row['solve']:>10.3f} {row['objective']:>11.3f}"
+                )
+
+            if max(objectives) - min(objectives) > 1e-6:
+                raise Exception(f"Objectives of the formulations differ: {objectives}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import argparse
+import io
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from integer_programming import run
+from loader import build_inputs
+from output import OUTPUT_FORMATS, decode_results, encode_results
+from progress import write_line
+from synthetic import make_instance, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare size, write time and parse time of the result output formats.")
+    parser.add_argument("--tutors", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--sections", type=int, default=10, help="Maximum number of classes per course")
+    parser.add_argument("--density", type=int, default=10, help="Courses each tutor applies to")
+    args = parser.parse_args()
+
+    print(f"{'tutors':>7} {'format':>9} {'size (MB)':>10} {'write (s)':>10} {'parse (s)':>10}")
+    for n_tutors in args.tutors:
+        df, df_courses = make_instance(n_tutors, n_tutors // 4, courses_per_tutor=args.density, max_classes=args.sections)
+        courses, candidates, preferences, _ = build_inputs(df.to_dict("list"), df_courses.to_dict("list"), 7.0, True)
+        metrics, result_rows = run(courses, candidates, preferences)
+
+        for output_format in OUTPUT_FORMATS:
+            # Escrita como a do sidecar: codificação mais a linha JSON em pedaços
+            def write(stream):
+                message = {"success": True, "data": {"metrics": metrics, **encode_results(result_rows, output_format)}}
+                write_line(message, stream)
+                return message
+
+            stream = io.StringIO()
+            write_time, message = timed(write, stream)
+            text = stream.getvalue()
+            # O aplicativo faz o parse da linha; a decodificação para linhas roda na interface
+            parse_time, parsed = timed(json.loads, text)
+            if decode_results(parsed["data"]) != json.loads(json.dumps(decode_results(message["data"]))):
+                raise Exception(f"{output_format} output does not decode to the same rows")
+
+            print(f"{n_tutors:>7} {output_format:>9} {len(text) / 2**20:>10.2f} {write_time:>10.3f} {parse_time:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BACK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACK_DIR)
+
+from synthetic import make_instance
+
+
+def run(command):
+    start = time.perf_counter()
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return time.perf_counter() - start, json.loads(output.splitlines()[-1])["data"]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare one sidecar run per scenario, reparsing the spreadsheets each time, with one --scenarios run."
+    )
+    parser.add_argument("--tutors", type=int, default=3000)
+    parser.add_argument("--min-grades", type=float, nargs="+", default=[6.0, 7.0, 8.0])
+    parser.add_argument("--algorithms", nargs="+", default=["integer_programming", "assignment"])
+    parser.add_argument("--workers", type=int, default=None, help="Scenario pool size (default: all CPUs)")
+    args = parser.parse_args()
+
+    scenarios = [
+        {"min_grade": min_grade, "preference_flag": preference_flag}
+        for min_grade in args.min_grades
+        for preference_flag in (True, False)
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        df, df_courses = make_instance(args.tutors, args.tutors // 4)
+        students_path = os.path.join(directory, "students.xlsx")
+        courses_path = os.path.join(directory, "courses.xlsx")
+        scenarios_path = os.path.join(directory, "scenarios.json")
+        df.to_excel(students_path, index=False)
+        df_courses.to_excel(courses_path, index=False)
+        with open(scenarios_path, "w") as file:
+            json.dump(scenarios, file)
+
+        print(f"{len(scenarios)} scenarios, {args.tutors} tutors")
+        print(f"{'algorithm':>20} {'separate (s)':>13} {'scenarios (s)':>14} {'speedup':>8}")
+        for algorithm in args.algorithms:
+            script = [sys.executable, os.path.join(BACK_DIR, f"{algorithm}.py"), students_path, courses_path]
+
+            separate_time, separate = 0.0, []
+            for scenario in scenarios:
+                # O preference_flag da linha de comando é lido como texto: vazio desliga
+                flag = "1" if scenario["preference_flag"] else ""
+                elapsed, data = run([*script, str(scenario["min_grade"]), flag])
+                separate_time += elapsed
+                separate.append(data["metrics"]["number_classes_allocated"])
+
+            extra = [] if args.workers is None else ["--scenario-workers", str(args.workers)]
+            batch_time, data = run([*script, "7", "1", "--scenarios", scenarios_path, *extra])
+            batched = [row["number_classes_allocated"] for row in data["table"]]
+            if algorithm != "genetic" and batched != separate:
+                raise Exception(f"{algorithm} scenario results differ from separate runs")
+
+            print(f"{algorithm:>20} {separate_time:>13.3f} {batch_time:>14.3f} {separate_time / batch_time:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
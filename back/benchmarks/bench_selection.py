@@ -0,0 +1,51 @@
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from genetic import FITNESS_CACHE_SIZE, SELECTIONS, run
+from loader import build_inputs
+from scenarios import objective
+from synthetic import make_instance, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the GA selection schemes, with and without the fitness cache, without local search."
+    )
+    parser.add_argument("--tutors", type=int, nargs="+", default=[1000, 3000])
+    parser.add_argument("--generations", type=int, default=100)
+    parser.add_argument("--population", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'tutors':>7} {'selection':>10} {'cache':>6} {'time (s)':>9} {'objective':>10} {'evals':>8} {'hit rate':>9} {'evals/s':>9}")
+    for n_tutors in args.tutors:
+        df, df_courses = make_instance(n_tutors, n_tutors // 4)
+        courses, _, preferences, da = build_inputs(df.to_dict("list"), df_courses.to_dict("list"), 7.0, True)
+
+        for selection in SELECTIONS:
+            for cache_size in (0, FITNESS_CACHE_SIZE):
+                elapsed, (metrics, rows) = timed(
+                    run,
+                    courses,
+                    preferences,
+                    da,
+                    args.generations,
+                    args.population,
+                    seed=args.seed,
+                    memetic=0,
+                    polish=False,
+                    selection=selection,
+                    cache_size=cache_size,
+                )
+                print(
+                    f"{n_tutors:>7} {selection:>10} {'on' if cache_size else 'off':>6} {elapsed:>9.3f} "
+                    f"{objective(rows):>10.2f} {metrics['evaluations']:>8} {metrics['cache_hit_rate']:>8.1%} "
+                    f"{metrics['evaluations_per_second']:>9.0f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import glob
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACK_DIR)
+
+from synthetic import make_instance
+
+SIDECARS = ["genetic", "integer_programming", "assignment"]
+
+
+def sidecar_command(name, executables):
+    """Python script by default, or the executable frozen by build_executables.py"""
+    if executables is None:
+        return [sys.executable, os.path.join(BACK_DIR, f"{name}.py")]
+
+    matches = sorted(glob.glob(os.path.join(executables, f"{name}-*")))
+    if not matches:
+        raise Exception(f"No executable for {name} in {executables}")
+    return [matches[0]]
+
+
+def time_to_first_byte(command):
+    """Seconds until the first byte on stdout and until the process exits"""
+    start = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    if not process.stdout.read(1):
+        # Sem nenhum byte o tempo medido seria só o do fim do processo
+        process.wait()
+        raise Exception(f"{' '.join(command)} wrote nothing to stdout (exit code {process.returncode})")
+    first_byte = time.perf_counter() - start
+    process.stdout.read()
+    process.wait()
+    return first_byte, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the time to first byte of the sidecars, which tracks import cost.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--executables", default=None, help="Directory with the frozen sidecars (front/src-tauri/binaries)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Entrada trivial: o primeiro byte é o evento de progresso "load", emitido logo após os imports
+        df, df_courses = make_instance(5, 2)
+        students_path = os.path.join(directory, "students.xlsx")
+        courses_path = os.path.join(directory, "courses.xlsx")
+        df.to_excel(students_path, index=False)
+        df_courses.to_excel(courses_path, index=False)
+        trivial_args = [students_path, courses_path, "7", "1", "2", "10", "--progress-interval", "0"]
+
+        print(f"{'sidecar':>20} {'--help (s)':>11} {'first byte (s)':>15} {'trivial run (s)':>16}")
+        for name in SIDECARS:
+            command = sidecar_command(name, args.executables)
+            help_times = [time_to_first_byte([*command, "--help"])[0] for _ in range(args.runs)]
+            trivial_times = [time_to_first_byte([*command, *trivial_args]) for _ in range(args.runs)]
+
+            print(
+                f"{name:>20} {statistics.median(help_times):>11.3f} "
+                f"{statistics.median(t[0] for t in trivial_times):>15.3f} "
+                f"{statistics.median(t[1] for t in trivial_times):>16.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from heuristics import assignment_objective, greedy_assignment
+from integer_programming import SolverOptions, run
+from loader import build_inputs
+from scenarios import objective
+from synthetic import make_instance, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare cold, greedy warm-started and time-limited MILP solves.")
+    parser.add_argument("--tutors", type=int, nargs="+", default=[1000, 3000])
+    parser.add_argument("--time-limit", type=float, default=1.0)
+    args = parser.parse_args()
+
+    # Só o CBC recebe a solução inicial
+    modes = [
+        ("cold", SolverOptions(warm_start=False, backend="cbc")),
+        ("greedy", SolverOptions(backend="cbc")),
+        (f"limit {args.time_limit:g}s", SolverOptions(time_limit=args.time_limit, backend="cbc")),
+    ]
+
+    print(f"{'tutors':>7} {'mode':>11} {'time (s)':>9} {'objective':>10} {'gap':>8} {'status':>9}")
+    for n_tutors in args.tutors:
+        df, df_courses = make_instance(n_tutors, n_tutors // 4)
+        courses, candidates, preferences, _ = build_inputs(df.to_dict("list"), df_courses.to_dict("list"), 7.0, True)
+
+        greedy_time, incumbent = timed(greedy_assignment, courses, candidates, preferences)
+        greedy = assignment_objective(courses, preferences, incumbent)
+
+        results = [(name, *timed(run, courses, candidates, preferences, options=options)) for name, options in modes]
+        optimum = objective(results[0][2][1])
+
+        print(f"{n_tutors:>7} {'heuristic':>11} {greedy_time:>9.3f} {greedy:>10.2f} {(optimum - greedy) / abs(optimum):>7.2%} {'-':>9}")
+        for name, elapsed, (metrics, rows) in results:
+            value = objective(rows)
+            print(
+                f"{n_tutors:>7} {name:>11} {elapsed:>9.3f} {value:>10.2f} "
+                f"{(optimum - value) / abs(optimum):>7.2%} {metrics['solver_status']:>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
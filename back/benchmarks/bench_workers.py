@@ -0,0 +1,40 @@
+import argparse
+import os
+import sys
+import time
+from multiprocessing import cpu_count
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from genetic import do_the_scheduled
+from loader import build_inputs
+from synthetic import make_instance
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare serial and pool-backed fitness evaluation in the GA.")
+    parser.add_argument("--generations", type=int, default=20)
+    parser.add_argument("--population", type=int, nargs="+", default=[500, 5000])
+    args = parser.parse_args()
+
+    workers = sorted({2, 4, cpu_count()} - {1})
+    sizes = [(300, 60), (1000, 200)]
+
+    print(f"{'tutors':>7} {'classes':>8} {'population':>11} {'workers':>8} {'time (s)':>9} {'speedup':>8}")
+    for n_tutors, n_courses in sizes:
+        df, df_courses = make_instance(n_tutors, n_courses)
+        courses, candidates, preferences, da = build_inputs(df, df_courses, 7.0, True)
+        da = dict(sorted(da.items(), key=lambda item: len(item[1])))
+
+        for population in args.population:
+            serial = None
+            for n_workers in [1, *workers]:
+                start = time.perf_counter()
+                do_the_scheduled(courses, preferences, da, args.generations, population, n_workers)
+                elapsed = time.perf_counter() - start
+                serial = serial or elapsed
+                print(f"{len(candidates):>7} {len(courses):>8} {population:>11} {n_workers:>8} {elapsed:>9.3f} {serial / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
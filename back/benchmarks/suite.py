@@ -0,0 +1,194 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACK_DIR)
+
+from output import decode_results
+from scenarios import objective
+from synthetic import GRADE_DISTRIBUTIONS, make_instance
+
+ALGORITHMS = ["integer_programming", "assignment", "genetic"]
+
+# Resultados exatos: o objetivo não pode mudar entre versões
+EXACT = {"integer_programming", "assignment"}
+
+
+def peak_rss_mb(usage):
+    # ru_maxrss vem em KB no Linux e em bytes no macOS
+    return usage.ru_maxrss / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def run_sidecar(algorithm, payload_path, extra_args):
+    """Runs one sidecar on the JSON tables as the application would, returning its output,
+    wall time and peak RSS (including CBC, which runs as its child)"""
+    command = [sys.executable, os.path.join(BACK_DIR, f"{algorithm}.py"), "-", "-", "7", "1", *extra_args]
+
+    with open(payload_path, "rb") as stdin, tempfile.TemporaryFile() as stdout, tempfile.TemporaryFile() as stderr:
+        start = time.perf_counter()
+        process = subprocess.Popen(command, stdin=stdin, stdout=stdout, stderr=stderr)
+        if hasattr(os, "wait4"):
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            rss = peak_rss_mb(usage)
+        else:
+            process.wait()
+            rss = None
+        wall = time.perf_counter() - start
+
+        stdout.seek(0)
+        stderr.seek(0)
+        lines = stdout.read().decode().splitlines()
+        if process.returncode != 0 or not lines:
+            raise Exception(f"{algorithm} failed: {stderr.read().decode()[-500:]}")
+
+    return json.loads(lines[-1]), wall, rss
+
+
+def run_suite(args):
+    runs = []
+    with tempfile.TemporaryDirectory() as directory:
+        for n_tutors in args.sizes:
+            instance = {
+                "tutors": n_tutors,
+                "courses": max(n_tutors // 4, 1),
+                "sections": args.sections,
+                "density": args.density,
+                "grades": args.grades,
+                "departments": args.departments,
+                "seed": args.seed,
+            }
+            df, df_courses = make_instance(
+                n_tutors,
+                instance["courses"],
+                courses_per_tutor=args.density,
+                max_classes=args.sections,
+                seed=args.seed,
+                departments=args.departments,
+                grades=args.grades,
+            )
+            payload_path = os.path.join(directory, f"instance-{n_tutors}.json")
+            with open(payload_path, "w") as file:
+                json.dump({"students": df.to_dict("list"), "courses": df_courses.to_dict("list")}, file)
+
+            instance_runs = {}
+            for algorithm in args.algorithms:
+                extra_args = []
+                if algorithm == "genetic":
+                    extra_args = [str(args.generations), str(args.population), "--seed", str(args.seed)]
+
+                walls, rss_values = [], []
+                for _ in range(args.repeat):
+                    result, wall, rss = run_sidecar(algorithm, payload_path, extra_args)
+                    walls.append(wall)
+                    rss_values.append(rss)
+
+                metrics = result["data"]["metrics"]
+                instance_runs[algorithm] = {
+                    "instance": instance,
+                    "algorithm": algorithm,
+                    "args": extra_args,
+                    "wall": statistics.median(walls),
+                    "peak_rss_mb": max(rss_values) if None not in rss_values else None,
+                    "objective": objective(decode_results(result["data"])),
+                    "allocated": metrics["number_classes_allocated"],
+                    "total_classes": metrics["total_classes"],
+                    "gap": None,
+                }
+
+            # Gap relativo ao ótimo do modelo inteiro, quando ele foi executado
+            if "integer_programming" in instance_runs:
+                optimum = instance_runs["integer_programming"]["objective"]
+                for run in instance_runs.values():
+                    gap = (optimum - run["objective"]) / abs(optimum) if optimum else 0.0
+                    # Diferenças de arredondamento entre os métodos exatos não são gap
+                    run["gap"] = 0.0 if abs(gap) < 1e-9 else gap
+
+            for run in instance_runs.values():
+                runs.append(run)
+                gap = "-" if run["gap"] is None else f"{run['gap']:.2%}"
+                rss = "-" if run["peak_rss_mb"] is None else f"{run['peak_rss_mb']:.0f}"
+                print(
+                    f"{n_tutors:>7} {run['algorithm']:>20} {run['wall']:>9.3f} {rss:>9} "
+                    f"{run['objective']:>11.2f} {gap:>8}",
+                    flush=True,
+                )
+
+    return runs
+
+
+def compare(runs, baseline, time_tolerance, objective_tolerance):
+    """Regressions of runs against a previous results file: slower, or a worse objective"""
+    def key(run):
+        return json.dumps([run["instance"], run["algorithm"], run["args"]], sort_keys=True)
+
+    previous = {key(run): run for run in baseline["runs"]}
+
+    regressions = []
+    for run in runs:
+        old = previous.get(key(run))
+        if old is None:
+            continue
+        name = f"{run['algorithm']} with {run['instance']['tutors']} tutors"
+        if run["wall"] > old["wall"] * (1 + time_tolerance):
+            regressions.append(f"{name}: {old['wall']:.3f} s -> {run['wall']:.3f} s")
+        # O GA com a mesma semente repete o resultado, então o objetivo também é comparado
+        if run["objective"] < old["objective"] - objective_tolerance * abs(old["objective"]):
+            regressions.append(f"{name}: objective {old['objective']:.2f} -> {run['objective']:.2f}")
+        if run["algorithm"] in EXACT and abs(run["objective"] - old["objective"]) > 1e-6:
+            regressions.append(f"{name}: exact objective changed {old['objective']:.6f} -> {run['objective']:.6f}")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run every sidecar on synthetic instances and record wall time, peak RSS, objective and gap to the MILP."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[300, 1000, 3000], help="Numbers of tutors")
+    parser.add_argument("--algorithms", nargs="+", choices=ALGORITHMS, default=ALGORITHMS)
+    parser.add_argument("--sections", type=int, default=3, help="Maximum number of classes per course")
+    parser.add_argument("--density", type=int, default=5, help="Courses each tutor applies to")
+    parser.add_argument("--grades", choices=GRADE_DISTRIBUTIONS, default="uniform")
+    parser.add_argument("--departments", type=int, default=1)
+    parser.add_argument("--generations", type=int, default=50)
+    parser.add_argument("--population", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the instances and of the GA")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per algorithm; the median wall time is kept")
+    parser.add_argument("--output", default=None, help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", default=None, help="Results file of a previous version to compare against")
+    parser.add_argument("--time-tolerance", type=float, default=0.25, help="Allowed relative increase of wall time")
+    parser.add_argument("--objective-tolerance", type=float, default=0.0, help="Allowed relative drop of the objective")
+    args = parser.parse_args()
+
+    print(f"{'tutors':>7} {'algorithm':>20} {'wall (s)':>9} {'rss (MB)':>9} {'objective':>11} {'gap':>8}")
+    runs = run_suite(args)
+
+    if args.output is not None:
+        results = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "runs": runs,
+        }
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline is not None:
+        with open(args.baseline) as file:
+            regressions = compare(runs, json.load(file), args.time_tolerance, args.objective_tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+
+GRADE_DISTRIBUTIONS = ["uniform", "normal", "skewed"]
+
+
+def draw_grade(rng, distribution: str) -> float:
+    if distribution == "uniform":
+        grade = rng.uniform(5.0, 10.0)
+    elif distribution == "normal":
+        grade = rng.normal(7.5, 1.2)
+    elif distribution == "skewed":
+        # Maioria das notas altas e uma cauda longa de notas baixas
+        grade = 10.0 * rng.beta(5.0, 1.5)
+    else:
+        raise Exception(f"Unknown grade distribution: {distribution}")
+    return round(float(min(max(grade, 0.0), 10.0)), 1)
+
+
+def make_instance(
+    n_tutors: int,
+    n_courses: int,
+    courses_per_tutor: int = 5,
+    max_classes: int = 3,
+    seed: int = 0,
+    departments: int = 1,
+    grades: str = "uniform",
+):
+    """Generate random tutors and courses tables with the same columns as the spreadsheets
+
+    courses_per_tutor sets the eligibility density and max_classes the number of sections per
+    course. With departments > 1 the courses are split into that many blocks and each tutor
+    only applies to courses of one block, like math tutors applying only to math courses.
+    grades is one of GRADE_DISTRIBUTIONS.
+    """
+    rng = np.random.default_rng(seed)
+
+    course_names = [f"C{index:05d} - Synthetic Course {index}" for index in range(n_courses)]
+    df_courses = pd.DataFrame(
+        {
+            "Course Name": course_names,
+            "Number of Classes": rng.integers(1, max_classes + 1, size=n_courses),
+        }
+    )
+
+    rows = []
+    blocks = np.array_split(np.arange(n_courses), departments)
+    for tutor in range(n_tutors):
+        block = blocks[tutor % departments]
+        k = min(courses_per_tutor, len(block))
+        chosen = block[rng.choice(len(block), size=k, replace=False)]
+        grade = draw_grade(rng, grades)
+        for preference, course in enumerate(chosen, start=1):
+            rows.append((10_000_000 + tutor, course_names[course], grade, preference))
+
+    df = pd.DataFrame(rows, columns=["Student ID", "Course Name", "Grade", "Preference"])
+    return df, df_courses
+
+
+def timed(function, *args, **kwargs):
+    """Wall time of function(*args, **kwargs) and its result"""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
@@ -7,6 +7,9 @@ import site
 import glob
 import argparse
 
+# Módulos que os sidecars não importam; excluídos para o PyInstaller não empacotá-los por dependências indiretas
+EXCLUDED_MODULES = ["pandas", "matplotlib", "tkinter", "IPython", "pytest"]
+
 
 def find_cbc_executable():
     """Find the CBC executable in the PuLP package"""
@@ -64,7 +67,7 @@ def compile_genetic(target_dir: str):
     print("Compiling genetic algorithm...")
     genetic_source = os.path.join(os.path.dirname(__file__), "genetic.py")
 
-    common_options = ["--onefile", "--clean"]
+    common_options = ["--onefile", "--clean", *(f"--exclude-module={module}" for module in EXCLUDED_MODULES)]
 
     subprocess.run(
         ["pyinstaller", *common_options, "--name", "genetic", genetic_source],
@@ -89,6 +92,36 @@ def compile_genetic(target_dir: str):
     print(f"Created genetic algorithm executable: {target}")
 
 
+def compile_assignment(target_dir: str):
+    """Compile the assignment algorithm"""
+    print("Compiling assignment algorithm...")
+    assignment_source = os.path.join(os.path.dirname(__file__), "assignment.py")
+
+    common_options = ["--onefile", "--clean", *(f"--exclude-module={module}" for module in EXCLUDED_MODULES)]
+
+    subprocess.run(
+        ["pyinstaller", *common_options, "--name", "assignment", assignment_source],
+        check=True,
+    )
+
+    # Move the executable with platform-specific name
+    if platform.system() == "Windows":
+        source = os.path.join(os.path.dirname(__file__), "dist", "assignment.exe")
+        target_name = "assignment-x86_64-pc-windows-msvc.exe"
+    else:
+        source = os.path.join(os.path.dirname(__file__), "dist", "assignment")
+        target_name = "assignment-x86_64-unknown-linux-gnu"
+
+    target = os.path.join(target_dir, target_name)
+    shutil.move(source, target)
+
+    # Set executable permissions on Linux
+    if platform.system() != "Windows":
+        os.chmod(target, 0o755)
+
+    print(f"Created assignment algorithm executable: {target}")
+
+
 def compile_integer_programming(target_dir: str):
     """Compile the integer programming algorithm"""
     print("Compiling integer programming algorithm...")
@@ -102,7 +135,7 @@ def compile_integer_programming(target_dir: str):
         print(f"Error: {str(e)}")
         raise
 
-    common_options = ["--onefile", "--clean"]
+    common_options = ["--onefile", "--clean", *(f"--exclude-module={module}" for module in EXCLUDED_MODULES)]
     integer_programming_options = [
         "--hidden-import=pulp",
         "--hidden-import=pulp.apis",
@@ -149,13 +182,58 @@ def compile_integer_programming(target_dir: str):
     print(f"Copied CBC solver to: {cbc_target}")
 
 
+def compile_portfolio(target_dir: str):
+    """Compile the portfolio, which runs the greedy heuristic, the genetic algorithm and integer programming"""
+    print("Compiling portfolio algorithm...")
+    portfolio_source = os.path.join(os.path.dirname(__file__), "portfolio.py")
+
+    # Find CBC solver, the fallback of the integer model
+    try:
+        cbc_path = find_cbc_executable()
+        print(f"Found CBC solver at: {cbc_path}")
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        raise
+
+    common_options = ["--onefile", "--clean", *(f"--exclude-module={module}" for module in EXCLUDED_MODULES)]
+    portfolio_options = [
+        "--hidden-import=pulp",
+        "--hidden-import=pulp.apis",
+        "--hidden-import=pulp.apis.coin_api",
+        "--collect-all=pulp",
+        f"--add-binary={cbc_path}{os.pathsep}.",
+    ]
+
+    subprocess.run(
+        ["pyinstaller", *common_options, *portfolio_options, "--name", "portfolio", portfolio_source],
+        check=True,
+    )
+
+    # Move the executable with platform-specific name
+    if platform.system() == "Windows":
+        source = os.path.join(os.path.dirname(__file__), "dist", "portfolio.exe")
+        target_name = "portfolio-x86_64-pc-windows-msvc.exe"
+    else:
+        source = os.path.join(os.path.dirname(__file__), "dist", "portfolio")
+        target_name = "portfolio-x86_64-unknown-linux-gnu"
+
+    target = os.path.join(target_dir, target_name)
+    shutil.move(source, target)
+
+    # Set executable permissions on Linux
+    if platform.system() != "Windows":
+        os.chmod(target, 0o755)
+
+    print(f"Created portfolio algorithm executable: {target}")
+
+
 def cleanup():
     """Clean up PyInstaller artifacts"""
     print("Cleaning up build artifacts...")
     build_dir = os.path.join(os.path.dirname(__file__), "build")
     dist_dir = os.path.join(os.path.dirname(__file__), "dist")
 
-    for spec_file in ["genetic.spec", "integer_programming.spec"]:
+    for spec_file in ["genetic.spec", "integer_programming.spec", "assignment.spec", "portfolio.spec"]:
         spec_path = os.path.join(os.path.dirname(__file__), spec_file)
         if os.path.exists(spec_path):
             os.remove(spec_path)
@@ -179,11 +257,17 @@ def main():
     parser.add_argument(
         "--integer_programming", action="store_true", help="Build only the integer_programming algorithm"
     )
+    parser.add_argument(
+        "--assignment", action="store_true", help="Build only the assignment algorithm"
+    )
+    parser.add_argument(
+        "--portfolio", action="store_true", help="Build only the portfolio algorithm"
+    )
     args = parser.parse_args()
 
     try:
-        # If no specific algorithm is selected, build both
-        build_both = not (args.genetic or args.integer_programming)
+        # If no specific algorithm is selected, build all of them
+        build_all = not (args.genetic or args.integer_programming or args.assignment or args.portfolio)
 
         print("Creating directories...")
         target_dir = create_directories()
@@ -192,12 +276,18 @@ def main():
         # Change to the script's directory for PyInstaller
         os.chdir(os.path.dirname(__file__))
 
-        if args.genetic or build_both:
+        if args.genetic or build_all:
             compile_genetic(target_dir)
 
-        if args.integer_programming or build_both:
+        if args.integer_programming or build_all:
             compile_integer_programming(target_dir)
 
+        if args.assignment or build_all:
+            compile_assignment(target_dir)
+
+        if args.portfolio or build_all:
+            compile_portfolio(target_dir)
+
         cleanup()
         print("Build completed successfully!")
 
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+
+# Mudanças no formato dos dados guardados devem incrementar a versão
+CACHE_VERSION = 1
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def inputs_key(request: dict) -> str:
+    """Hash of the table contents and of the parameters that change the preprocessed inputs"""
+    digest = hashlib.sha256(f"inputs-v{CACHE_VERSION}".encode())
+
+    if "students" in request:
+        digest.update(json.dumps([request["students"], request["courses"]], sort_keys=True).encode())
+    else:
+        for path in (request["students_path"], request["courses_path"]):
+            # A extensão decide se o arquivo é lido como CSV ou planilha
+            digest.update(os.path.splitext(path)[1].lower().encode())
+            with open(path, "rb") as file:
+                digest.update(hashlib.sha256(file.read()).digest())
+
+    digest.update(json.dumps([float(request["min_grade"]), bool(request["preference_flag"])]).encode())
+    return digest.hexdigest()
+
+
+def results_key(inputs_key: str, algorithm: str, params: dict) -> str:
+    digest = hashlib.sha256(f"results-v{CACHE_VERSION}".encode())
+    digest.update(json.dumps([inputs_key, algorithm, params], sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """Pickled values in a directory, evicted least recently used first when over max_bytes"""
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def get(self, key: str):
+        path = self.path(key)
+        try:
+            with open(path, "rb") as file:
+                value = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Arquivo corrompido ou de outra versão do Python: descarta
+            self.remove(path)
+            return None
+
+        # A data de modificação marca o uso mais recente para a remoção LRU
+        os.utime(path)
+        return value
+
+    def put(self, key: str, value):
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(descriptor, "wb") as file:
+            pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, self.path(key))
+        self.evict()
+
+    def remove(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def evict(self):
+        with self.lock:
+            entries = []
+            for name in os.listdir(self.directory):
+                if name.endswith(".pkl"):
+                    try:
+                        stat = os.stat(os.path.join(self.directory, name))
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, name))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, name in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self.remove(os.path.join(self.directory, name))
+                total -= size
@@ -0,0 +1,166 @@
+import multiprocessing
+import os
+
+# Lotes com menos pares (monitor, turma) que isso custam mais para iniciar o solver do que para resolver
+MIN_BATCH_PAIRS = 2000
+
+
+def find_components(courses, candidates, preferences, da):
+    """Connected components of the tutor-class eligibility graph
+
+    Each component has the same (courses, candidates, preferences, da) shape as the output
+    of build_inputs, keeping the original order, so the solvers run on it unchanged.
+    Classes without candidates form components of their own.
+    """
+    # Union-find com compressão de caminho; monitores entram como (Student ID,) para
+    # não coincidirem com o nome de uma turma
+    parent = {d: d for d in courses}
+    for a in candidates:
+        parent[(a,)] = (a,)
+
+    def find(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for a in candidates:
+        root = find((a,))
+        for d in preferences[a]:
+            other = find(d)
+            if other != root:
+                parent[other] = root
+
+    groups = {}
+    for d in courses:
+        groups.setdefault(find(d), ([], [], {}))[0].append(d)
+    for a in candidates:
+        groups[find((a,))][1].append(a)
+    for d, tutors in da.items():
+        groups[find(d)][2][d] = tutors
+
+    return [
+        (component_courses, component_candidates, {a: preferences[a] for a in component_candidates}, component_da)
+        for component_courses, component_candidates, component_da in groups.values()
+    ]
+
+
+def is_trivial(component):
+    """A single class or a single tutor: the best pair is optimal without a solver"""
+    courses, candidates, _, _ = component
+    return len(courses) <= 1 or len(candidates) <= 1
+
+
+def solve_trivial(component):
+    _, candidates, preferences, _ = component
+    pairs = [(a, d) for a in candidates for d in preferences[a]]
+    if not pairs:
+        return []
+
+    # Alocar qualquer par vale a nota mais 1 da turma que deixa de ficar sem monitor
+    return [max(pairs, key=lambda pair: preferences[pair[0]][pair[1]])]
+
+
+def summarize(components):
+    return {
+        "total": len(components),
+        "trivial": sum(1 for component in components if is_trivial(component)),
+        "largest": max((len(component[0]) for component in components), default=0),
+    }
+
+
+def count_pairs(component):
+    return sum(len(options) for options in component[2].values())
+
+
+def merge_components(components):
+    """Union of components, itself a valid input for the solvers"""
+    courses, candidates, preferences, da = [], [], {}, {}
+    for component_courses, component_candidates, component_preferences, component_da in components:
+        courses.extend(component_courses)
+        candidates.extend(component_candidates)
+        preferences.update(component_preferences)
+        da.update(component_da)
+    return courses, candidates, preferences, da
+
+
+def batch_components(components, workers=None, min_pairs=MIN_BATCH_PAIRS):
+    """Indices of the components grouped into at most `workers` batches of similar size
+
+    Longest processing time first: each component, largest first, joins the lightest batch.
+    """
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    sizes = [count_pairs(component) for component in components]
+    n_batches = max(1, min(workers, len(components), sum(sizes) // min_pairs))
+
+    batches = [[] for _ in range(n_batches)]
+    loads = [0] * n_batches
+    for i in sorted(range(len(components)), key=lambda i: -sizes[i]):
+        lightest = loads.index(min(loads))
+        batches[lightest].append(i)
+        loads[lightest] += sizes[i]
+
+    return [sorted(batch) for batch in batches if batch]
+
+
+def check_cancel(cancel):
+    """Raises the error of a cancelled request once the server has set its cancel event"""
+    if cancel is not None and cancel.is_set():
+        raise Exception("Command cancelled")
+
+
+def solve_indexed(arguments):
+    solve, index, component = arguments
+    return index, solve(component, None)
+
+
+def solve_components(components, solve, workers=None, progress=None, cancel=None):
+    """Results of solve(component, cancel) for each component, in the same order
+
+    Trivial components get (pairs, None) from solve_trivial. The others run in a pool of
+    processes when there is more than one of them and workers > 1; the pool workers do
+    not see cancel, which is checked here between results instead.
+    """
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    results = [(solve_trivial(c), None) if is_trivial(c) else None for c in components]
+
+    # Maiores primeiro, para que o último a terminar não seja um componente grande
+    pending = sorted((i for i, r in enumerate(results) if r is None), key=lambda i: -count_pairs(components[i]))
+
+    if workers <= 1 or len(pending) <= 1:
+        for solved, i in enumerate(pending, start=1):
+            check_cancel(cancel)
+            results[i] = solve(components[i], cancel)
+            if progress is not None:
+                progress.emit(force=True, phase="components", solved=solved, total=len(pending))
+        return results
+
+    pool = multiprocessing.Pool(min(workers, len(pending)))
+    try:
+        iterator = pool.imap_unordered(solve_indexed, [(solve, i, components[i]) for i in pending])
+        solved = 0
+        while solved < len(pending):
+            check_cancel(cancel)
+            try:
+                i, result = iterator.next(timeout=0.2)
+            except multiprocessing.TimeoutError:
+                continue
+            results[i] = result
+            solved += 1
+            if progress is not None:
+                progress.emit(force=True, phase="components", solved=solved, total=len(pending))
+        pool.close()
+    finally:
+        # Fecha sem esperar os componentes restantes em caso de erro ou cancelamento
+        pool.terminate()
+        pool.join()
+
+    return results
+
+
+def merge_pairs(candidates, courses, pair_lists):
+    """Pairs of all components in the order of the whole model: by tutor, then by class"""
+    tutor_position = {a: i for i, a in enumerate(candidates)}
+    course_position = {d: j for j, d in enumerate(courses)}
+    pairs = [pair for pairs in pair_lists for pair in pairs]
+    return sorted(pairs, key=lambda pair: (tutor_position[pair[0]], course_position[pair[1]]))
@@ -1,47 +1,115 @@
-import random
 import numpy as np
-import pandas as pd
-from deap import base, creator, tools, algorithms
-from multiprocessing import *
+from multiprocessing import Pool, Process, Queue, freeze_support
+import queue
 import sys
 import json
 import time
+from collections import OrderedDict
+from functools import partial
+from hashlib import blake2b
+from typing import NamedTuple, Optional
 
-def create_individual(d, da):
-    i = [0] * len(d)
-    chosen = set()
-    
-    # Aleatoriza busca no espaço
-    method = random.random()
-
-    # Escolhe de forma aletória
-    if method < 0.5:
-        d_random = d.copy()
-        random.shuffle(d_random)
-
-        for disc in d_random:
-            a = set(da[disc])
-            a = list(a - chosen)
-            if len(a) != 0:
-                selected = random.choice(a)
-                chosen.add(selected)
-                i[d.index(disc)] = selected
-            else:
-                i[d.index(disc)] = 0
-    
-    # Disciplina com menos candidatos primeiro
-    else:
-        for id in da:
-            a = set(da[id])
-            a = list(a - chosen)
-            if len(a) != 0:
-                selected = random.choice(a)
-                chosen.add(selected)
-                i[d.index(id)] = selected
-            else:
-                i[d.index(id)] = 0
+from decomposition import check_cancel, find_components, solve_components, summarize
+from loader import load_inputs
+from local_search import SearchState, local_search, problem_neighborhood
+from output import OUTPUT_FORMATS, encode_results
+from progress import ArgumentParser, ProgressReporter, peak_memory_mb, profile_path, profiled, write_line
+from scenarios import run_file
+from server import serve
+
+
+CROSSOVER_PROBABILITY = 0.7
+MUTATION_PROBABILITY = 0.1
+# Melhores filhos de cada geração refinados pela busca local
+MEMETIC_SIZE = 1
+# Esquemas de seleção: os dois primeiros mantêm os filhos; "elitism" guarda 20% e sorteia o resto de novo
+SELECTIONS = ["tournament", "rank", "elitism"]
+TOURNAMENT_SIZE = 2
+# Aptidões guardadas por genoma, das menos usadas recentemente para as mais
+FITNESS_CACHE_SIZE = 100_000
+
+
+class Problem(NamedTuple):
+    tutor_ids: np.ndarray   # indice do monitor -> Student ID (indice 0 = sem monitor)
+    score: np.ndarray       # (monitores + 1) x disciplinas
+    eligible: np.ndarray    # (monitores + 1) x disciplinas
+    options: np.ndarray     # disciplinas x maior numero de candidatos, completado com 0
+    n_options: np.ndarray   # numero de candidatos de cada disciplina
+    order: np.ndarray       # disciplinas com menos candidatos primeiro
+
+
+def encode_problem(courses, preferences, da):
+    course_index = {d: j for j, d in enumerate(courses)}
+    tutor_ids = [0] + list(preferences)
+    tutor_index = {a: i for i, a in enumerate(tutor_ids)}
+
+    score = np.zeros((len(tutor_ids), len(courses)))
+    eligible = np.zeros((len(tutor_ids), len(courses)), dtype=bool)
+    for a, options in preferences.items():
+        for d, x in options.items():
+            score[tutor_index[a], course_index[d]] = x
+            eligible[tutor_index[a], course_index[d]] = True
+
+    n_options = np.array([len(da.get(d, [])) for d in courses], dtype=np.int64)
+    options = np.zeros((len(courses), max(n_options.max(initial=0), 1)), dtype=np.int64)
+    for j, d in enumerate(courses):
+        options[j, :n_options[j]] = [tutor_index[a] for a in da.get(d, [])]
+
+    order = np.array([course_index[d] for d in da], dtype=np.int64)
+
+    return Problem(np.array(tutor_ids, dtype=np.int64), score, eligible, options, n_options, order)
 
-    return i
+
+def create_population(problem, n, rng):
+    n_courses = problem.score.shape[1]
+    n_tutors = len(problem.tutor_ids)
+    rows = np.arange(n)
+    population = np.zeros((n, n_courses), dtype=np.int64)
+
+    # Matriz achatada de monitores já escolhidos; o indice 0 (sem monitor) nunca está livre
+    chosen = np.zeros(n * n_tutors, dtype=bool)
+    offsets = rows * n_tutors
+    chosen[offsets] = True
+
+    # Aleatoriza busca no espaço: metade percorre as disciplinas em ordem aleatória,
+    # a outra metade começa pelas disciplinas com menos candidatos
+    random_order = np.argsort(rng.random((n, n_courses)), axis=1)
+    orders = np.where((rng.random(n) < 0.5)[:, None], random_order, problem.order[None, :])
+
+    for step in range(n_courses):
+        course = orders[:, step]
+        options = problem.options[course]
+        free = ~chosen[offsets[:, None] + options]
+        pick = (free * rng.random(options.shape)).argmax(axis=1)
+        selected = options[rows, pick] * free[rows, pick]
+        population[rows, course] = selected
+        chosen[offsets + selected] = True
+
+    return population
+
+
+def encode_assignment(problem, courses, assignment):
+    """Genome of a {class: Student ID} assignment from a previous run
+
+    Pairs that are no longer eligible are dropped and the empty classes get a free candidate.
+    """
+    tutor_index = {a: i for i, a in enumerate(problem.tutor_ids.tolist())}
+    genome = np.zeros(len(courses), dtype=np.int64)
+    used = {0}
+
+    for j, d in enumerate(courses):
+        i = tutor_index.get(assignment.get(d), 0)
+        if i not in used and problem.eligible[i, j]:
+            genome[j] = i
+            used.add(i)
+
+    for j in np.flatnonzero(genome == 0):
+        free = [i for i in problem.options[j, :problem.n_options[j]].tolist() if i not in used]
+        if free:
+            genome[j] = free[0]
+            used.add(free[0])
+
+    return genome
 
 
 def count_rooms(i, d, p):
@@ -53,111 +121,676 @@ def count_rooms(i, d, p):
     return sum(check)
 
 
-def measure_satisfaction(i, d, p):
-    
-    distinct_values_1 = set(v for v in i if v != 0)
-    distinct_values_2 = list(v for v in i if v != 0)
-    if len(distinct_values_1) != len(distinct_values_2):
-        return 0.0
-    
-    preferences = []
-    for index, value in enumerate(i):
-        options = p.get(value, {})
-        x = options.get(d[index], {})
-        if value == 0 or x == {}:
-            x = 0.0
-        preferences.append(x)
-    return sum(preferences)
+def duplicated_rows(population, n_tutors):
+    n = len(population)
+    offsets = (np.arange(n) * n_tutors)[:, None]
+    counts = np.bincount((population + offsets).ravel(), minlength=n * n_tutors).reshape(n, n_tutors)
+    return (counts[:, 1:] > 1).any(axis=1)
+
+
+def evaluate_population(population, problem):
+    n, n_courses = population.shape
+    columns = np.arange(n_courses)
+
+    allocated = problem.eligible[population, columns]
+    rooms = 10 * allocated.sum(axis=1)
+
+    # Monitor repetido no mesmo indivíduo zera a satisfação
+    interests = np.where(allocated, problem.score[population, columns], 0.0).sum(axis=1)
+    interests[duplicated_rows(population, len(problem.tutor_ids))] = 0.0
+
+    return np.hypot(rooms, interests)
+
+
+def crossover(population, probability, rng):
+    n, n_courses = population.shape
+    if n_courses < 2:
+        return population
+
+    # Dois pontos de corte por par de indivíduos consecutivos, como em tools.cxTwoPoint
+    first, second = population[0:n - 1:2], population[1:n:2]
+    mated = rng.random(len(first)) < probability
+    point_1 = rng.integers(1, n_courses + 1, size=len(first))
+    point_2 = rng.integers(1, n_courses, size=len(first))
+    point_2 = np.where(point_2 >= point_1, point_2 + 1, point_2)
+    low, high = np.minimum(point_1, point_2), np.maximum(point_1, point_2)
+
+    columns = np.arange(n_courses)
+    swap = mated[:, None] & (columns >= low[:, None]) & (columns < high[:, None])
+    first_copy = first.copy()
+    first[swap] = second[swap]
+    second[swap] = first_copy[swap]
+
+    return population
+
+
+def mutate(population, probability, mutation_probability, problem, rng):
+    n, n_courses = population.shape
+    rows = np.flatnonzero((rng.random(n) < probability) & (rng.random(n) < mutation_probability))
+
+    for row in rows:
+        individual = population[row]
+        course = rng.integers(0, n_courses)
+        if problem.n_options[course] == 0:
+            continue
+
+        tutor = problem.options[course, rng.integers(0, problem.n_options[course])]
+        current = individual[course]
+
+        # Se o monitor sorteado já está em outra turma, as duas turmas trocam de monitor
+        # (ou a outra fica vazia se o monitor atual não estiver disposto a assumi-la)
+        holder = np.flatnonzero(individual == tutor)
+        if len(holder) != 0:
+            individual[holder[0]] = current if problem.eligible[current, holder[0]] else 0
+        individual[course] = tutor
+
+    return population
+
+
+def find_duplicates(population):
+    """Mask of the genes that repeat a tutor already used earlier in the same individual"""
+    order = np.argsort(population, axis=1, kind="stable")
+    ordered = np.take_along_axis(population, order, axis=1)
+
+    repeated = np.zeros(population.shape, dtype=bool)
+    repeated[:, 1:] = (ordered[:, 1:] == ordered[:, :-1]) & (ordered[:, 1:] != 0)
+
+    mask = np.zeros(population.shape, dtype=bool)
+    np.put_along_axis(mask, order, repeated, axis=1)
+    return mask
+
+
+def repair(population, problem, rng):
+    duplicates = find_duplicates(population)
+    repaired = duplicates.any(axis=1)
+    if not repaired.any():
+        return population, repaired
+
+    rows = np.flatnonzero(repaired)
+    individuals = np.where(duplicates[rows], 0, population[rows])
+    duplicates = duplicates[rows]
+
+    n_tutors = len(problem.tutor_ids)
+    offsets = np.arange(len(rows)) * n_tutors
+    chosen = np.zeros(len(rows) * n_tutors, dtype=bool)
+    chosen[(individuals + offsets[:, None]).ravel()] = True
+    chosen[offsets] = True
 
+    # Cada turma que perdeu o monitor repetido recebe um candidato ainda não usado, se houver
+    for course in np.flatnonzero(duplicates.any(axis=0)):
+        affected = np.flatnonzero(duplicates[:, course])
+        options = problem.options[course]
+        free = ~chosen[offsets[affected][:, None] + options]
+        pick = (free * rng.random(free.shape)).argmax(axis=1)
+        selected = options[pick] * free[np.arange(len(affected)), pick]
+        individuals[affected, course] = selected
+        chosen[offsets[affected] + selected] = True
 
-def evaluate_individual(i, d, p):
-    rooms = 10 * count_rooms(i, d, p)
-    interests = measure_satisfaction(i, d, p)
-    return (np.linalg.norm([rooms, interests]),)
+    population[rows] = individuals
+    return population, repaired
 
 
-def do_the_scheduled(courses, preferences, da, n_generations, population_size):
+# Dados somente leitura de cada processo do pool, enviados uma vez pelo initializer
+worker_problem = None
 
-    def mutate(ind):
-        if random.random() < mutation_probability:
-            random_course = random.choice(courses)
-            ind[courses.index(random_course)] = random.choice(da[random_course])
-        return ind,
 
-    def selection_elitism(population, n_individuals):
-        elitism = int(0.2 * len(population))
-        elite = tools.selBest(population, elitism)
-        remaining_population = toolbox.population(n=n_individuals - elitism)
-        return elite + remaining_population
+def init_worker(problem):
+    global worker_problem
+    worker_problem = problem
 
-    mutation_probability = 0.1
-    crossover_probability = 0.7
 
-    creator.create("FitnessMax", base.Fitness, weights=(1.0,))
-    creator.create("Individual", list, fitness=creator.FitnessMax)
+def evaluate_chunk(chunk):
+    return evaluate_population(chunk, worker_problem)
+
+
+def evaluate_in_pool(population, map_function, n_chunks):
+    chunks = np.array_split(population, n_chunks)
+    return np.concatenate(list(map_function(evaluate_chunk, chunks)))
+
+
+def refine_elite(population, fitness, size, neighborhood, rng):
+    """Memetic step: one local search pass on each of the size best individuals
+
+    Returns the population and fitness with the refined individuals and the number of moves.
+    """
+    moves = 0
+    for row in np.argsort(-fitness, kind="stable")[:size]:
+        state = SearchState(population[row], neighborhood)
+        local_search(state, rng, max_passes=1)
+        population[row] = state.genome
+        fitness[row] = state.fitness()
+        moves += state.moves
+    return population, fitness, moves
+
+
+def selection_elitism(population, fitness, n_individuals, create_population):
+    elitism = int(0.2 * len(population))
+    elite = population[np.argsort(-fitness, kind="stable")[:elitism]]
+    remaining_population = create_population(n=n_individuals - elitism)
+    return np.concatenate([elite, remaining_population])
+
+
+def selection_tournament(population, fitness, n_individuals, rng, size=TOURNAMENT_SIZE):
+    """Copies of the fittest of size individuals drawn at random, once per slot"""
+    entrants = rng.integers(0, len(population), size=(n_individuals, size))
+    winners = entrants[np.arange(n_individuals), fitness[entrants].argmax(axis=1)]
+    return population[winners]
+
+
+def selection_rank(population, fitness, n_individuals, rng):
+    """Copies drawn with probability proportional to the rank of the fitness (worst = 1)"""
+    ranks = np.empty(len(population))
+    ranks[np.argsort(fitness, kind="stable")] = np.arange(1, len(population) + 1)
+    return population[rng.choice(len(population), size=n_individuals, p=ranks / ranks.sum())]
+
+
+class FitnessCache:
+    """Bounded LRU map from a digest of the genome to its fitness
+
+    Individuals already scored, such as copies made by the selection that crossover and
+    mutation left untouched, are not evaluated again.
+    """
+
+    def __init__(self, max_size=FITNESS_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+
+    def evaluate(self, population, evaluate):
+        fitness = np.empty(len(population))
+        missing = {}
+        for row, genome in enumerate(population):
+            key = blake2b(genome.tobytes(), digest_size=16).digest()
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+                fitness[row] = value
+                self.hits += 1
+            else:
+                missing.setdefault(key, []).append(row)
+
+        if missing:
+            # Genomes repetidos na mesma população são avaliados uma vez
+            values = evaluate(population[[rows[0] for rows in missing.values()]])
+            for (key, rows), value in zip(missing.items(), values.tolist()):
+                fitness[rows] = value
+                self.hits += len(rows) - 1
+                self.entries[key] = value
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+        return fitness
+
+
+def create_deap_types():
+    """DEAP is imported on first use so --help and argument errors start quickly"""
+    from deap import base, creator
+
+    if not hasattr(creator, "FitnessMax"):
+        creator.create("FitnessMax", base.Fitness, weights=(1.0,))
+        creator.create("Individual", list, fitness=creator.FitnessMax)
+
+
+def make_toolbox(problem, rng, pool=None, workers=1, memetic=0, selection="tournament", cache_size=FITNESS_CACHE_SIZE):
+    from deap import base
 
     toolbox = base.Toolbox()
-    toolbox.register(
-        "individual",
-        tools.initIterate,
-        creator.Individual,
-        lambda: create_individual(courses, da),
-    )
+    toolbox.register("population", create_population, problem=problem, rng=rng)
 
-    toolbox.register(
-        "population", 
-        tools.initRepeat, 
-        list, 
-        toolbox.individual
-    )
+    if pool is not None:
+        toolbox.register("map", pool.map)
+        toolbox.register("evaluate", evaluate_in_pool, map_function=toolbox.map, n_chunks=workers)
+    else:
+        toolbox.register("evaluate", evaluate_population, problem=problem)
 
+    toolbox.register("mate", crossover, probability=CROSSOVER_PROBABILITY, rng=rng)
     toolbox.register(
-        "evaluate", 
-        lambda ind: evaluate_individual(ind, courses, preferences)
+        "mutate",
+        mutate,
+        probability=MUTATION_PROBABILITY,
+        mutation_probability=MUTATION_PROBABILITY,
+        problem=problem,
+        rng=rng,
     )
+    toolbox.register("repair", repair, problem=problem, rng=rng)
+    if selection == "tournament":
+        toolbox.register("select", selection_tournament, rng=rng)
+    elif selection == "rank":
+        toolbox.register("select", selection_rank, rng=rng)
+    elif selection == "elitism":
+        toolbox.register("select", selection_elitism, create_population=toolbox.population)
+    else:
+        raise Exception(f"Unknown selection: {selection}")
 
-    toolbox.register(
-        "mate", 
-        tools.cxTwoPoint
-    )
+    # Conta as avaliações de aptidão, inclusive as dos imigrantes, para as métricas;
+    # as respondidas pelo cache contam só como acertos
+    toolbox.evaluations = 0
+    toolbox.cache = FitnessCache(cache_size) if cache_size > 0 else None
+    evaluate = toolbox.evaluate
 
-    toolbox.register(
-        "mutate", 
-        mutate
-    )
+    def counted_evaluate(population):
+        toolbox.evaluations += len(population)
+        return evaluate(population)
 
-    toolbox.register(
-        "select", 
-        selection_elitism
-    )
+    if toolbox.cache is not None:
+        toolbox.register("evaluate", toolbox.cache.evaluate, evaluate=counted_evaluate)
+    else:
+        toolbox.register("evaluate", counted_evaluate)
+
+    # Busca local nos memetic melhores filhos de cada geração, com os movimentos contados
+    toolbox.local_search_moves = 0
+    neighborhood = problem_neighborhood(problem) if memetic > 0 else None
+
+    def refine(population, fitness):
+        if neighborhood is None:
+            return population, fitness
+        population, fitness, moves = refine_elite(population, fitness, memetic, neighborhood, rng)
+        toolbox.local_search_moves += moves
+        return population, fitness
+
+    toolbox.register("refine", refine)
+
+    return toolbox
+
+
+def next_generation(toolbox, population, fitness):
+    # Mesmo ciclo de algorithms.eaSimple, com a população inteira avaliada de uma vez.
+    # O reparo remove monitores repetidos antes da avaliação, então nenhuma avaliação
+    # é gasta com indivíduos inviáveis
+    offspring = toolbox.select(population, fitness, len(population))
+    offspring = toolbox.mate(offspring)
+    offspring = toolbox.mutate(offspring)
+    offspring, repaired = toolbox.repair(offspring)
+    offspring, fitness = toolbox.refine(offspring, toolbox.evaluate(offspring))
+    return offspring, fitness, repaired
+
+
+class StopCriteria(NamedTuple):
+    generations: int
+    time_limit: Optional[float] = None        # segundos de relógio
+    patience: Optional[int] = None            # gerações seguidas sem melhora
+    target_fitness: Optional[float] = None
+
+
+def stop_reason(criteria, generation, elapsed, stale, best_fitness):
+    if criteria.target_fitness is not None and best_fitness >= criteria.target_fitness:
+        return "target_fitness"
+    if generation >= criteria.generations:
+        return "generations"
+    if criteria.time_limit is not None and elapsed >= criteria.time_limit:
+        return "time_limit"
+    if criteria.patience is not None and stale >= criteria.patience:
+        return "no_improvement"
+    return None
+
+
+def evolve(toolbox, problem, population_size, criteria, migrate=None, progress=None, cancel=None, seeds=None):
+    from deap import creator, tools
+
+    create_deap_types()
+    start = time.time()
+
+    # O hall da fama guarda o melhor indivíduo já visto, que pode se perder na
+    # população final por causa do cruzamento e da mutação aplicados à elite
+    hall_of_fame = tools.HallOfFame(1)
+
+    def update_hall_of_fame(population, fitness):
+        best = int(np.argmax(fitness))
+        individual = creator.Individual(population[best].tolist())
+        individual.fitness.values = (float(fitness[best]),)
+        hall_of_fame.update([individual])
 
     pop = toolbox.population(n=population_size)
+    if seeds is not None:
+        pop[:len(seeds)] = seeds[:population_size]
+    fitness = toolbox.evaluate(pop)
+    update_hall_of_fame(pop, fitness)
+
+    stats = {"history": [], "repaired_share": []}
+    best_fitness = hall_of_fame[0].fitness.values[0]
+    best_generation = 0
+    generation = 0
+    stale = 0
+    infeasible = 0
+
+    while True:
+        reason = stop_reason(criteria, generation, time.time() - start, stale, best_fitness)
+        # cancel é um threading.Event acionado pelo modo servidor
+        if cancel is not None and cancel.is_set():
+            reason = "cancelled"
+        if reason is not None:
+            break
 
-    for ind in pop:
-        if not ind.fitness.valid:
-            ind.fitness.values = toolbox.evaluate(ind)
-
-    pop, _ = algorithms.eaSimple(
-        pop, 
-        toolbox, 
-        cxpb=crossover_probability, 
-        mutpb=mutation_probability, 
-        ngen=n_generations, 
-        stats=None, 
-        halloffame=None, 
-        verbose=False
+        generation += 1
+        pop, fitness, repaired = next_generation(toolbox, pop, fitness)
+        infeasible += int(repaired.sum())
+        if migrate is not None:
+            pop, fitness = migrate(generation, pop, fitness)
+        update_hall_of_fame(pop, fitness)
+
+        stats["history"].append(float(fitness.max()))
+        # Parcela dos filhos inviáveis antes do reparo; depois dele todos são viáveis
+        stats["repaired_share"].append(float(repaired.mean()))
+
+        if hall_of_fame[0].fitness.values[0] > best_fitness:
+            best_fitness, best_generation, stale = hall_of_fame[0].fitness.values[0], generation, 0
+        else:
+            stale += 1
+
+        if progress is not None:
+            progress.emit(generation=generation, best_fitness=best_fitness, mean_fitness=float(fitness.mean()))
+
+    if progress is not None:
+        progress.emit(
+            force=True,
+            generation=generation,
+            best_fitness=best_fitness,
+            mean_fitness=float(fitness.mean()),
+            stop_reason=reason,
+        )
+
+    elapsed = time.time() - start
+    cache_hits = toolbox.cache.hits if toolbox.cache is not None else 0
+    lookups = toolbox.evaluations + cache_hits
+
+    stats.update(
+        {
+            "best_fitness": best_fitness,
+            "mean_fitness": float(fitness.mean()),
+            "best_generation": best_generation,
+            "generations": generation,
+            "stop_reason": reason,
+            "evaluations": toolbox.evaluations,
+            "cache_hits": cache_hits,
+            "cache_hit_rate": cache_hits / lookups if lookups else 0.0,
+            # Aptidões entregues por segundo de evolução, calculadas ou vindas do cache
+            "evaluations_per_second": lookups / elapsed if elapsed > 0 else 0.0,
+            "local_search_moves": toolbox.local_search_moves,
+            # Filhos com monitores repetidos, que o reparo tornou viáveis antes da avaliação
+            "infeasible_individuals": infeasible,
+        }
     )
+    return np.array(hall_of_fame[0], dtype=np.int64), stats
+
+
+def run_island(index, problem, population_size, criteria, migration_interval, migration_size, progress_interval, inbox, outbox, results, seeds=None, seed_sequence=None, memetic=0, selection="tournament", cache_size=FITNESS_CACHE_SIZE, progress_fields=None):
+    rng = np.random.default_rng(seed_sequence)
+    toolbox = make_toolbox(problem, rng, memetic=memetic, selection=selection, cache_size=cache_size)
+    # Os campos do reporter principal, como o id da requisição no modo servidor, vão em cada evento
+    progress = ProgressReporter(progress_interval, **(progress_fields or {}), island=index)
+
+    # A ilha pode terminar sem esvaziar a fila da vizinha
+    outbox.cancel_join_thread()
+
+    def migrate(generation, pop, fitness):
+        if migration_interval <= 0 or generation % migration_interval != 0:
+            return pop, fitness
+
+        # Migração em anel e sem espera: envia a elite para a próxima ilha e substitui os
+        # piores pelos imigrantes que já chegaram, já que as ilhas podem parar em momentos diferentes
+        ranking = np.argsort(-fitness, kind="stable")
+        outbox.put(pop[ranking[:migration_size]])
+        try:
+            immigrants = inbox.get_nowait()
+        except queue.Empty:
+            return pop, fitness
+
+        worst = ranking[len(pop) - len(immigrants):]
+        pop[worst] = immigrants
+        fitness[worst] = toolbox.evaluate(immigrants)
+        return pop, fitness
+
+    try:
+        best, stats = evolve(toolbox, problem, population_size, criteria, migrate, progress, seeds=seeds)
+    except Exception as e:
+        # O processo principal espera um resultado por ilha; o erro vai no lugar do genoma
+        results.put((index, None, str(e)))
+        return
+    results.put((index, best, stats))
+
+
+def evaluation_stats(runs, parallel=False):
+    """Evaluation counts of several runs of evolve added up, with the hit rate and throughput
+
+    Parallel runs (islands) add their throughputs; the others (components) share one clock.
+    """
+    evaluations = sum(stats["evaluations"] for stats in runs)
+    hits = sum(stats["cache_hits"] for stats in runs)
+    lookups = evaluations + hits
+    if parallel:
+        per_second = sum(stats["evaluations_per_second"] for stats in runs)
+    else:
+        seconds = sum(
+            (stats["evaluations"] + stats["cache_hits"]) / stats["evaluations_per_second"]
+            for stats in runs
+            if stats["evaluations_per_second"] > 0
+        )
+        per_second = lookups / seconds if seconds > 0 else 0.0
+    return {
+        "evaluations": evaluations,
+        "cache_hits": hits,
+        "cache_hit_rate": hits / lookups if lookups else 0.0,
+        "evaluations_per_second": per_second,
+    }
+
 
-    for ind in pop:
-        if not ind.fitness.valid:
-            ind.fitness.values = toolbox.evaluate(ind)
+def run_islands(problem, population_size, criteria, islands, migration_interval, migration_size, progress_interval=None, seeds=None, seed=None, memetic=0, selection="tournament", cache_size=FITNESS_CACHE_SIZE, cancel=None, progress_fields=None):
+    migration_size = min(migration_size, population_size)
+    # Uma sequência independente por ilha, derivada da semente
+    seed_sequences = np.random.SeedSequence(seed).spawn(islands)
+    queues = [Queue() for _ in range(islands)]
+    results = Queue()
 
-    return tools.selBest(pop, 1)[0]
+    processes = [
+        Process(
+            target=run_island,
+            args=(
+                index,
+                problem,
+                population_size,
+                criteria,
+                migration_interval,
+                migration_size,
+                progress_interval,
+                queues[index],
+                queues[(index + 1) % islands],
+                results,
+                seeds,
+                seed_sequences[index],
+                memetic,
+                selection,
+                cache_size,
+                progress_fields,
+            ),
+        )
+        for index in range(islands)
+    ]
+    for process in processes:
+        process.start()
+
+    # Lê os resultados antes do join para não travar em filas cheias
+    island_results = []
+    try:
+        while len(island_results) < islands:
+            # As ilhas não veem o cancel do servidor: são interrompidas daqui
+            check_cancel(cancel)
+            try:
+                index, genome, stats = results.get(timeout=0.2)
+            except queue.Empty:
+                # Uma ilha que morreu sem responder não é esperada
+                for index, process in enumerate(processes):
+                    if process.exitcode not in (None, 0):
+                        raise Exception(f"Island {index} exited with code {process.exitcode}")
+                continue
+            if genome is None:
+                raise Exception(f"Island {index} failed: {stats}")
+            island_results.append((index, genome, stats))
+    except BaseException:
+        # Em caso de erro as outras ilhas são interrompidas sem esperar o fim da evolução
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        raise
+    finally:
+        for process in processes:
+            process.join()
+    island_results.sort(key=lambda result: result[0])
 
+    island_stats = []
+    best, best_stats = None, None
+    for index, genome, stats in island_results:
+        island_stats.append({"island": index, **stats})
+        if best_stats is None or stats["best_fitness"] > best_stats["best_fitness"]:
+            best, best_stats = genome, stats
 
-def run(courses, preferences, da, generation_number, population_size):
+    return best, {
+        "stop_reason": best_stats["stop_reason"],
+        "generations": best_stats["generations"],
+        "best_fitness": best_stats["best_fitness"],
+        **evaluation_stats(island_stats, parallel=True),
+        "infeasible_individuals": sum(stats["infeasible_individuals"] for stats in island_stats),
+        "local_search_moves": sum(stats["local_search_moves"] for stats in island_stats),
+        "islands": island_stats,
+    }
+
+
+def do_the_scheduled(courses, preferences, da, n_generations, population_size, workers=1, islands=1, migration_interval=10, migration_size=5, time_limit=None, patience=None, target_fitness=None, progress=None, cancel=None, initial_assignment=None, seed=None, memetic=MEMETIC_SIZE, polish=True, selection="tournament", cache_size=FITNESS_CACHE_SIZE):
+    problem = encode_problem(courses, preferences, da)
+    criteria = StopCriteria(n_generations, time_limit, patience, target_fitness)
+
+    # A melhor alocação da execução anterior entra na população inicial
+    seeds = None
+    if initial_assignment:
+        seeds = encode_assignment(problem, courses, initial_assignment)[None, :]
+
+    if islands > 1:
+        progress_interval = progress.interval if progress is not None else None
+        progress_fields = progress.fields if progress is not None else None
+        best, stats = run_islands(problem, population_size, criteria, islands, migration_interval, migration_size, progress_interval, seeds, seed, memetic, selection, cache_size, cancel, progress_fields)
+    else:
+        rng = np.random.default_rng(seed)
+
+        pool = None
+        if workers > 1:
+            pool = Pool(workers, initializer=init_worker, initargs=(problem,))
+
+        try:
+            toolbox = make_toolbox(problem, rng, pool, workers, memetic, selection, cache_size)
+            best, evolve_stats = evolve(toolbox, problem, population_size, criteria, progress=progress, cancel=cancel, seeds=seeds)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        stats = {
+            key: evolve_stats[key]
+            for key in (
+                "stop_reason",
+                "generations",
+                "best_fitness",
+                "repaired_share",
+                "evaluations",
+                "cache_hits",
+                "cache_hit_rate",
+                "evaluations_per_second",
+                "infeasible_individuals",
+                "local_search_moves",
+            )
+        }
+
+    if polish and stats["stop_reason"] != "cancelled":
+        # O melhor indivíduo é levado ao ótimo local das trocas, substituições e preenchimentos
+        state = SearchState(best, problem_neighborhood(problem))
+        local_search(state)
+        best = np.array(state.genome, dtype=np.int64)
+        stats["best_fitness"] = max(stats["best_fitness"], state.fitness())
+        stats["local_search_moves"] += state.moves
+
+    return problem.tutor_ids[best].tolist(), stats
+
+
+def assignment_fitness(courses, preferences, assignment):
+    """Fitness of evaluate_population for one list of Student IDs, without the dense matrices"""
+    tutors = [a for a in assignment if a != 0]
+    allocated = [(a, d) for a, d in zip(assignment, courses) if a != 0 and d in preferences.get(a, {})]
+    interests = 0.0 if len(set(tutors)) < len(tutors) else sum(preferences[a][d] for a, d in allocated)
+    return float(np.hypot(10 * len(allocated), interests))
+
+
+def solve_component(component, cancel, settings):
+    """Runs the GA on one connected component; settings holds the keyword arguments of do_the_scheduled"""
+    courses, _, preferences, da = component
     da = dict(sorted(da.items(), key=lambda item: len(item[1])))
-    better = do_the_scheduled(courses, preferences, da, generation_number, population_size)
+    best, stats = do_the_scheduled(courses, preferences, da, cancel=cancel, **settings)
+    return [(a, d) for a, d in zip(best, courses) if a != 0], stats
+
+
+def schedule_components(courses, preferences, components, settings, progress=None, cancel=None):
+    """Runs the GA on each connected component and joins the best individuals
+
+    With more than one non-trivial component and workers > 1 the pool runs whole components,
+    each evolving serially, since pool processes cannot start processes of their own.
+    """
+    summary = summarize(components)
+    if progress is not None:
+        progress.phase("decompose", **summary)
+        progress.phase("evolve")
+
+    workers = settings["workers"]
+    if workers > 1 and summary["total"] - summary["trivial"] > 1:
+        settings = {**settings, "workers": 1, "islands": 1}
+    else:
+        settings = {**settings, "progress": progress}
+
+    results = solve_components(components, partial(solve_component, settings=settings), workers, progress, cancel)
+    assigned = {d: a for pairs, _ in results for a, d in pairs}
+    better = [assigned.get(d, 0) for d in courses]
+
+    # Critérios de parada e histórico do maior componente; a aptidão é recalculada sobre
+    # a alocação completa porque não é a soma das aptidões dos componentes
+    solved = [i for i, (_, component_stats) in enumerate(results) if component_stats is not None]
+    if solved:
+        stats = dict(results[max(solved, key=lambda i: len(components[i][0]))][1])
+    else:
+        stats = {"stop_reason": "trivial", "generations": 0, "repaired_share": []}
+    stats["best_fitness"] = assignment_fitness(courses, preferences, better)
+    # As contagens somam todos os componentes
+    stats.update(evaluation_stats([results[i][1] for i in solved]))
+    stats["infeasible_individuals"] = sum(results[i][1]["infeasible_individuals"] for i in solved)
+    stats["local_search_moves"] = sum(results[i][1]["local_search_moves"] for i in solved)
+    stats["components"] = summary
+    return better, stats
+
+
+def run(courses, preferences, da, generation_number, population_size, workers=1, islands=1, migration_interval=10, migration_size=5, time_limit=None, patience=None, target_fitness=None, progress=None, cancel=None, initial_assignment=None, decompose=True, seed=None, memetic=MEMETIC_SIZE, polish=True, selection="tournament", cache_size=FITNESS_CACHE_SIZE):
+    settings = {
+        "n_generations": generation_number,
+        "population_size": population_size,
+        "workers": workers,
+        "islands": islands,
+        "migration_interval": migration_interval,
+        "migration_size": migration_size,
+        "time_limit": time_limit,
+        "patience": patience,
+        "target_fitness": target_fitness,
+        "initial_assignment": initial_assignment,
+        "seed": seed,
+        "memetic": memetic,
+        "polish": polish,
+        "selection": selection,
+        "cache_size": cache_size,
+    }
+
+    # Componentes independentes do grafo monitor-turma evoluem separadamente
+    components = find_components(courses, list(preferences), preferences, da) if decompose else []
+    if len(components) > 1:
+        better, stats = schedule_components(courses, preferences, components, settings, progress, cancel)
+    else:
+        da = dict(sorted(da.items(), key=lambda item: len(item[1])))
+        better, stats = do_the_scheduled(courses, preferences, da, progress=progress, cancel=cancel, **settings)
+
+    if progress is not None:
+        progress.phase("postprocess", best_fitness=stats["best_fitness"])
 
     result_rows = []
     for index, student_id in enumerate(better):
@@ -175,114 +808,228 @@ def run(courses, preferences, da, generation_number, population_size):
                 "preference": preferences.get(student_id, {}),
             }
         )
-    df = pd.DataFrame.from_records(result_rows, columns=['class', 'students', 'grade', 'preference'])
+    grades = [float(row["grade"]) for row in result_rows if row["grade"] != "No preference"]
 
     metrics = {
         "number_classes_allocated": count_rooms(better, courses, preferences),
-        "total_classes": len(df),
-        "average_grade": df[df['grade'] != 'No preference']['grade'].astype(float).mean(),
+        "total_classes": len(result_rows),
+        "average_grade": sum(grades) / len(grades) if grades else None,
     }
-
+    metrics.update(stats)
 
     return metrics, result_rows
 
 
-def process_file(file_path: str, courses_excel_path:str, excel_flag: bool, min_grade:float, preference_flag:bool) -> pd.DataFrame:
-    df_courses = pd.read_excel(courses_excel_path)
+def process_file(file_path: str, courses_excel_path:str, excel_flag: bool, min_grade:float, preference_flag:bool, progress=None) -> tuple:
+    return load_inputs(file_path, courses_excel_path, excel_flag, min_grade, preference_flag, progress)
 
-    courses = []
-    for _, row in df_courses.iterrows():
-        course = row['Course Name']
-        n = row['Number of Classes']
-        for i in range(n):
-            courses.append(f'{course} - Class {i + 1}')
 
-    if excel_flag:
-        df = pd.read_excel(file_path)
-    else:
-        df = pd.read_csv(file_path)
-
-    if "Student ID" not in df.columns:
-        raise Exception('Column "Student ID" is required in the tutors table!')
-
-    if "Course Name" not in df.columns:
-        raise Exception('Column "Course Name" is required in the tutors table!')
-
-    if "Grade" not in df.columns:
-        raise Exception('Column "Grade" is required in the tutors table!')
-
-    if "Preference" not in df.columns:
-        raise Exception('Column "Preference" is required in the tutors table!')
-
-    df = df[["Student ID", "Course Name", "Grade", "Preference"]]
+def solve_request(inputs, params, progress, cancel, state):
+    """Entry point of the resident server mode, params holds the same options as the command line"""
+    courses, _, preferences, da = inputs
+    previous = state.get("assignment") if params.get("incremental", True) else None
 
-    df = df[df['Grade'] >= min_grade]
-
-    df_courses = df_courses.loc[df_courses.index.repeat(df_courses['Number of Classes'])].reset_index(drop=True)
-    df_courses['class_number'] = df_courses.groupby('Course Name').cumcount() + 1
-    df_courses = df_courses.drop(columns='Number of Classes')
-    
-    df = pd.merge(df, df_courses, on='Course Name')
-    df['Course Name'] = df['Course Name'] + ' - Class ' + df['class_number'].astype(str)
-
-    # Removendo a coluna auxiliar 'contador', se necessário
-    df = df.drop(columns='class_number').drop_duplicates()
-
-    candidates = [i.item() for i in df["Student ID"].unique()]
-
-    preferences = {}
-    for candidate in candidates:
-        df_filtered = df[df["Student ID"] == candidate].copy()
+    progress.phase("evolve")
+    metrics, result_rows = run(
+        courses,
+        preferences,
+        da,
+        int(params.get("generation_number", 50)),
+        int(params.get("population_size", 500)),
+        workers=params.get("workers", 1),
+        islands=params.get("islands", 1),
+        migration_interval=params.get("migration_interval", 10),
+        migration_size=params.get("migration_size", 5),
+        time_limit=params.get("time_limit"),
+        patience=params.get("patience"),
+        target_fitness=params.get("target_fitness"),
+        progress=progress,
+        cancel=cancel,
+        initial_assignment=previous,
+        decompose=params.get("decompose", True),
+        seed=params.get("seed"),
+        memetic=int(params.get("memetic", MEMETIC_SIZE)),
+        polish=params.get("polish", True),
+        selection=params.get("selection", "tournament"),
+        cache_size=int(params.get("cache_size", FITNESS_CACHE_SIZE)),
+    )
 
-        preferences[int(candidate)] = {
-            row["Course Name"]: row["Grade"] * np.exp(-0.4 * (row["Preference"] - 1)) if preference_flag == True else row["Grade"] for _, row in df_filtered.iterrows()
-        }
+    metrics["incremental"] = "seeded" if previous else "cold"
+    # Uma requisição cancelada não deixa sua alocação como semente da próxima
+    check_cancel(cancel)
+    state["assignment"] = {row["class"]: int(row["student"]) for row in result_rows if row["student"] != "No tutor"}
+    return metrics, result_rows
 
-    da = {}
-    for course in courses:
-        df_filtered = df[df["Course Name"] == course].copy().sort_values("Student ID")
 
-        da[course] = [
-            row["Student ID"]
-            for _, row in df_filtered.iterrows()
-            if row["Course Name"] == course
-        ]
+def parse_arguments(argv):
+    parser = ArgumentParser(description="Allocate tutors to classes with a genetic algorithm.")
+    parser.add_argument("students_excel_path")
+    parser.add_argument("courses_excel_path")
+    parser.add_argument("min_grade", type=float)
+    parser.add_argument("preference_flag")
+    parser.add_argument("generation_number", type=int)
+    parser.add_argument("population_size", type=int)
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Evaluate fitness in a pool of N processes"
+    )
+    parser.add_argument(
+        "--islands", type=int, default=1, help="Evolve K sub-populations in separate processes (ignores --workers)"
+    )
+    parser.add_argument(
+        "--migration-interval", type=int, default=10, help="Generations between migrations of the island model"
+    )
+    parser.add_argument(
+        "--migration-size", type=int, default=5, help="Number of elite individuals sent to the next island"
+    )
+    parser.add_argument(
+        "--time-limit", type=float, default=None, help="Stop after this many seconds of evolution"
+    )
+    parser.add_argument(
+        "--patience", type=int, default=None, help="Stop after N generations without improving the best fitness"
+    )
+    parser.add_argument(
+        "--target-fitness", type=float, default=None, help="Stop as soon as the best fitness reaches this value"
+    )
+    parser.add_argument(
+        "--no-decompose", action="store_true", help="Evolve the whole problem at once instead of one component at a time"
+    )
+    parser.add_argument(
+        "--memetic",
+        type=int,
+        default=MEMETIC_SIZE,
+        help="Refine the N best offspring of each generation with one local search pass (0 turns it off)",
+    )
+    parser.add_argument(
+        "--no-polish", action="store_true", help="Do not run local search on the best individual at the end"
+    )
+    parser.add_argument(
+        "--selection",
+        choices=SELECTIONS,
+        default="tournament",
+        help="Parents by tournament or by rank, or 20%% elites plus new random individuals (elitism)",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=FITNESS_CACHE_SIZE,
+        help="Remember the fitness of up to N genomes so duplicates are not evaluated again (0 turns it off)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed of the random generator; runs repeat exactly unless --islands or --time-limit is used",
+    )
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=None,
+        help="Write JSON progress lines to stdout at most once every N seconds",
+    )
+    parser.add_argument(
+        "--profile", action="store_true", help="Write a cProfile dump (pstats) of the run next to the input tables"
+    )
+    parser.add_argument(
+        "--scenarios",
+        default=None,
+        help="JSON file with a list of scenarios (name, min_grade, preference_flag, params) to solve and compare",
+    )
+    parser.add_argument(
+        "--scenario-workers", type=int, default=None, help="Solve the scenarios in a pool of N processes (default: all CPUs)"
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=OUTPUT_FORMATS,
+        default="compact",
+        help="Tutors listed once and referenced by index (compact, columnar), or the previous row format (legacy)",
+    )
+    return parser.parse_args(argv)
 
-    return courses, candidates, preferences, da
 
 if __name__ == "__main__":
-    if len(sys.argv) < 7:
-        result = {"success": False, "error": "No file path or parameters provided"}
-        sys.stderr.write(json.dumps(result))
-        sys.exit(1)
+    # Necessário para o pool de processos no executável do PyInstaller
+    freeze_support()
+
+    # Modo residente: lê requisições JSON do stdin até o aplicativo fechar o pipe
+    if sys.argv[1:2] == ["--serve"]:
+        serve(solve_request, "genetic", sys.argv[1:])
+        sys.exit(0)
 
     try:
         start = time.time()
 
-        students_excel_path = sys.argv[1]
-        courses_excel_path = sys.argv[2]
-        min_grade = float(sys.argv[3])
-        preference_flag = bool(sys.argv[4])
-        generation_number = int(sys.argv[5])
-        population_size = int(sys.argv[6])
-
-        # min_grade = 0
-        # preference_flag = True
-        # generation_number = 50
-        # population_size = 500
+        args = parse_arguments(sys.argv[1:])
+        students_excel_path = args.students_excel_path
+        courses_excel_path = args.courses_excel_path
+        min_grade = args.min_grade
+        preference_flag = bool(args.preference_flag)
+        generation_number = args.generation_number
+        population_size = args.population_size
 
         excel_flag = True
         if students_excel_path.endswith(".csv"):
             excel_flag = False
 
-        courses, _, preferences, da = process_file(students_excel_path, courses_excel_path, excel_flag, min_grade, preference_flag)
-        metrics, result_rows = run(courses, preferences, da, generation_number, population_size)
+        profile = profile_path(students_excel_path, "genetic") if args.profile else None
+        progress = ProgressReporter(args.progress_interval)
+        progress.phase("load")
+        with profiled(profile):
+            if args.scenarios is not None:
+                # Modo de cenários: as tabelas são lidas uma vez para todos os cenários do arquivo
+                params = {
+                    "generation_number": generation_number,
+                    "population_size": population_size,
+                    "workers": args.workers,
+                    "islands": args.islands,
+                    "migration_interval": args.migration_interval,
+                    "migration_size": args.migration_size,
+                    "time_limit": args.time_limit,
+                    "patience": args.patience,
+                    "target_fitness": args.target_fitness,
+                    "decompose": not args.no_decompose,
+                    "seed": args.seed,
+                    "memetic": args.memetic,
+                    "polish": not args.no_polish,
+                    "selection": args.selection,
+                    "cache_size": args.cache_size,
+                }
+                data = run_file(solve_request, students_excel_path, courses_excel_path, excel_flag, args.scenarios, min_grade, preference_flag, params, args.scenario_workers, progress, args.output_format)
+                metrics = data
+            else:
+                courses, _, preferences, da = process_file(students_excel_path, courses_excel_path, excel_flag, min_grade, preference_flag, progress)
+                progress.phase("evolve")
+                metrics, result_rows = run(
+                    courses,
+                    preferences,
+                    da,
+                    generation_number,
+                    population_size,
+                    workers=args.workers,
+                    islands=args.islands,
+                    migration_interval=args.migration_interval,
+                    migration_size=args.migration_size,
+                    time_limit=args.time_limit,
+                    patience=args.patience,
+                    target_fitness=args.target_fitness,
+                    progress=progress,
+                    decompose=not args.no_decompose,
+                    seed=args.seed,
+                    memetic=args.memetic,
+                    polish=not args.no_polish,
+                    selection=args.selection,
+                    cache_size=args.cache_size,
+                )
+                data = {"metrics": metrics, **encode_results(result_rows, args.output_format)}
         end = time.time()
         metrics['execution_time'] = end - start
+        metrics['timings'] = progress.timings()
+        metrics['peak_memory_mb'] = peak_memory_mb()
+        if profile is not None:
+            metrics['profile'] = profile
 
-        result = {"success": True, "data": {"metrics": metrics, "results": result_rows}}
+        result = {"success": True, "data": data}
 
-        sys.stdout.write(json.dumps(result))
+        write_line(result)
         sys.exit(0)
 
     except Exception as e:
@@ -0,0 +1,28 @@
+def greedy_assignment(courses, candidates, preferences):
+    """Pairs (Student ID, class) chosen by decreasing score while both are still free
+
+    Every pair gains its score plus the 1 paid for a class without a tutor, so the
+    greedy matching is maximal and a valid incumbent for the integer model.
+    """
+    pairs = sorted(
+        ((score, a, d) for a in candidates for d, score in preferences[a].items()),
+        key=lambda pair: pair[0],
+        reverse=True,
+    )
+
+    used_tutors = set()
+    used_courses = set()
+    assignment = []
+    for _, a, d in pairs:
+        if a in used_tutors or d in used_courses:
+            continue
+        used_tutors.add(a)
+        used_courses.add(d)
+        assignment.append((a, d))
+
+    return assignment
+
+
+def assignment_objective(courses, preferences, assignment):
+    """Objective of the integer model for a list of (Student ID, class) pairs"""
+    return sum(preferences[a][d] for a, d in assignment) - (len(courses) - len(assignment))
@@ -1,22 +1,53 @@
-import pandas as pd
-import numpy as np
 import time
-from pulp import (
-    LpProblem,
-    LpMaximize,
-    LpVariable,
-    lpSum,
-    LpBinary,
-    PULP_CBC_CMD,
-    COIN_CMD,
-)
+import argparse
+import re
 import sys
 import json
 import os
+import tempfile
+import threading
+from functools import partial
+from multiprocessing import freeze_support
+from typing import NamedTuple, Optional
+
+from decomposition import (
+    batch_components,
+    check_cancel,
+    find_components,
+    is_trivial,
+    merge_components,
+    merge_pairs,
+    solve_components,
+    solve_trivial,
+    summarize,
+)
+from heuristics import assignment_objective, greedy_assignment
+from loader import load_inputs
+from local_search import polish_pairs
+from output import OUTPUT_FORMATS, encode_results
+from progress import ArgumentParser, ProgressReporter, peak_memory_mb, profile_path, profiled, write_line
+from scenarios import run_file
+from server import serve
+from symmetry import aggregate, expand
+
+
+# Backends do modelo: HiGHS dentro do processo, pelo scipy, ou o CBC pelo PuLP, que também é o reserva
+BACKENDS = ["highs", "cbc"]
 
 
-def get_solver():
+class SolverOptions(NamedTuple):
+    time_limit: Optional[float] = None  # segundos; ao fim o solver devolve a melhor solução viável
+    gap: Optional[float] = None         # gap relativo aceito para parar antes de provar o ótimo
+    warm_start: bool = True             # parte da solução gulosa ou da execução anterior
+    backend: str = "highs"
+    polish: bool = True                 # busca local sobre soluções não provadas ótimas
+
+
+def get_solver(log_path=None, warm_start=False, options=SolverOptions()):
     """Get the CBC solver with the correct path based on whether we're running as script or frozen executable"""
+    # O PuLP é importado nas funções que o usam para o --help e os erros de argumento não pagarem por ele
+    from pulp import PULP_CBC_CMD, COIN_CMD
+
     if getattr(sys, "frozen", False):
         # Running as compiled executable
         if sys.platform == "win32":
@@ -33,136 +64,347 @@ def get_solver():
         for path in possible_paths:
             if os.path.exists(path):
                 # Create solver with msg=0 to suppress output
-                return COIN_CMD(path=path, msg=0)
+                return COIN_CMD(
+                    path=path,
+                    msg=0,
+                    logPath=log_path,
+                    warmStart=warm_start,
+                    timeLimit=options.time_limit,
+                    gapRel=options.gap,
+                )
 
         # If we get here, try using default solver as fallback
         try:
-            return PULP_CBC_CMD(msg=0)  # Suppress output for default solver too
+            # Suppress output for default solver too
+            return PULP_CBC_CMD(
+                msg=0, logPath=log_path, warmStart=warm_start, timeLimit=options.time_limit, gapRel=options.gap
+            )
         except:
             paths_str = "\n".join(possible_paths)
             raise Exception(f"CBC solver not found. Searched in:\n{paths_str}")
     else:
         # Running as Python script
-        return PULP_CBC_CMD(msg=0)  # Suppress output here too
+        # Suppress output here too
+        return PULP_CBC_CMD(
+            msg=0, logPath=log_path, warmStart=warm_start, timeLimit=options.time_limit, gapRel=options.gap
+        )
 
 
-def process_file(file_path: str, courses_excel_path:str, excel_flag: bool, min_grade:float, preference_flag:bool) -> pd.DataFrame:
-    df_courses = pd.read_excel(courses_excel_path)
+# Incumbentes que o CBC escreve no log (o modelo de maximização chega negado ao CBC)
+CBC_INCUMBENT = re.compile(r"Integer solution of (\S+)|nodes, .*?(\S+) best solution")
 
-    courses = []
 
-    for _, row in df_courses.iterrows():
-        course = row['Course Name']
-        n = row['Number of Classes']
-        for i in range(n):
-            courses.append(f'{course} - Class {i + 1}')
+def follow_cbc_log(log_path, progress, finished, sign):
+    """Report the incumbents CBC writes to its log while the model is being solved"""
+    while not os.path.exists(log_path):
+        if finished.wait(0.05):
+            return
 
-    if excel_flag:
-        df = pd.read_excel(file_path)
-    else:
-        df = pd.read_csv(file_path)
+    pending = ""
+    with open(log_path) as log:
+        while True:
+            line = log.readline()
+            if not line:
+                if finished.is_set():
+                    return
+                time.sleep(0.1)
+                continue
 
-    if "Student ID" not in df.columns:
-        raise Exception('Column "Student ID" is required in the tutors table!')
+            pending += line
+            if not pending.endswith("\n"):
+                continue
 
-    if "Course Name" not in df.columns:
-        raise Exception('Column "Course Name" is required in the tutors table!')
+            match = CBC_INCUMBENT.search(pending)
+            pending = ""
+            if match:
+                incumbent = float(match.group(1) or match.group(2))
+                progress.emit(phase="solve", incumbent=sign * incumbent)
 
-    if "Grade" not in df.columns:
-        raise Exception('Column "Grade" is required in the tutors table!')
 
-    if "Preference" not in df.columns:
-        raise Exception('Column "Preference" is required in the tutors table!')
+def solve_model(modelo, progress=None, warm_start=False, options=SolverOptions()):
+    from pulp import LpMaximize
 
-    df = df[["Student ID", "Course Name", "Grade", "Preference"]]
+    if progress is None or not progress.enabled:
+        return modelo.solve(get_solver(warm_start=warm_start, options=options))
 
-    df = df[df['Grade'] >= min_grade]
-    df_courses = df_courses.loc[df_courses.index.repeat(df_courses['Number of Classes'])].reset_index(drop=True)
-    df_courses['class_number'] = df_courses.groupby('Course Name').cumcount() + 1
-    df_courses = df_courses.drop(columns='Number of Classes')
-    
-    df = pd.merge(df, df_courses, on='Course Name')
-    df['Course Name'] = df['Course Name'] + ' - Class ' + df['class_number'].astype(str)
+    with tempfile.TemporaryDirectory() as directory:
+        log_path = os.path.join(directory, "cbc.log")
+        finished = threading.Event()
+        sign = -1 if modelo.sense == LpMaximize else 1
 
-    # Removendo a coluna auxiliar 'contador', se necessário
-    df = df.drop(columns='class_number').drop_duplicates()
+        watcher = threading.Thread(target=follow_cbc_log, args=(log_path, progress, finished, sign), daemon=True)
+        watcher.start()
+        try:
+            return modelo.solve(get_solver(log_path, warm_start, options))
+        finally:
+            finished.set()
+            watcher.join()
+
+
+def process_file(file_path: str, courses_excel_path:str, excel_flag: bool, min_grade:float, preference_flag:bool, progress=None) -> tuple:
+    return load_inputs(file_path, courses_excel_path, excel_flag, min_grade, preference_flag, progress)
+
+
+class Model(NamedTuple):
+    modelo: object
+    x_ad: dict          # (Student ID, disciplina) -> variavel x
+    y_d: dict           # disciplina -> variavel y, numero de turmas sem monitor
+    tutor_rows: dict    # Student ID -> (disciplinas, restricao)
+    course_rows: dict   # disciplina -> ((monitores, turmas), restricao)
+    tutor_index: dict   # numeração usada nos nomes, nunca reaproveitada
+    course_index: dict
+
+
+class ModelState(NamedTuple):
+    """Model and optimal solution kept by the resident sidecar for incremental re-solves"""
+    model: Optional[Model]  # None quando o HiGHS resolveu: não há objetos do PuLP para reaproveitar
+    preferences: dict
+    solution: frozenset     # pares (Student ID, disciplina) alocados
+    optimal: bool           # falso quando o solver parou pelo limite de tempo ou pelo gap
+
+
+class NodeSolution(NamedTuple):
+    """Course-level solution returned by a backend"""
+    pairs: Optional[list]       # pares (Student ID, nó); None se o limite de tempo chegou sem solução
+    optimal: bool
+    objective: Optional[float]
+    variables: int
+    constraints: int
+
+
+def assemble_model(courses, candidates, preferences, previous: Optional[Model] = None, capacity=None):
+    """Builds the model, reusing the variables and the unchanged constraints of a previous model
+
+    capacity gives the number of identical classes behind each entry of courses (1 by default),
+    which turns the model into a b-matching with one node per course.
+    """
+    from pulp import (
+        LpProblem,
+        LpMaximize,
+        LpVariable,
+        LpBinary,
+        LpInteger,
+        LpAffineExpression,
+        LpConstraint,
+        LpConstraintEQ,
+        LpConstraintLE,
+    )
 
-    candidates = [i.item() for i in df["Student ID"].unique()]
+    modelo = LpProblem("Alocacao_de_Monitores", LpMaximize)
 
-    preferences = {}
+    # Monitores e disciplinas novos recebem números ainda não usados nos nomes das variáveis
+    tutor_index = dict(previous.tutor_index) if previous else {}
+    course_index = dict(previous.course_index) if previous else {}
+    for a in candidates:
+        tutor_index.setdefault(a, len(tutor_index))
+    for d in courses:
+        course_index.setdefault(d, len(course_index))
 
-    for candidate in candidates:
-        df_filtered = df[df["Student ID"] == candidate].copy()
+    old_x = previous.x_ad if previous else {}
+    old_y = previous.y_d if previous else {}
+    old_tutor_rows = previous.tutor_rows if previous else {}
+    old_course_rows = previous.course_rows if previous else {}
 
-        preferences[int(candidate)] = {
-            row["Course Name"]: row["Grade"] * np.exp(-0.4 * (row["Preference"] - 1)) if preference_flag == True else row["Grade"] for _, row in df_filtered.iterrows()
-        }
+    # Variaveis de decisao: x so existe para os pares (monitor, disciplina) em que o monitor esta disposto
+    position = {d: j for j, d in enumerate(courses)}
+    capacity = capacity or {}
+    y_d = {}
+    for d in courses:
+        n = capacity.get(d, 1)
+        if d in old_y and old_y[d].upBound == n:
+            y_d[d] = old_y[d]
+        else:
+            y_d[d] = LpVariable(f"y_{course_index[d]}", lowBound=0, upBound=n, cat=LpInteger)
+    x_ad = {}
 
-    course_candidates = {}
+    objective = []
+    course_tutors = {d: [] for d in courses}
+    tutor_rows = {}
 
-    for candidate in candidates:
-        for course in courses:
-            if course in preferences[candidate].keys():
-                course_candidates[(candidate, course)] = 1
+    for a in candidates:
+        tutor_courses = tuple(sorted(preferences[a], key=position.__getitem__))
+        for d in tutor_courses:
+            x = old_x.get((a, d))
+            if x is None:
+                x = LpVariable(f"x_{tutor_index[a]}_{course_index[d]}", cat=LpBinary)
+            x_ad[(a, d)] = x
+            objective.append((x, preferences[a][d]))
+            course_tutors[d].append(a)
+
+        # Cada monitor pode ser alocado a no maximo uma disciplina
+        if tutor_courses:
+            old = old_tutor_rows.get(a)
+            if old is not None and old[0] == tutor_courses:
+                constraint = old[1]
             else:
-                course_candidates[(candidate, course)] = 0
+                row = LpAffineExpression([(x_ad[(a, d)], 1) for d in tutor_courses])
+                constraint = LpConstraint(row, LpConstraintLE, f"Restricao_monitor_{tutor_index[a]}", 1)
+            tutor_rows[a] = (tutor_courses, constraint)
+            modelo += constraint
 
-    return courses, candidates, preferences, course_candidates
+    # Funcao objetivo
+    objective.extend((y_d[d], -1) for d in courses)
+    modelo.setObjective(LpAffineExpression(objective))
 
+    # Cada turma deve ter no maximo um monitor ou nao ter monitor
+    course_rows = {}
+    for d in courses:
+        key = (tuple(course_tutors[d]), capacity.get(d, 1))
+        old = old_course_rows.get(d)
+        if old is not None and old[0] == key:
+            constraint = old[1]
+        else:
+            row = LpAffineExpression([(y_d[d], 1), *((x_ad[(a, d)], 1) for a in key[0])])
+            constraint = LpConstraint(row, LpConstraintEQ, f"Restricao_disciplina_{course_index[d]}", key[1])
+        course_rows[d] = (key, constraint)
+        modelo += constraint
+
+    return Model(modelo, x_ad, y_d, tutor_rows, course_rows, tutor_index, course_index)
+
+
+def solve_highs(courses, candidates, preferences, capacity, progress=None, options=SolverOptions(), cancel=None):
+    """Solves the course-level model in process with HiGHS (scipy.optimize.milp)
+
+    The model is the one of assemble_model, built directly as sparse arrays: no LP file,
+    no solver process and no solution file to read back. Its matrix is the incidence matrix
+    of a bipartite graph plus slack columns, so the basic optimum of the LP relaxation is
+    already integer; the branch and bound only runs if it is not.
+    """
+    # Importado só aqui, como no assignment: sem o scipy o CBC continua disponível
+    import numpy as np
+    from scipy.optimize import Bounds, LinearConstraint, milp
+    from scipy.sparse import csr_array
+
+    position = {d: j for j, d in enumerate(courses)}
+    pairs = [(a, d) for a in candidates for d in sorted(preferences[a], key=position.__getitem__)]
+    n_pairs, n_tutors, n_courses = len(pairs), len(candidates), len(courses)
+    tutor_position = {a: i for i, a in enumerate(candidates)}
+
+    scores = np.fromiter((preferences[a][d] for a, d in pairs), dtype=float, count=n_pairs)
+    pair_tutors = np.fromiter((tutor_position[a] for a, _ in pairs), dtype=np.int64, count=n_pairs)
+    pair_courses = np.fromiter((position[d] for _, d in pairs), dtype=np.int64, count=n_pairs)
+    slots = np.fromiter((capacity.get(d, 1) for d in courses), dtype=float, count=n_courses)
+
+    # Colunas: um x por par e depois um y por disciplina; linhas: uma por monitor
+    # (no máximo uma turma) e depois uma por disciplina (turmas com monitor + sem monitor = turmas)
+    pair_columns = np.arange(n_pairs)
+    course_columns = n_pairs + np.arange(n_courses)
+    rows = np.concatenate([pair_tutors, n_tutors + pair_courses, n_tutors + np.arange(n_courses)])
+    columns = np.concatenate([pair_columns, pair_columns, course_columns])
+    matrix = csr_array((np.ones(len(rows)), (rows, columns)), shape=(n_tutors + n_courses, n_pairs + n_courses))
+    constraints = LinearConstraint(
+        matrix, np.concatenate([np.full(n_tutors, -np.inf), slots]), np.concatenate([np.ones(n_tutors), slots])
+    )
 
-def run(courses, candidates, preferences, course_candidates):
-    modelo = LpProblem("Alocacao_de_Monitores", LpMaximize)
+    n_variables, n_constraints = n_pairs + n_courses, n_tutors + n_courses
+    if progress is not None:
+        progress.phase("solve", variables=n_variables, constraints=n_constraints)
+
+    # O milp minimiza: notas negadas e +1 por turma sem monitor. Sem gap, o ótimo é provado
+    # como no CBC, em vez do gap relativo padrão de 1e-4 do HiGHS
+    highs_options = {"disp": False, "mip_rel_gap": options.gap or 0.0}
+    start = time.time()
+
+    def solve(integrality):
+        # As duas resoluções dividem o mesmo limite de tempo
+        if options.time_limit is not None:
+            highs_options["time_limit"] = max(options.time_limit - (time.time() - start), 0.0)
+        return milp(
+            np.concatenate([-scores, np.ones(n_courses)]),
+            integrality=integrality,
+            bounds=Bounds(0, np.concatenate([np.ones(n_pairs), slots])),
+            constraints=constraints,
+            options=highs_options,
+        )
 
-    # Variaveis de decisao
-    x_ad = LpVariable.dicts(
-        "x", [(a, d) for a in candidates for d in courses], cat=LpBinary
-    )
-    y_d = LpVariable.dicts("y", courses, cat=LpBinary)
+    # O ótimo da relaxação é o ótimo do modelo inteiro, com ou sem gap pedido
+    result = solve(np.zeros(n_variables))
+    if result.status == 1:
+        # O limite de tempo acabou já na relaxação: não sobra tempo para o modelo inteiro
+        return NodeSolution(None, False, None, n_variables, n_constraints)
+    if result.status == 0 and np.all(np.abs(result.x - np.round(result.x)) < 1e-6):
+        optimal = True
+    else:
+        check_cancel(cancel)
+        result = solve(np.ones(n_variables))
+        optimal = result.status == 0 and not options.gap
 
-    # Funcao objetivo
-    modelo += lpSum(
-        preferences[a][d] * x_ad[(a, d)] for a in candidates for d in courses if d in preferences[a].keys()
-    ) - lpSum(y_d[d] for d in courses)
+    # Status 1: limite de tempo, com ou sem uma solução viável
+    if result.x is None:
+        if result.status == 1:
+            return NodeSolution(None, False, None, n_variables, n_constraints)
+        raise Exception(f"HiGHS status: {result.message}")
 
-    # Restrições
-    # Cada disciplina deve ter no maximo um monitor ou nao ter monitor
-    for d in courses:
-        modelo += (
-            lpSum(x_ad[(a, d)] for a in candidates) + y_d[d] == 1,
-            f"Restricao_disciplina_{d}",
-        )
+    chosen = np.flatnonzero(result.x[:n_pairs] > 0.5).tolist()
+    return NodeSolution([pairs[k] for k in chosen], optimal, -result.fun, n_variables, n_constraints)
 
-    # Cada monitor pode ser alocado a no maximo uma disciplina
-    for a in candidates:
-        modelo += lpSum(x_ad[(a, d)] for d in courses) <= 1, f"Restricao_monitor_{a}"
 
-    # Um monitor so pode ser alocado a uma disciplina se ele estiver disposto (s_{ad} = 1)
-    for a in candidates:
-        for d in courses:
-            modelo += (
-                x_ad[(a, d)] <= course_candidates[(a, d)],
-                f"Restricao_disposicao_{a}_{d}",
-            )
+def solve_cbc(courses, candidates, preferences, capacity, previous_model=None, incumbent=None, progress=None, options=SolverOptions()):
+    """Solves the course-level model with CBC through PuLP, patching the model of the previous run
+
+    When the time limit stops CBC without a solution, the incumbent comes back unproven.
+    Returns the solution and the PuLP model, kept for the next incremental run.
+    """
+    from pulp import LpSolutionIntegerFeasible, LpSolutionOptimal, LpStatus, value
+
+    model = assemble_model(courses, candidates, preferences, previous_model, capacity)
+    modelo = model.modelo
+    if incumbent is not None:
+        set_initial_solution(model, incumbent)
+
+    if progress is not None:
+        progress.phase("solve", variables=modelo.numVariables(), constraints=modelo.numConstraints())
 
     # Get the appropriate solver with better error handling
     try:
-        solver = get_solver()
-        status = modelo.solve(solver)
-        if status != 1:  # 1 means optimal solution found
-            raise Exception(f"Solver status: {LpProblem.status[modelo.status]}")
+        status = solve_model(modelo, progress, incumbent is not None, options)
     except Exception as e:
         raise Exception(f"Error solving model: {str(e)}")
+    # Com limite de tempo o CBC pode parar com uma solução viável ainda não provada ótima
+    if status != 1 or modelo.sol_status not in (LpSolutionOptimal, LpSolutionIntegerFeasible):
+        # ou parar cedo sem guardar a solução inicial, e o PuLP informa "Infeasible"
+        if options.time_limit is not None and incumbent is not None:
+            return NodeSolution(list(incumbent), False, None, modelo.numVariables(), modelo.numConstraints()), model
+        raise Exception(f"Error solving model: Solver status: {LpStatus[modelo.status]}")
+    optimal = modelo.sol_status == LpSolutionOptimal and not options.gap
+
+    pairs = [pair for pair, x in model.x_ad.items() if x.varValue == 1]
+    solution = NodeSolution(pairs, optimal, value(modelo.objective), modelo.numVariables(), modelo.numConstraints())
+    return solution, model
 
+
+def build_model(courses, candidates, preferences):
+    model = assemble_model(courses, candidates, preferences)
+    return model.modelo, model.x_ad, model.y_d
+
+
+def solution_still_optimal(previous: ModelState, preferences):
+    """Sensitivity check: the previous optimum stays optimal if its pairs kept or raised their
+    scores and every other pair already existed with the same or a lower score"""
+    if not previous.optimal:
+        return False
+
+    for a, d in previous.solution:
+        if preferences.get(a, {}).get(d, float("-inf")) < previous.preferences[a][d]:
+            return False
+
+    for a, options in preferences.items():
+        old_options = previous.preferences.get(a, {})
+        for d, score in options.items():
+            if (a, d) not in previous.solution and (d not in old_options or score > old_options[d]):
+                return False
+
+    return True
+
+
+def build_results(courses, candidates, preferences, assigned_pairs):
     result_rows = []
 
     # Monitores alocados
-    alocacoes = []
-    for a in candidates:
-        for d in courses:
-            if x_ad[(a, d)].varValue == 1:
-                alocacoes.append(
-                    (a, d, preferences.get(a, {}).get(d, {}), preferences.get(a, {}))
-                )
+    alocacoes = [
+        (a, d, preferences.get(a, {}).get(d, {}), preferences.get(a, {}))
+        for a, d in assigned_pairs
+    ]
     for aloc in alocacoes:
         result_rows.append(
             {
@@ -174,7 +416,8 @@ def run(courses, candidates, preferences, course_candidates):
         )
 
     # Disciplinas sem monitores
-    disciplinas_sem_monitor = [d for d in courses if y_d[d].varValue == 1]
+    allocated_courses = {d for _, d in assigned_pairs}
+    disciplinas_sem_monitor = [d for d in courses if d not in allocated_courses]
 
     for d in disciplinas_sem_monitor:
         result_rows.append(
@@ -185,57 +428,400 @@ def run(courses, candidates, preferences, course_candidates):
                 "preference": "No preference",
             }
         )
-    df = pd.DataFrame.from_records(result_rows, columns=['class', 'students', 'grade', 'preference'])
+    grades = [float(row["grade"]) for row in result_rows if row["grade"] != "No preference"]
 
     metrics = {
         "number_classes_allocated": len(alocacoes),
         "total_classes": len(disciplinas_sem_monitor) + len(alocacoes),
-        "average_grade": df[df['grade'] != 'No preference']['grade'].astype(float).mean(),
+        "average_grade": sum(grades) / len(grades) if grades else None,
+    }
+
+    return metrics, result_rows
+
+
+def set_initial_solution(model: Model, assigned_pairs):
+    """MIP start for CBC; pairs that are no longer in the model are ignored"""
+    assigned_pairs = set(assigned_pairs)
+    assigned = {}
+    for pair, x in model.x_ad.items():
+        chosen = pair in assigned_pairs
+        x.setInitialValue(1 if chosen else 0)
+        if chosen:
+            assigned[pair[1]] = assigned.get(pair[1], 0) + 1
+    for d, y in model.y_d.items():
+        y.setInitialValue(max(y.upBound - assigned.get(d, 0), 0))
+
+
+def run_incremental(
+    courses, candidates, preferences, previous: Optional[ModelState] = None, progress=None, options=SolverOptions(), cancel=None
+):
+    """Solves the model, starting from the state of a previous run when there is one
+
+    cancel is checked between the solves, since a running solver cannot be interrupted.
+    Returns the metrics, the result rows and the state for the next run.
+    """
+    position = {d: j for j, d in enumerate(courses)}
+
+    if previous is not None and solution_still_optimal(previous, preferences):
+        # Nenhuma alteração pode superar a solução anterior: não é preciso resolver de novo
+        assigned_pairs = [
+            (a, d)
+            for a in candidates
+            for d in sorted(preferences[a], key=position.__getitem__)
+            if (a, d) in previous.solution
+        ]
+        if progress is not None:
+            progress.phase("postprocess", objective=assignment_objective(courses, preferences, assigned_pairs))
+        metrics, result_rows = build_results(courses, candidates, preferences, assigned_pairs)
+        # Nenhum modelo foi resolvido nesta execução
+        metrics.update(
+            {
+                "incremental": "reused",
+                "solver_status": "optimal",
+                "warm_start": "none",
+                "backend": "none",
+                "variables": 0,
+                "constraints": 0,
+                "local_search_moves": 0,
+            }
+        )
+        state = ModelState(previous.model, preferences, previous.solution, True)
+        return metrics, result_rows, state
+
+    if progress is not None:
+        progress.phase("build")
+    # Turmas idênticas de uma disciplina viram um só nó com capacidade, sem soluções simétricas
+    groups, nodes, node_preferences, capacity = aggregate(courses, candidates, preferences)
+    node_of = {d: group[0] for group in groups for d in group}
+
+    def initial_solution():
+        # A alocação anterior, sem os pares que deixaram de existir, ou a gulosa
+        if previous is not None:
+            pairs = [(a, node_of[d]) for a, d in previous.solution if d in node_of and d in preferences.get(a, {})]
+            return pairs, "previous"
+        if not options.warm_start:
+            return None, "none"
+        incumbent = greedy_assignment(courses, candidates, preferences)
+        if progress is not None:
+            progress.emit(force=True, phase="build", incumbent=assignment_objective(courses, preferences, incumbent))
+        return [(a, node_of[d]) for a, d in incumbent], "greedy"
+
+    backend, fallback, model, warm_start = options.backend, None, None, "none"
+    check_cancel(cancel)
+    if backend == "highs":
+        # O HiGHS não recebe solução inicial; ela só é usada se o limite de tempo chegar sem solução
+        try:
+            solution = solve_highs(nodes, candidates, node_preferences, capacity, progress, options, cancel)
+        except Exception as e:
+            check_cancel(cancel)
+            # Sem o scipy.optimize.milp ou com erro do HiGHS, o CBC resolve o mesmo modelo
+            backend, fallback = "cbc", str(e)
+        else:
+            if solution.pairs is None:
+                incumbent, warm_start = initial_solution()
+                if incumbent is None:
+                    raise Exception("Error solving model: time limit reached without a feasible solution")
+                solution = solution._replace(pairs=incumbent, objective=None)
+
+    if backend == "cbc":
+        check_cancel(cancel)
+        incumbent, warm_start = initial_solution()
+        previous_model = previous.model if previous is not None else None
+        solution, model = solve_cbc(nodes, candidates, node_preferences, capacity, previous_model, incumbent, progress, options)
+
+    assigned_pairs = merge_pairs(candidates, courses, [expand(groups, solution.pairs)])
+
+    # Uma solução interrompida pelo limite de tempo ainda pode melhorar com a busca local
+    moves = 0
+    check_cancel(cancel)
+    if not solution.optimal and options.polish:
+        if progress is not None:
+            progress.phase("polish")
+        assigned_pairs, moves = polish_pairs(courses, candidates, preferences, assigned_pairs)
+
+    if progress is not None:
+        objective = solution.objective
+        if objective is None or moves:
+            objective = assignment_objective(courses, preferences, assigned_pairs)
+        progress.phase("postprocess", objective=objective)
+
+    metrics, result_rows = build_results(courses, candidates, preferences, assigned_pairs)
+    metrics.update(
+        {
+            # Só o CBC altera o modelo anterior; o HiGHS monta as matrizes de novo, o que é barato
+            "incremental": "cold" if previous is None else "patched" if model is not None and previous.model is not None else "rebuilt",
+            "solver_status": "optimal" if solution.optimal else "feasible",
+            "warm_start": warm_start,
+            "backend": backend,
+            "variables": solution.variables,
+            "constraints": solution.constraints,
+            "local_search_moves": moves,
+        }
+    )
+    if fallback is not None:
+        metrics["fallback"] = fallback
+
+    return metrics, result_rows, ModelState(model, preferences, frozenset(assigned_pairs), solution.optimal)
+
+
+def run(courses, candidates, preferences, progress=None, options=SolverOptions()):
+    metrics, result_rows, _ = run_incremental(courses, candidates, preferences, progress=progress, options=options)
+    return metrics, result_rows
+
+
+def solve_component(component, cancel, options=SolverOptions()):
+    """Solves one connected component, returning its pairs and stats without the PuLP objects so it can run in a pool"""
+    courses, candidates, preferences, _ = component
+    metrics, _, state = run_incremental(courses, candidates, preferences, options=options, cancel=cancel)
+    stats = {key: metrics[key] for key in ("backend", "warm_start", "variables", "constraints", "local_search_moves")}
+    stats["optimal"] = state.optimal
+    return sorted(state.solution), stats
+
+
+def run_components(inputs, components, progress=None, cancel=None, options=SolverOptions(), workers=None, previous=None):
+    """Solves the connected components separately and merges them into the results of the whole model
+
+    Trivial components are resolved directly and the others are grouped into one batch per
+    worker, since a CBC call per small component costs more than solving it. previous maps
+    the classes of each component solved to optimality to its preferences and pairs;
+    components that came back unchanged reuse those pairs without solving again.
+    Returns the metrics, the result rows and the map for the next run.
+    """
+    courses, candidates, preferences, _ = inputs
+    previous = previous or {}
+    summary = summarize(components)
+    if progress is not None:
+        progress.phase("decompose", **summary)
+
+    solutions = {}
+    for i, (component_courses, _, component_preferences, _) in enumerate(components):
+        saved = previous.get(tuple(component_courses))
+        if saved is not None and saved[0] == component_preferences:
+            solutions[i] = (saved[1], True)
+
+    remaining = [i for i in range(len(components)) if i not in solutions]
+    hard = []
+    for i in remaining:
+        if is_trivial(components[i]):
+            solutions[i] = (solve_trivial(components[i]), True)
+        else:
+            hard.append(i)
+
+    batches = [[hard[j] for j in batch] for batch in batch_components([components[i] for i in hard], workers)]
+    if progress is not None:
+        progress.phase("solve", batches=len(batches))
+    solved = solve_components(
+        [merge_components([components[i] for i in batch]) for batch in batches],
+        partial(solve_component, options=options),
+        workers,
+        progress,
+        cancel,
+    )
+
+    # Devolve os pares de cada lote aos seus componentes
+    for batch, (pairs, stats) in zip(batches, solved):
+        owner = {d: i for i in batch for d in components[i][0]}
+        for i in batch:
+            solutions[i] = ([], stats["optimal"])
+        for a, d in pairs:
+            solutions[owner[d]][0].append((a, d))
+
+    assigned_pairs = merge_pairs(candidates, courses, [pairs for pairs, _ in solutions.values()])
+    if progress is not None:
+        progress.phase("postprocess", objective=assignment_objective(courses, preferences, assigned_pairs))
+
+    optimal = all(optimal for _, optimal in solutions.values())
+    reused = len(components) - len(remaining)
+    # O backend pedido, ou o CBC se algum lote precisou dele como reserva
+    backends = {stats["backend"] for _, stats in solved}
+    warm_starts = {stats["warm_start"] for _, stats in solved}
+    metrics, result_rows = build_results(courses, candidates, preferences, assigned_pairs)
+    metrics.update(
+        {
+            "incremental": "reused" if not remaining else "partial" if reused else "cold",
+            "solver_status": "optimal" if optimal else "feasible",
+            "warm_start": "greedy" if "greedy" in warm_starts else "none",
+            "backend": "cbc" if "cbc" in backends else options.backend if backends else "none",
+            "components": {**summary, "batches": len(batches), "reused": reused},
+            # Somados sobre os lotes resolvidos nesta execução
+            "variables": sum(stats["variables"] for _, stats in solved),
+            "constraints": sum(stats["constraints"] for _, stats in solved),
+            "local_search_moves": sum(stats["local_search_moves"] for _, stats in solved),
+        }
+    )
+
+    state = {
+        tuple(components[i][0]): (components[i][2], pairs)
+        for i, (pairs, component_optimal) in solutions.items()
+        if component_optimal
     }
+    return metrics, result_rows, state
+
+
+def solve_request(inputs, params, progress, cancel, state):
+    """Entry point of the resident server mode; state keeps the last model between requests"""
+    courses, candidates, preferences, _ = inputs
+    options = SolverOptions(
+        params.get("time_limit"),
+        params.get("gap"),
+        params.get("warm_start", True),
+        params.get("backend", "highs"),
+        params.get("polish", True),
+    )
+    incremental = params.get("incremental", True)
 
+    # Componentes independentes do grafo monitor-turma são resolvidos separadamente
+    components = find_components(*inputs) if params.get("decompose", True) else []
+    if len(components) > 1:
+        previous = state.pop("components", None) if incremental else None
+        try:
+            metrics, result_rows, components_state = run_components(
+                inputs, components, progress, cancel, options, params.get("workers"), previous
+            )
+            # Uma requisição cancelada não deixa seu modelo para a próxima
+            check_cancel(cancel)
+        except Exception:
+            if previous is not None:
+                state.setdefault("components", previous)
+            raise
+        state["components"] = components_state
+        return metrics, result_rows
+
+    # Retira o modelo do estado para que uma requisição simultânea não o altere ao mesmo tempo
+    previous = state.pop("model", None) if incremental else None
+    try:
+        metrics, result_rows, model_state = run_incremental(courses, candidates, preferences, previous, progress, options, cancel)
+        check_cancel(cancel)
+    except Exception:
+        if previous is not None:
+            state.setdefault("model", previous)
+        raise
+    state["model"] = model_state
     return metrics, result_rows
 
 
+def parse_arguments(argv):
+    parser = ArgumentParser(description="Allocate tutors to classes with integer programming.")
+    parser.add_argument("students_excel_path")
+    parser.add_argument("courses_excel_path")
+    parser.add_argument("min_grade", type=float)
+    parser.add_argument("preference_flag")
+    # Parâmetros do algoritmo genético que o aplicativo envia para todos os algoritmos
+    parser.add_argument("unused", nargs="*", help=argparse.SUPPRESS)
+    parser.add_argument(
+        "--time-limit", type=float, default=None, help="Stop CBC after N seconds and return the best schedule found"
+    )
+    parser.add_argument(
+        "--gap", type=float, default=None, help="Stop CBC once the relative optimality gap is below this value"
+    )
+    parser.add_argument(
+        "--no-warm-start", action="store_true", help="Do not start CBC from the greedy schedule"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="highs",
+        help="Solve in process with HiGHS (falls back to CBC if it is unavailable), or with the CBC executable",
+    )
+    parser.add_argument(
+        "--no-polish",
+        action="store_true",
+        help="Do not run local search on a schedule the time limit or the gap kept from being proven optimal",
+    )
+    parser.add_argument(
+        "--no-decompose", action="store_true", help="Solve the whole model at once instead of one component at a time"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Solve independent components in a pool of N processes (default: all CPUs)"
+    )
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=None,
+        help="Write JSON progress lines to stdout at most once every N seconds",
+    )
+    parser.add_argument(
+        "--profile", action="store_true", help="Write a cProfile dump (pstats) of the run next to the input tables"
+    )
+    parser.add_argument(
+        "--scenarios",
+        default=None,
+        help="JSON file with a list of scenarios (name, min_grade, preference_flag, params) to solve and compare",
+    )
+    parser.add_argument(
+        "--scenario-workers", type=int, default=None, help="Solve the scenarios in a pool of N processes (default: all CPUs)"
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=OUTPUT_FORMATS,
+        default="compact",
+        help="Tutors listed once and referenced by index (compact, columnar), or the previous row format (legacy)",
+    )
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    if len(sys.argv) < 7:
-        result = {"success": False, "error": "No file path provided"}
-        sys.stderr.write(json.dumps(result))
-        sys.exit(1)
+    # Necessário para o pool de processos no executável do PyInstaller
+    freeze_support()
+
+    # Modo residente: lê requisições JSON do stdin até o aplicativo fechar o pipe
+    if sys.argv[1:2] == ["--serve"]:
+        serve(solve_request, "integer_programming", sys.argv[1:], deterministic=True)
+        sys.exit(0)
 
     try:
         start = time.time()
+        # Antes do redirecionamento, para que o --help e os erros de argumentos apareçam
+        args = parse_arguments(sys.argv[1:])
+
         # Redirect stdout to devnull during computation to suppress CBC output
         original_stdout = sys.stdout
         
         sys.stdout = open(os.devnull, "w")
 
-        students_excel_path = sys.argv[1]
-        courses_excel_path = sys.argv[2]
-        min_grade = float(sys.argv[3])
-        preference_flag = bool(sys.argv[4])
-
-        # min_grade = 0
-        # preference_flag = True
+        students_excel_path = args.students_excel_path
+        courses_excel_path = args.courses_excel_path
+        min_grade = args.min_grade
+        preference_flag = bool(args.preference_flag)
 
         excel_flag = True
         if students_excel_path.endswith(".csv"):
             excel_flag = False
 
-        courses, candidates, preferences, course_candidates = (
-            process_file(students_excel_path, courses_excel_path, excel_flag, min_grade, preference_flag)
-        )
-        metrics, result_rows = run(
-            courses, candidates, preferences, course_candidates
-        )
+        profile = profile_path(students_excel_path, "integer_programming") if args.profile else None
+        progress = ProgressReporter(args.progress_interval)
+        progress.phase("load")
+        params = {
+            "time_limit": args.time_limit,
+            "gap": args.gap,
+            "warm_start": not args.no_warm_start,
+            "backend": args.backend,
+            "polish": not args.no_polish,
+            "decompose": not args.no_decompose,
+            "workers": args.workers,
+        }
+        with profiled(profile):
+            if args.scenarios is not None:
+                # Modo de cenários: as tabelas são lidas uma vez para todos os cenários do arquivo
+                data = run_file(solve_request, students_excel_path, courses_excel_path, excel_flag, args.scenarios, min_grade, preference_flag, params, args.scenario_workers, progress, args.output_format)
+                metrics = data
+            else:
+                inputs = process_file(students_excel_path, courses_excel_path, excel_flag, min_grade, preference_flag, progress)
+                metrics, result_rows = solve_request(inputs, params, progress, None, {})
+                data = {"metrics": metrics, **encode_results(result_rows, args.output_format)}
         end = time.time()
 
         metrics['execution_time'] = end - start
+        metrics['timings'] = progress.timings()
+        metrics['peak_memory_mb'] = peak_memory_mb()
+        if profile is not None:
+            metrics['profile'] = profile
 
         # Restore stdout before writing our result
         sys.stdout = original_stdout
 
-        result = {"success": True, "data": {"metrics": metrics, "results": result_rows}}
-        sys.stdout.write(json.dumps(result))
+        result = {"success": True, "data": data}
+        write_line(result)
         sys.exit(0)
 
     except Exception as e:
@@ -0,0 +1,180 @@
+import csv
+import io
+import json
+import sys
+from typing import NamedTuple
+
+
+REQUIRED_COLUMNS = ["Student ID", "Course Name", "Grade", "Preference"]
+
+
+# As tabelas são colunares: um dicionário de coluna para lista de valores.
+# Qualquer objeto indexável por coluna (um DataFrame, por exemplo) também serve.
+
+
+def parse_value(text: str):
+    """Convert a CSV cell the way a spreadsheet would store it"""
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
+
+
+def rows_to_table(rows) -> dict:
+    """First row holds the headers; blank rows are skipped"""
+    rows = iter(rows)
+    headers = next(rows, ())
+    columns = [(index, header) for index, header in enumerate(headers) if header is not None]
+    table = {header: [] for _, header in columns}
+
+    for row in rows:
+        if all(cell is None or cell == "" for cell in row):
+            continue
+        for index, header in columns:
+            table[header].append(row[index] if index < len(row) else None)
+
+    return table
+
+
+def read_excel(path: str) -> dict:
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        return rows_to_table(workbook.worksheets[0].iter_rows(values_only=True))
+    finally:
+        workbook.close()
+
+
+def parse_csv(file) -> dict:
+    reader = csv.reader(file)
+    headers = next(reader, [])
+    return rows_to_table([headers, *([parse_value(cell) if cell != "" else None for cell in row] for row in reader)])
+
+
+def read_csv(path: str) -> dict:
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        return parse_csv(file)
+
+
+def table_from_json(data) -> dict:
+    """Accepts a table as columns ({column: [values]}), as a list of row objects or as CSV text"""
+    if isinstance(data, str):
+        return parse_csv(io.StringIO(data, newline=""))
+    if isinstance(data, dict):
+        return data
+    columns = dict.fromkeys(column for row in data for column in row)
+    return {column: [row.get(column) for row in data] for column in columns}
+
+
+def read_tables(file_path: str, courses_excel_path: str, excel_flag: bool):
+    courses_table = read_excel(courses_excel_path)
+
+    if excel_flag:
+        tutors_table = read_excel(file_path)
+    else:
+        tutors_table = read_csv(file_path)
+
+    return tutors_table, courses_table
+
+
+def expand_courses(courses_table) -> list:
+    names = list(courses_table["Course Name"])
+    counts = [int(n) for n in courses_table["Number of Classes"]]
+    return [f"{course} - Class {i + 1}" for course, n in zip(names, counts) for i in range(n)]
+
+
+class PreparedTables(NamedTuple):
+    """Columns of the tutors table as arrays, shared by every min_grade and preference_flag"""
+    courses: list
+    n_classes: dict
+    student_ids: list
+    names: list
+    grades: object             # np.ndarray de float
+    preference_values: object  # np.ndarray de float
+
+
+def prepare_tables(tutors_table, courses_table) -> PreparedTables:
+    import numpy as np
+
+    courses = expand_courses(courses_table)
+
+    for column in REQUIRED_COLUMNS:
+        if column not in tutors_table:
+            raise Exception(f'Column "{column}" is required in the tutors table!')
+
+    # Disciplinas repetidas na tabela somam as turmas, numeradas em sequência
+    n_classes = {}
+    for name, n in zip(courses_table["Course Name"], courses_table["Number of Classes"]):
+        n_classes[name] = n_classes.get(name, 0) + int(n)
+
+    return PreparedTables(
+        courses,
+        n_classes,
+        np.asarray(tutors_table["Student ID"]).tolist(),
+        np.asarray(tutors_table["Course Name"]).tolist(),
+        np.asarray(tutors_table["Grade"], dtype=float),
+        np.asarray(tutors_table["Preference"], dtype=float),
+    )
+
+
+def filter_inputs(prepared: PreparedTables, min_grade: float, preference_flag: bool):
+    """Inputs of the solvers for one min_grade and preference_flag"""
+    import numpy as np
+
+    courses, n_classes, student_ids, names, grades, preference_values = prepared
+
+    # Peso da preferência aplicado à coluna inteira de uma vez
+    if preference_flag == True:
+        scores = grades * np.exp(-0.4 * (preference_values - 1))
+    else:
+        scores = grades
+
+    # Uma linha por turma de cada disciplina, na ordem da tabela de monitores, sem repetições
+    rows = {}
+    for index in np.flatnonzero(grades >= min_grade).tolist():
+        name = names[index]
+        for class_number in range(1, n_classes.get(name, 0) + 1):
+            key = (student_ids[index], f"{name} - Class {class_number}", grades[index], preference_values[index])
+            rows.setdefault(key, scores[index])
+
+    candidates = list(dict.fromkeys(student_id for student_id, _, _, _ in rows))
+
+    preferences = {int(candidate): {} for candidate in candidates}
+    for (student_id, name, _, _), score in rows.items():
+        preferences[int(student_id)][name] = float(score)
+
+    da = {course: [] for course in courses}
+    for student_id, name, _, _ in sorted(rows, key=lambda row: row[0]):
+        da[name].append(student_id)
+
+    return courses, candidates, preferences, da
+
+
+def build_inputs(tutors_table, courses_table, min_grade: float, preference_flag: bool):
+    return filter_inputs(prepare_tables(tutors_table, courses_table), min_grade, preference_flag)
+
+
+def load_payload(payload: dict, min_grade: float, preference_flag: bool, progress=None):
+    """In-memory loader for the tables sent by the application, {"students": table, "courses": table}"""
+    tutors_table, courses_table = table_from_json(payload["students"]), table_from_json(payload["courses"])
+    if progress is not None:
+        progress.phase("preprocess")
+    return build_inputs(tutors_table, courses_table, min_grade, preference_flag)
+
+
+def load_tables(file_path: str, courses_excel_path: str, excel_flag: bool):
+    """Tutors and courses tables from the files; "-" as the path reads both as JSON from stdin"""
+    if file_path == "-":
+        payload = json.load(sys.stdin)
+        return table_from_json(payload["students"]), table_from_json(payload["courses"])
+    return read_tables(file_path, courses_excel_path, excel_flag)
+
+
+def load_inputs(file_path: str, courses_excel_path: str, excel_flag: bool, min_grade: float, preference_flag: bool, progress=None):
+    tutors_table, courses_table = load_tables(file_path, courses_excel_path, excel_flag)
+    if progress is not None:
+        progress.phase("preprocess")
+    return build_inputs(tutors_table, courses_table, min_grade, preference_flag)
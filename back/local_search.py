@@ -0,0 +1,160 @@
+import time
+from math import hypot
+from typing import NamedTuple
+
+
+class Neighborhood(NamedTuple):
+    """Candidates of each class and scores of each tutor, by index; tutor 0 is "no tutor" """
+    candidates: list    # turma -> [(monitor, nota)]
+    scores: list        # monitor -> {turma: nota}
+
+
+def problem_neighborhood(problem):
+    """Neighborhood of a genetic.Problem, with the tutor and class indices of its genomes"""
+    scores = [{} for _ in range(len(problem.tutor_ids))]
+    candidates = []
+    for j in range(len(problem.n_options)):
+        tutors = problem.options[j, :problem.n_options[j]].tolist()
+        values = problem.score[tutors, j].tolist()
+        candidates.append(list(zip(tutors, values)))
+        for i, value in zip(tutors, values):
+            scores[i][j] = value
+    return Neighborhood(candidates, scores)
+
+
+def preference_neighborhood(courses, candidates, preferences):
+    """Neighborhood of the inputs of the solvers; tutor i is candidates[i - 1]"""
+    course_index = {d: j for j, d in enumerate(courses)}
+    scores = [{}] + [{course_index[d]: score for d, score in preferences[a].items()} for a in candidates]
+    by_class = [[] for _ in courses]
+    for i, tutor_scores in enumerate(scores):
+        for j, score in tutor_scores.items():
+            by_class[j].append((i, score))
+    return Neighborhood(by_class, scores)
+
+
+class SearchState:
+    """A feasible schedule with its used tutors, room count and preference sum kept up to date
+
+    The fitness is the one of genetic.evaluate_population, hypot(10 * rooms, preference sum),
+    so every move is scored in constant time from the two running totals.
+    """
+
+    def __init__(self, genome, neighborhood):
+        self.genome = list(genome)
+        self.neighborhood = neighborhood
+        # Monitor -> turma em que está; o reparo do GA e os solvers garantem um monitor por turma
+        self.holder = {i: j for j, i in enumerate(self.genome) if i != 0}
+        self.rooms = 0
+        self.preference = 0.0
+        for j, i in enumerate(self.genome):
+            score = neighborhood.scores[i].get(j) if i != 0 else None
+            if score is None:
+                self.genome[j] = 0
+                self.holder.pop(i, None)
+            else:
+                self.rooms += 1
+                self.preference += score
+        self.moves = 0
+
+    def fitness(self):
+        return hypot(10 * self.rooms, self.preference)
+
+    def best_move(self, j):
+        """Best improving move that puts another tutor in class j, or None
+
+        Moves: fill the empty class with an unused candidate, replace its tutor with an
+        unused candidate, swap tutors with another class, or take a tutor from another
+        class when j is empty. Only moves that lose no room and gain preference (or gain
+        a room) are kept, so they also improve the objective of the integer model.
+        """
+        scores = self.neighborhood.scores
+        a = self.genome[j]
+        current = scores[a][j] if a != 0 else 0.0
+        best, best_fitness = None, self.fitness()
+
+        for i, score in self.neighborhood.candidates[j]:
+            if i == a:
+                continue
+            k = self.holder.get(i)
+            if k is None:
+                # Candidato livre: preenche a turma vazia ou substitui o monitor atual
+                rooms, gain, target = (0 if a != 0 else 1), score - current, None
+            elif a == 0:
+                # O monitor troca a turma k pela turma vazia j, e k fica vazia
+                rooms, gain, target = 0, score - scores[i][k], None
+            else:
+                # Troca: o monitor atual de j vai para k, se estiver disposto
+                back = scores[a].get(k)
+                if back is None:
+                    continue
+                rooms, gain, target = 0, score + back - current - scores[i][k], k
+
+            if rooms == 0 and gain <= 1e-12:
+                continue
+            fitness = hypot(10 * (self.rooms + rooms), self.preference + gain)
+            if fitness > best_fitness:
+                best, best_fitness = (i, k, target, rooms, gain), fitness
+
+        return best
+
+    def apply(self, j, move):
+        i, k, target, rooms, gain = move
+        a = self.genome[j]
+        if k is not None:
+            self.genome[k] = a if target is not None else 0
+        if a != 0:
+            if target is not None:
+                self.holder[a] = target
+            else:
+                del self.holder[a]
+        self.genome[j] = i
+        self.holder[i] = j
+        self.rooms += rooms
+        self.preference += gain
+        self.moves += 1
+
+
+def local_search(state, rng=None, max_passes=None, deadline=None):
+    """Best-improvement hill climbing over the classes until a pass makes no move
+
+    Classes are visited in a random order when rng (a numpy Generator) is given; deadline
+    is a time.time() value after which the search stops between classes.
+    Returns the number of passes.
+    """
+    n_classes = len(state.genome)
+    passes = 0
+    while max_passes is None or passes < max_passes:
+        passes += 1
+        order = rng.permutation(n_classes).tolist() if rng is not None else range(n_classes)
+        moved = False
+        for j in order:
+            if deadline is not None and time.time() >= deadline:
+                return passes
+            move = state.best_move(j)
+            if move is not None:
+                state.apply(j, move)
+                moved = True
+        if not moved:
+            break
+    return passes
+
+
+def polish_pairs(courses, candidates, preferences, pairs, time_limit=None):
+    """Local search on a list of (Student ID, class) pairs, such as a time-limited MILP schedule
+
+    Returns the improved pairs, in the order of the candidates, and the number of moves.
+    """
+    deadline = time.time() + time_limit if time_limit is not None else None
+    course_index = {d: j for j, d in enumerate(courses)}
+    tutor_index = {a: i for i, a in enumerate(candidates, start=1)}
+
+    genome = [0] * len(courses)
+    for a, d in pairs:
+        genome[course_index[d]] = tutor_index[a]
+
+    state = SearchState(genome, preference_neighborhood(courses, candidates, preferences))
+    local_search(state, deadline=deadline)
+
+    assigned = sorted((i, j) for j, i in enumerate(state.genome) if i != 0)
+    return [(candidates[i - 1], courses[j]) for i, j in assigned], state.moves
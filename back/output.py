@@ -0,0 +1,84 @@
+# Formatos da resposta: "compact" e "columnar" listam cada monitor uma vez numa tabela
+# própria; "legacy" mantém as preferências do monitor, turma a turma, em cada linha
+OUTPUT_FORMATS = ["compact", "columnar", "legacy"]
+
+
+def course_of(class_name):
+    """Course of a class named "<course> - Class <n>" by expand_courses"""
+    return class_name.rsplit(" - Class ", 1)[0]
+
+
+def course_preferences(preference):
+    """Preferences by course: every class of a course has the same score for a tutor"""
+    courses = {}
+    for class_name, score in preference.items():
+        courses.setdefault(course_of(class_name), score)
+    return courses
+
+
+def encode_results(result_rows, output_format="compact"):
+    """The result rows of a solver in one of OUTPUT_FORMATS, as the fields of the response data
+
+    compact: {"format", "tutors": [{"student", "preference"}], "results": [{"class", "tutor", "grade"}]}
+    where preference is by course instead of by class, tutor is an index into tutors, and
+    tutor and grade are null for classes without a tutor.
+    columnar: the same tables as {column: [values]}.
+    """
+    if output_format == "legacy":
+        return {"results": result_rows}
+    if output_format not in OUTPUT_FORMATS:
+        raise Exception(f"Unknown output format: {output_format}")
+
+    tutor_index = {}
+    tutors = {"student": [], "preference": []}
+    results = {"class": [], "tutor": [], "grade": []}
+    for row in result_rows:
+        index = None
+        if row["student"] != "No tutor":
+            index = tutor_index.get(row["student"])
+            if index is None:
+                index = tutor_index[row["student"]] = len(tutors["student"])
+                tutors["student"].append(row["student"])
+                tutors["preference"].append(course_preferences(row["preference"]))
+
+        results["class"].append(row["class"])
+        results["tutor"].append(index)
+        results["grade"].append(row["grade"] if isinstance(row["grade"], (int, float)) else None)
+
+    if output_format == "compact":
+        tutors = [dict(zip(tutors, values)) for values in zip(*tutors.values())]
+        results = [dict(zip(results, values)) for values in zip(*results.values())]
+
+    return {"format": output_format, "tutors": tutors, "results": results}
+
+
+def decode_results(data):
+    """Result rows in the legacy shape from the data of a response in any of OUTPUT_FORMATS"""
+    if data.get("format") is None:
+        return data["results"]
+
+    tutors, results = data["tutors"], data["results"]
+    if data["format"] == "columnar":
+        tutors = [dict(zip(tutors, values)) for values in zip(*tutors.values())]
+        results = [dict(zip(results, values)) for values in zip(*results.values())]
+
+    # Todas as turmas aparecem nos resultados, então elas dão as turmas de cada disciplina
+    classes = {}
+    for row in results:
+        classes.setdefault(course_of(row["class"]), []).append(row["class"])
+    for names in classes.values():
+        names.sort(key=lambda name: int(name.rsplit(" - Class ", 1)[1]))
+
+    rows = []
+    for row in results:
+        if row["tutor"] is None:
+            rows.append({"class": row["class"], "student": "No tutor", "grade": "No preference", "preference": "No preference"})
+            continue
+
+        tutor = tutors[row["tutor"]]
+        preference = {
+            name: score for course, score in tutor["preference"].items() for name in classes.get(course, [])
+        }
+        grade = "No preference" if row["grade"] is None else row["grade"]
+        rows.append({"class": row["class"], "student": tutor["student"], "grade": grade, "preference": preference})
+    return rows
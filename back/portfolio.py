@@ -0,0 +1,364 @@
+import json
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import time
+from multiprocessing import freeze_support
+
+import genetic
+import integer_programming
+from heuristics import greedy_assignment
+from loader import load_inputs
+from local_search import polish_pairs
+from output import OUTPUT_FORMATS, encode_results
+from progress import ArgumentParser, ProgressReporter, peak_memory_mb, profile_path, profiled, write_line
+from scenarios import objective, run_file
+from server import serve
+
+# Heurística construtiva, algoritmo genético e modelo inteiro, do mais rápido ao exato
+ENGINES = ["greedy", "genetic", "integer_programming"]
+
+# Prazo global padrão, em segundos, e quanto esperar depois dele por quem ainda está terminando
+DEFAULT_DEADLINE = 60.0
+GRACE = 5.0
+
+
+def solve_greedy(inputs, params):
+    courses, candidates, preferences, _ = inputs
+    pairs, moves = polish_pairs(courses, candidates, preferences, greedy_assignment(courses, candidates, preferences))
+    metrics, result_rows = integer_programming.build_results(courses, candidates, preferences, pairs)
+    metrics["local_search_moves"] = moves
+    return metrics, result_rows
+
+
+def solve_genetic(inputs, params):
+    return genetic.solve_request(inputs, params, ProgressReporter(), None, {})
+
+
+def solve_integer_programming(inputs, params):
+    return integer_programming.solve_request(inputs, params, ProgressReporter(), None, {})
+
+
+SOLVERS = {
+    "greedy": solve_greedy,
+    "genetic": solve_genetic,
+    "integer_programming": solve_integer_programming,
+}
+
+
+def run_engine(name, inputs, params, results):
+    """Solves with one engine and puts its outcome in the results queue"""
+    start = time.time()
+    try:
+        metrics, result_rows = SOLVERS[name](inputs, params)
+    except Exception as e:
+        results.put((name, {"status": "failed", "error": str(e), "time": time.time() - start}))
+        return
+
+    outcome = {
+        "status": "finished",
+        "objective": objective(result_rows),
+        # Só o modelo inteiro prova o ótimo; as heurísticas dão apenas soluções viáveis
+        "optimal": name == "integer_programming" and metrics.get("solver_status") == "optimal",
+        "time": time.time() - start,
+        "metrics": metrics,
+        "result_rows": result_rows,
+    }
+    results.put((name, outcome))
+
+
+def run_engine_process(name, inputs, params, results):
+    """Process target of race: run_engine in a process group of its own, which stop_engine can stop"""
+    if hasattr(os, "setpgrp"):
+        os.setpgrp()
+    run_engine(name, inputs, params, results)
+
+
+def stop_engine(process):
+    """Stops an engine process and the solver processes it started, such as CBC
+
+    Without process groups (Windows), or before the engine has created its own, only the
+    engine process itself is terminated.
+    """
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+            return
+        except ProcessLookupError:
+            pass
+    if process.is_alive():
+        process.terminate()
+
+
+class ListQueue(list):
+    """Results of engines run serially, with the put of multiprocessing.Queue"""
+
+    def put(self, item):
+        self.append(item)
+
+
+def race_serially(names, inputs, params, deadline, progress=None, cancel=None):
+    """Fallback of race inside a pool worker, which cannot start processes
+
+    The integer model goes first and the others only run, in the time left, if it does
+    not prove the optimum.
+    """
+    start = time.time()
+    outcomes = {}
+    for name in sorted(names, key=lambda name: -ENGINES.index(name)):
+        left = deadline - (time.time() - start)
+        if (cancel is not None and cancel.is_set()) or left <= 0 or any(o.get("optimal") for o in outcomes.values()):
+            outcomes[name] = {"status": "stopped", "time": 0.0}
+            continue
+        results = ListQueue()
+        run_engine(name, inputs, engine_params(name, params, left), results)
+        outcomes[name] = results[0][1]
+        if progress is not None:
+            progress.emit(force=True, phase="race", engine=name, status=outcomes[name]["status"], objective=outcomes[name].get("objective"))
+    return outcomes
+
+
+def engine_params(name, params, deadline):
+    """Params of one engine, limited to the time left and to a single process
+
+    Each engine runs in one process so that stopping a loser also stops all of its work.
+    """
+    if name == "genetic":
+        return {
+            "generation_number": params.get("generation_number", 50),
+            "population_size": params.get("population_size", 500),
+            "time_limit": deadline,
+            "patience": params.get("patience"),
+            "seed": params.get("seed"),
+            "workers": 1,
+            "islands": 1,
+        }
+    if name == "integer_programming":
+        return {"time_limit": deadline, "gap": params.get("gap"), "backend": params.get("backend", "highs"), "workers": 1}
+    return {}
+
+
+def race(inputs, params, progress=None, cancel=None):
+    """Runs the engines concurrently on the same inputs until the deadline
+
+    Stops as soon as the integer model proves its optimum, or when every engine is done;
+    engines still running after the deadline and the grace period are terminated.
+    Returns the name of the winner, the outcome of each engine and the reference
+    objective of the gaps.
+    """
+    deadline = float(params.get("time_limit") or DEFAULT_DEADLINE)
+    names = [name for name in params.get("engines", ENGINES) if name in SOLVERS]
+    if not names:
+        raise Exception(f"No engine to run; choose from {ENGINES}")
+
+    if progress is not None:
+        progress.phase("race", engines=names, deadline=deadline)
+    if multiprocessing.current_process().daemon:
+        return pick_winner(race_serially(names, inputs, params, deadline, progress, cancel))
+
+    start = time.time()
+    results = multiprocessing.Queue()
+    processes = {
+        name: multiprocessing.Process(target=run_engine_process, args=(name, inputs, engine_params(name, params, deadline), results))
+        for name in names
+    }
+    outcomes = {}
+    try:
+        for process in processes.values():
+            process.start()
+
+        while len(outcomes) < len(names):
+            if cancel is not None and cancel.is_set():
+                raise Exception("Command cancelled")
+            if time.time() - start > deadline + GRACE:
+                break
+            try:
+                name, outcome = results.get(timeout=0.2)
+            except queue.Empty:
+                # Um processo que morreu sem responder não é esperado até o prazo
+                for name, process in processes.items():
+                    if name not in outcomes and process.exitcode not in (None, 0):
+                        outcomes[name] = {"status": "failed", "error": f"Exit code {process.exitcode}", "time": time.time() - start}
+                continue
+
+            outcomes[name] = outcome
+            if progress is not None:
+                progress.emit(force=True, phase="race", engine=name, status=outcome["status"], objective=outcome.get("objective"))
+            if outcome.get("optimal"):
+                break
+    finally:
+        # Os perdedores são interrompidos sem esperar o fim do prazo, com os solvers que iniciaram
+        for process in processes.values():
+            stop_engine(process)
+        for process in processes.values():
+            process.join()
+
+    for name in names:
+        if name not in outcomes:
+            outcomes[name] = {"status": "stopped", "time": time.time() - start}
+    return pick_winner(outcomes)
+
+
+def pick_winner(outcomes):
+    """Name of the best engine, the outcomes and the reference objective of the gaps"""
+    finished = {name: outcome for name, outcome in outcomes.items() if outcome["status"] == "finished"}
+    if not finished:
+        errors = "; ".join(f"{name}: {outcome.get('error', outcome['status'])}" for name, outcome in outcomes.items())
+        raise Exception(f"No engine found a solution before the deadline ({errors})")
+
+    # O ótimo provado vence; senão, a melhor solução, e no empate o motor mais exato
+    winner = max(finished, key=lambda name: (finished[name]["optimal"], finished[name]["objective"], ENGINES.index(name)))
+    return winner, outcomes, finished[winner]["objective"]
+
+
+def solve_request(inputs, params, progress, cancel, state):
+    """Entry point of the resident server mode; params holds the deadline and the params of the engines"""
+    winner, outcomes, reference = race(inputs, params, progress, cancel)
+    optimal = outcomes[winner]["optimal"]
+
+    engines = {}
+    for name, outcome in outcomes.items():
+        row = {"status": outcome["status"], "time": outcome["time"]}
+        if outcome["status"] == "finished":
+            # Gap até o ótimo, quando o modelo inteiro o provou, ou até a melhor solução encontrada
+            gap = (reference - outcome["objective"]) / abs(reference) if reference else 0.0
+            row.update({"objective": outcome["objective"], "gap": 0.0 if abs(gap) < 1e-9 else gap})
+        if "error" in outcome:
+            row["error"] = outcome["error"]
+        engines[name] = row
+
+    if progress is not None:
+        progress.phase("postprocess", winner=winner, objective=reference)
+
+    metrics = {
+        **outcomes[winner]["metrics"],
+        "winner": winner,
+        "solver_status": "optimal" if optimal else "feasible",
+        "gap_reference": "optimum" if optimal else "best_found",
+        "engines": engines,
+    }
+    return metrics, outcomes[winner]["result_rows"]
+
+
+def process_file(file_path: str, courses_excel_path:str, excel_flag: bool, min_grade:float, preference_flag:bool, progress=None) -> tuple:
+    return load_inputs(file_path, courses_excel_path, excel_flag, min_grade, preference_flag, progress)
+
+
+def parse_arguments(argv):
+    parser = ArgumentParser(
+        description="Allocate tutors to classes with the greedy heuristic, the genetic algorithm and integer programming racing under one deadline."
+    )
+    parser.add_argument("students_excel_path")
+    parser.add_argument("courses_excel_path")
+    parser.add_argument("min_grade", type=float)
+    parser.add_argument("preference_flag")
+    parser.add_argument("generation_number", type=int, nargs="?", default=50)
+    parser.add_argument("population_size", type=int, nargs="?", default=500)
+    parser.add_argument(
+        "--time-limit",
+        type=float,
+        default=DEFAULT_DEADLINE,
+        help="Global deadline in seconds; the best schedule found by then is returned",
+    )
+    parser.add_argument(
+        "--engines", nargs="+", choices=ENGINES, default=ENGINES, help="Engines to race (default: all of them)"
+    )
+    parser.add_argument(
+        "--gap", type=float, default=None, help="Stop the integer model once the relative optimality gap is below this value"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=integer_programming.BACKENDS,
+        default="highs",
+        help="Backend of the integer model",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=None, help="Seed of the genetic algorithm"
+    )
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=None,
+        help="Write JSON progress lines to stdout at most once every N seconds",
+    )
+    parser.add_argument(
+        "--profile", action="store_true", help="Write a cProfile dump (pstats) of the run next to the input tables"
+    )
+    parser.add_argument(
+        "--scenarios",
+        default=None,
+        help="JSON file with a list of scenarios (name, min_grade, preference_flag, params) to solve and compare",
+    )
+    parser.add_argument(
+        "--scenario-workers", type=int, default=None, help="Solve the scenarios in a pool of N processes (default: all CPUs)"
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=OUTPUT_FORMATS,
+        default="compact",
+        help="Tutors listed once and referenced by index (compact, columnar), or the previous row format (legacy)",
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    # Necessário para os processos dos motores no executável do PyInstaller
+    freeze_support()
+
+    # Modo residente: lê requisições JSON do stdin até o aplicativo fechar o pipe
+    if sys.argv[1:2] == ["--serve"]:
+        serve(solve_request, "portfolio", sys.argv[1:])
+        sys.exit(0)
+
+    try:
+        start = time.time()
+
+        args = parse_arguments(sys.argv[1:])
+        students_excel_path = args.students_excel_path
+        courses_excel_path = args.courses_excel_path
+        min_grade = args.min_grade
+        preference_flag = bool(args.preference_flag)
+
+        excel_flag = True
+        if students_excel_path.endswith(".csv"):
+            excel_flag = False
+
+        profile = profile_path(students_excel_path, "portfolio") if args.profile else None
+        progress = ProgressReporter(args.progress_interval)
+        progress.phase("load")
+        params = {
+            "generation_number": args.generation_number,
+            "population_size": args.population_size,
+            "time_limit": args.time_limit,
+            "engines": args.engines,
+            "gap": args.gap,
+            "backend": args.backend,
+            "seed": args.seed,
+        }
+        with profiled(profile):
+            if args.scenarios is not None:
+                # Modo de cenários: as tabelas são lidas uma vez para todos os cenários do arquivo
+                data = run_file(solve_request, students_excel_path, courses_excel_path, excel_flag, args.scenarios, min_grade, preference_flag, params, args.scenario_workers, progress, args.output_format)
+                metrics = data
+            else:
+                inputs = process_file(students_excel_path, courses_excel_path, excel_flag, min_grade, preference_flag, progress)
+                metrics, result_rows = solve_request(inputs, params, progress, None, {})
+                data = {"metrics": metrics, **encode_results(result_rows, args.output_format)}
+        end = time.time()
+
+        metrics['execution_time'] = end - start
+        metrics['timings'] = progress.timings()
+        metrics['peak_memory_mb'] = peak_memory_mb()
+        if profile is not None:
+            metrics['profile'] = profile
+
+        result = {"success": True, "data": data}
+        write_line(result)
+        sys.exit(0)
+
+    except Exception as e:
+        result = {"success": False, "error": str(e)}
+        sys.stderr.write(json.dumps(result))
+        sys.exit(1)
@@ -0,0 +1,150 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Progresso e respostas podem vir de várias threads no modo servidor
+output_lock = threading.Lock()
+
+# Listas mais longas que isso são escritas em pedaços, sem montar a resposta inteira numa string
+STREAM_CHUNK = 1000
+
+
+def write_json(stream, value):
+    """Writes json.dumps(value) piece by piece: dicts key by key and long lists in chunks"""
+    if isinstance(value, dict):
+        stream.write("{")
+        for i, (key, item) in enumerate(value.items()):
+            stream.write(f"{', ' if i else ''}{json.dumps(str(key))}: ")
+            write_json(stream, item)
+        stream.write("}")
+    elif isinstance(value, list) and len(value) > STREAM_CHUNK:
+        stream.write("[")
+        for start in range(0, len(value), STREAM_CHUNK):
+            # Cada pedaço ainda passa pelo codificador em C do json.dumps
+            stream.write(f"{', ' if start else ''}{json.dumps(value[start:start + STREAM_CHUNK])[1:-1]}")
+        stream.write("]")
+    else:
+        stream.write(json.dumps(value))
+
+
+def write_line(message, stream=None):
+    stream = stream or sys.__stdout__
+    with output_lock:
+        write_json(stream, message)
+        stream.write("\n")
+        stream.flush()
+
+
+def write_event(message, stream=None):
+    """Writes a small message as one line with a single write, so that lines of the island
+    processes, which share stdout but not output_lock, are not mixed"""
+    stream = stream or sys.__stdout__
+    line = json.dumps(message) + "\n"
+    with output_lock:
+        stream.write(line)
+        stream.flush()
+
+
+def peak_memory_mb():
+    """Peak resident memory of this process or of its finished children such as CBC, None on Windows"""
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    # ru_maxrss vem em KB no Linux e em bytes no macOS
+    scale = 2**20 if sys.platform == "darwin" else 2**10
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return peak / scale
+
+
+def profile_path(inputs_path, algorithm):
+    """pstats file next to the input tables, or in the temporary directory for tables sent as JSON"""
+    if inputs_path is None or inputs_path == "-":
+        directory = tempfile.gettempdir()
+    else:
+        directory = os.path.dirname(os.path.abspath(inputs_path))
+    return os.path.join(directory, f"{algorithm}-{time.strftime('%Y%m%d-%H%M%S')}.pstats")
+
+
+@contextmanager
+def profiled(path):
+    """Runs the block under cProfile and writes the pstats dump to path; None profiles nothing
+
+    Only the calling thread is profiled, not the processes of a pool.
+    """
+    if path is None:
+        yield
+        return
+
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+
+
+class ArgumentParser(argparse.ArgumentParser):
+    """Parser of the sidecars: bad arguments end with the JSON error the application reads, and exit code 1"""
+
+    def error(self, message):
+        sys.stderr.write(json.dumps({"success": False, "error": f"Invalid arguments: {message}"}))
+        sys.exit(1)
+
+
+class ProgressReporter:
+    """Writes throttled newline-delimited JSON progress events to the original stdout
+
+    It also times the phases, even with the events disabled, for the metrics of the result.
+    """
+
+    def __init__(self, interval=None, **fields):
+        # interval=None desativa os eventos; o resultado final continua sendo a última linha
+        self.interval = interval
+        self.fields = fields
+        self.start = time.time()
+        self.last = None
+        self.durations = {}
+        self.current = None
+        self.current_start = None
+
+    @property
+    def enabled(self):
+        return self.interval is not None
+
+    def emit(self, force=False, **fields):
+        if self.interval is None:
+            return
+
+        now = time.time()
+        if not force and self.last is not None and now - self.last < self.interval:
+            return
+        self.last = now
+
+        write_event({"event": "progress", "elapsed": now - self.start, **self.fields, **fields})
+
+    def phase(self, name, **fields):
+        self.close_phase()
+        self.current, self.current_start = name, time.perf_counter()
+        self.emit(force=True, phase=name, **fields)
+
+    def close_phase(self):
+        if self.current is not None:
+            elapsed = time.perf_counter() - self.current_start
+            self.durations[self.current] = self.durations.get(self.current, 0.0) + elapsed
+            self.current = None
+
+    def timings(self):
+        """Seconds spent in each phase, closing the current one"""
+        self.close_phase()
+        return dict(self.durations)
@@ -0,0 +1,159 @@
+import json
+import multiprocessing
+import os
+import time
+
+from decomposition import check_cancel
+from loader import filter_inputs, load_tables, prepare_tables
+from output import encode_results
+from progress import ProgressReporter
+
+# Dados somente leitura de cada processo do pool, enviados uma vez pelo initializer
+worker_solve = None
+worker_prepared = None
+
+
+def init_worker(solve, prepared):
+    global worker_solve, worker_prepared
+    worker_solve, worker_prepared = solve, prepared
+
+
+def expand_scenarios(scenarios, min_grade, preference_flag, params):
+    """Scenarios with the values of the request filled in where they leave them out
+
+    Each scenario may set "name", "min_grade", "preference_flag" and "params"; its params
+    are merged over the params of the request.
+    """
+    expanded = []
+    for index, scenario in enumerate(scenarios, start=1):
+        scenario_min_grade = scenario.get("min_grade", min_grade)
+        scenario_flag = scenario.get("preference_flag", preference_flag)
+        if scenario_min_grade is None or scenario_flag is None:
+            raise Exception(f"Scenario {index} has no min_grade or preference_flag")
+
+        scenario_min_grade, scenario_flag = float(scenario_min_grade), bool(scenario_flag)
+        # Sem nome, o cenário é identificado pelos valores que ele define
+        name = f"min_grade {scenario_min_grade:g}, preference {'on' if scenario_flag else 'off'}"
+        name = ", ".join([name, *(f"{key} {value}" for key, value in scenario.get("params", {}).items())])
+        expanded.append(
+            {
+                "name": scenario.get("name") or name,
+                "min_grade": scenario_min_grade,
+                "preference_flag": scenario_flag,
+                "params": {**params, **scenario.get("params", {})},
+            }
+        )
+    return expanded
+
+
+def objective(result_rows):
+    """Sum of the grades of the allocated tutors minus one per class left without a tutor"""
+    return sum(row["grade"] for row in result_rows if isinstance(row["grade"], (int, float))) - sum(
+        1 for row in result_rows if row["student"] == "No tutor"
+    )
+
+
+def solve_scenario(solve, prepared, scenario, progress=None, cancel=None, output_format="compact"):
+    """Filters the shared tables for one scenario and solves it with a state of its own"""
+    start = time.time()
+    progress = progress or ProgressReporter()
+    progress.phase("preprocess")
+    try:
+        inputs = filter_inputs(prepared, scenario["min_grade"], scenario["preference_flag"])
+        metrics, result_rows = solve(inputs, scenario["params"], progress, cancel, {})
+    except Exception as e:
+        # Um cenário sem solução não impede a comparação dos demais
+        if cancel is not None and cancel.is_set():
+            raise
+        return {**scenario, "success": False, "error": str(e)}
+
+    metrics.update(
+        {
+            "candidates": len(inputs[1]),
+            "objective": objective(result_rows),
+            "execution_time": time.time() - start,
+            "timings": progress.timings(),
+        }
+    )
+    return {**scenario, "success": True, "metrics": metrics, **encode_results(result_rows, output_format)}
+
+
+def solve_indexed(arguments):
+    index, scenario, output_format = arguments
+    return index, solve_scenario(worker_solve, worker_prepared, scenario, output_format=output_format)
+
+
+def comparison_table(solved):
+    """One row per scenario with its settings and scalar metrics, for a side-by-side comparison"""
+    table = []
+    for scenario in solved:
+        row = {"scenario": scenario["name"], "min_grade": scenario["min_grade"], "preference_flag": scenario["preference_flag"]}
+        if scenario["success"]:
+            # Listas e dicionários (histórico, tempos por fase, componentes) ficam só nas métricas
+            row.update({k: v for k, v in scenario["metrics"].items() if v is None or isinstance(v, (bool, int, float, str))})
+        else:
+            row["error"] = scenario["error"]
+        table.append(row)
+    return table
+
+
+def run_scenarios(solve, prepared, scenarios, workers=None, progress=None, cancel=None, output_format="compact"):
+    """Solves every scenario over the same prepared tables and compares them
+
+    With workers > 1 and more than one scenario they run in a pool of processes, each
+    solving serially, since pool processes cannot start processes of their own; the pool
+    workers do not see cancel, which is checked here between results instead.
+    Returns {"table": rows of comparison_table, "scenarios": full metrics and results in output_format}.
+    """
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    solved = [None] * len(scenarios)
+
+    def report(count):
+        if progress is not None:
+            progress.emit(force=True, phase="scenarios", solved=count, total=len(scenarios))
+
+    if progress is not None:
+        progress.phase("scenarios", total=len(scenarios))
+
+    if workers <= 1 or len(scenarios) <= 1:
+        interval = progress.interval if progress is not None else None
+        fields = progress.fields if progress is not None else {}
+        for index, scenario in enumerate(scenarios):
+            check_cancel(cancel)
+            scenario_progress = ProgressReporter(interval, **fields, scenario=index)
+            solved[index] = solve_scenario(solve, prepared, scenario, scenario_progress, cancel, output_format)
+            report(index + 1)
+    else:
+        tasks = [
+            (index, {**scenario, "params": {**scenario["params"], "workers": 1, "islands": 1}}, output_format)
+            for index, scenario in enumerate(scenarios)
+        ]
+        pool = multiprocessing.Pool(min(workers, len(scenarios)), initializer=init_worker, initargs=(solve, prepared))
+        try:
+            iterator = pool.imap_unordered(solve_indexed, tasks)
+            count = 0
+            while count < len(scenarios):
+                check_cancel(cancel)
+                try:
+                    index, result = iterator.next(timeout=0.2)
+                except multiprocessing.TimeoutError:
+                    continue
+                solved[index] = {**result, "params": scenarios[index]["params"]}
+                count += 1
+                report(count)
+            pool.close()
+        finally:
+            # Fecha sem esperar os cenários restantes em caso de erro ou cancelamento
+            pool.terminate()
+            pool.join()
+
+    return {"table": comparison_table(solved), "scenarios": solved}
+
+
+def run_file(solve, file_path, courses_path, excel_flag, scenarios_path, min_grade, preference_flag, params, workers=None, progress=None, output_format="compact"):
+    """Command-line scenario mode: scenarios_path holds a JSON list of scenarios"""
+    with open(scenarios_path) as file:
+        scenarios = expand_scenarios(json.load(file), min_grade, preference_flag, params)
+
+    prepared = prepare_tables(*load_tables(file_path, courses_path, excel_flag))
+    return run_scenarios(solve, prepared, scenarios, workers, progress, output_format=output_format)
@@ -0,0 +1,224 @@
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from cache import DEFAULT_MAX_BYTES, DiskCache, inputs_key, results_key
+from loader import build_inputs, prepare_tables, read_tables, table_from_json
+from output import encode_results
+from progress import ArgumentParser, ProgressReporter, peak_memory_mb, profile_path, profiled, write_line
+from scenarios import expand_scenarios, run_scenarios
+
+# Quantos conjuntos de dados carregados ficam em memória entre as requisições
+MAX_LOADED = 4
+
+
+class Server:
+    """Answers newline-delimited JSON requests read from stdin with one resident process
+
+    Requests have an "op" ("load", "solve", "scenarios" or "cancel") and an "id"
+    that is copied to the response and to the progress events of that request.
+    The data comes either as "students"/"courses" tables or as file paths.
+    """
+
+    def __init__(self, solve, algorithm, deterministic=False, cache=None):
+        # solve(inputs, params, progress, cancel, state) -> (metrics, result_rows)
+        self.solve = solve
+        self.algorithm = algorithm
+        # Só resultados de algoritmos determinísticos podem ser reaproveitados
+        self.deterministic = deterministic
+        self.cache = cache
+        self.loaded = OrderedDict()
+        # Estado que o algoritmo guarda entre requisições, para resolver de forma incremental
+        self.state = {}
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def respond(self, request_id, message):
+        # Cada requisição recebe uma única resposta, mesmo se for cancelada no fim
+        with self.lock:
+            if self.jobs.pop(request_id, None) is None:
+                return
+        write_line({"id": request_id, **message})
+
+    def load(self, request, key, progress=None):
+        """Preprocessed inputs and where they came from: memory, disk or miss"""
+        with self.lock:
+            if key in self.loaded:
+                self.loaded.move_to_end(key)
+                return self.loaded[key], "memory"
+
+        inputs = self.cache.get(key) if self.cache is not None else None
+        status = "disk"
+        if inputs is None:
+            inputs, status = self.read(request, progress), "miss"
+            if self.cache is not None:
+                self.cache.put(key, inputs)
+
+        with self.lock:
+            self.loaded[key] = inputs
+            while len(self.loaded) > MAX_LOADED:
+                self.loaded.popitem(last=False)
+        return inputs, status
+
+    def tables(self, request):
+        # Tabelas enviadas na própria requisição dispensam a leitura de arquivos
+        if "students" in request:
+            return table_from_json(request["students"]), table_from_json(request["courses"])
+
+        students_path = request["students_path"]
+        return read_tables(students_path, request["courses_path"], not students_path.endswith(".csv"))
+
+    def read(self, request, progress=None):
+        tutors_table, courses_table = self.tables(request)
+        if progress is not None:
+            progress.phase("preprocess")
+        return build_inputs(tutors_table, courses_table, float(request["min_grade"]), bool(request["preference_flag"]))
+
+    def handle_load(self, request, cancel):
+        start = time.time()
+        (courses, candidates, _, _), status = self.load(request, inputs_key(request))
+        self.respond(
+            request["id"],
+            {
+                "success": True,
+                "data": {
+                    "courses": len(courses),
+                    "candidates": len(candidates),
+                    "load_time": time.time() - start,
+                    "cache": status,
+                },
+            },
+        )
+
+    def handle_solve(self, request, cancel):
+        start = time.time()
+        progress = ProgressReporter(request.get("progress_interval"), id=request["id"])
+        progress.phase("load")
+
+        params = request.get("params", {})
+        key = inputs_key(request)
+        # params["profile"] grava um dump do pstats ao lado das tabelas de entrada
+        profile = profile_path(request.get("students_path"), self.algorithm) if params.get("profile") else None
+
+        result_key = None
+        cached = None
+        if self.deterministic and self.cache is not None:
+            result_key = results_key(key, self.algorithm, params)
+            cached = self.cache.get(result_key)
+
+        if cached is not None:
+            metrics, result_rows = cached
+            cache_status = {"inputs": "skipped", "results": "hit"}
+        else:
+            with profiled(profile):
+                inputs, inputs_status = self.load(request, key, progress)
+                metrics, result_rows = self.solve(inputs, params, progress, cancel, self.state)
+            cache_status = {"inputs": inputs_status, "results": "miss" if result_key else "disabled"}
+            # Uma solução interrompida pelo limite de tempo depende da máquina e não é guardada
+            if result_key is not None and metrics.get("solver_status") != "feasible":
+                self.cache.put(result_key, (metrics, result_rows))
+
+        metrics = {
+            **metrics,
+            "cache": cache_status,
+            "execution_time": time.time() - start,
+            "timings": progress.timings(),
+            "peak_memory_mb": peak_memory_mb(),
+        }
+        if profile is not None and cached is None:
+            metrics["profile"] = profile
+        # "output_format" escolhe entre as tabelas compactas e o formato antigo ("legacy")
+        data = {"metrics": metrics, **encode_results(result_rows, request.get("output_format", "compact"))}
+        self.respond(request["id"], {"success": True, "data": data})
+
+    def handle_scenarios(self, request, cancel):
+        """Solves a list of scenarios over tables read once, in a pool of "workers" processes"""
+        start = time.time()
+        progress = ProgressReporter(request.get("progress_interval"), id=request["id"])
+        progress.phase("load")
+
+        scenarios = expand_scenarios(
+            request["scenarios"], request.get("min_grade"), request.get("preference_flag"), request.get("params", {})
+        )
+        prepared = prepare_tables(*self.tables(request))
+        data = run_scenarios(
+            self.solve, prepared, scenarios, request.get("workers"), progress, cancel, request.get("output_format", "compact")
+        )
+
+        data.update({"execution_time": time.time() - start, "peak_memory_mb": peak_memory_mb()})
+        self.respond(request["id"], {"success": True, "data": data})
+
+    def run_job(self, handler, request, cancel):
+        try:
+            handler(request, cancel)
+        except Exception as e:
+            self.respond(request["id"], {"success": False, "error": str(e)})
+
+    def cancel(self, request_id):
+        with self.lock:
+            cancel = self.jobs.get(request_id)
+        if cancel is not None:
+            cancel.set()
+            self.respond(request_id, {"success": False, "error": "Command cancelled"})
+
+    def dispatch(self, line):
+        try:
+            request = json.loads(line)
+            request_id = request["id"]
+            op = request["op"]
+        except (ValueError, KeyError, TypeError) as e:
+            write_line({"success": False, "error": f"Invalid request: {e}"})
+            return
+
+        if op == "cancel":
+            self.cancel(request_id)
+            return
+        if op not in ("load", "solve", "scenarios"):
+            write_line({"id": request_id, "success": False, "error": f"Unknown op: {op}"})
+            return
+
+        cancel = threading.Event()
+        with self.lock:
+            self.jobs[request_id] = cancel
+
+        # Cada requisição roda em outra thread para continuar lendo pedidos de cancelamento,
+        # inclusive a leitura de tabelas grandes
+        handlers = {"load": self.handle_load, "solve": self.handle_solve, "scenarios": self.handle_scenarios}
+        threading.Thread(target=self.run_job, args=(handlers[op], request, cancel), daemon=True).start()
+
+    def serve(self, stdin=None):
+        stdin = stdin or sys.stdin
+        # Qualquer print perdido das bibliotecas iria corromper o protocolo
+        sys.stdout = sys.stderr
+        # Processos do multiprocessing fecham sys.stdin ao iniciar; criados por fork enquanto
+        # este laço espera uma linha, travariam na trava do buffer herdada já adquirida
+        sys.stdin = open(os.devnull)
+        # Pelo mesmo motivo, fork a partir de várias threads de solve pode herdar travas
+        # presas; no Linux os pools passam a nascer de um processo servidor sem threads
+        if multiprocessing.get_start_method() == "fork":
+            multiprocessing.set_start_method("forkserver", force=True)
+
+        for line in stdin:
+            if line.strip():
+                self.dispatch(line)
+
+
+def parse_arguments(argv):
+    parser = ArgumentParser(description="Answer JSON requests on stdin with a resident sidecar.")
+    parser.add_argument("--serve", action="store_true")
+    parser.add_argument("--cache-dir", default=None, help="Keep parsed inputs and deterministic results in this directory")
+    parser.add_argument(
+        "--cache-size", type=float, default=DEFAULT_MAX_BYTES / 2**20, help="Maximum size of the cache directory in MB"
+    )
+    return parser.parse_args(argv)
+
+
+def serve(solve, algorithm, argv, deterministic=False):
+    """Runs the request loop until stdin is closed by the application"""
+    args = parse_arguments(argv)
+    cache = DiskCache(args.cache_dir, int(args.cache_size * 2**20)) if args.cache_dir else None
+    Server(solve, algorithm, deterministic, cache).serve()
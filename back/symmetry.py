@@ -0,0 +1,41 @@
+def section_groups(courses, candidates, preferences):
+    """Classes with the same candidates and scores, grouped in the order of courses
+
+    The sections "X - Class 1..n" of a course always share them, and any classes that do are
+    interchangeable, so the grouping is read from the data rather than from the names.
+    """
+    columns = {d: [] for d in courses}
+    for a in candidates:
+        for d, score in preferences[a].items():
+            columns[d].append((a, score))
+
+    groups = {}
+    for d in courses:
+        groups.setdefault(tuple(columns[d]), []).append(d)
+    return list(groups.values())
+
+
+def aggregate(courses, candidates, preferences):
+    """Course-level inputs with one node per group of identical classes, named by its first class
+
+    Returns the groups, the node names, the preferences by node and the capacity of each node.
+    """
+    groups = section_groups(courses, candidates, preferences)
+    group_of = {d: group[0] for group in groups for d in group}
+
+    nodes = [group[0] for group in groups]
+    capacity = {group[0]: len(group) for group in groups}
+    node_preferences = {a: {} for a in candidates}
+    for a in candidates:
+        for d, score in preferences[a].items():
+            node_preferences[a].setdefault(group_of[d], score)
+
+    return groups, nodes, node_preferences, capacity
+
+
+def expand(groups, node_pairs):
+    """(Student ID, class) pairs of a course-level solution, filling each group's classes in order"""
+    tutors = {}
+    for a, node in node_pairs:
+        tutors.setdefault(node, []).append(a)
+    return [(a, d) for group in groups for a, d in zip(tutors.get(group[0], []), group)]
@@ -1,30 +1,304 @@
-use serde_json::Value;
-use std::collections::HashSet;
-use std::sync::LazyLock;
-use std::sync::Mutex;
-use tauri::command;
-use tauri_plugin_shell::{process::CommandEvent, ShellExt};
+use serde_json::{json, Value};
+use std::collections::{HashMap, HashSet};
+use std::sync::{Arc, LazyLock, Mutex};
+use std::time::Duration;
+use tauri::async_runtime::Receiver;
+use tauri::{command, Emitter, Manager};
+use tauri_plugin_shell::process::{CommandChild, CommandEvent};
+use tauri_plugin_shell::ShellExt;
+use tokio::sync::mpsc::{unbounded_channel, UnboundedReceiver, UnboundedSender};
 
 // Track active commands with LazyLock
 static ACTIVE_COMMANDS: LazyLock<Mutex<HashSet<String>>> =
     LazyLock::new(|| Mutex::new(HashSet::new()));
 
+// Lines of a sidecar for one request, or the error that ended the sidecar
+type Routed = Result<Value, String>;
+
+// Requests waiting for lines of a sidecar, by id
+type Pending = Arc<Mutex<HashMap<String, UnboundedSender<Routed>>>>;
+
+// Sidecars started with --serve stay resident between runs, one per algorithm, and answer
+// several requests at once; a task reads their stdout and routes each line by its id
+struct Sidecar {
+    child: CommandChild,
+    pending: Pending,
+}
+
+static SIDECARS: LazyLock<tokio::sync::Mutex<HashMap<String, Sidecar>>> =
+    LazyLock::new(|| tokio::sync::Mutex::new(HashMap::new()));
+
+// How often a running request checks whether it was cancelled
+const CANCEL_POLL: Duration = Duration::from_millis(200);
+
+// Minimum interval, in seconds, between progress lines written by the sidecars
+const PROGRESS_INTERVAL: f64 = 0.25;
+
+// CBC returns the best schedule found so far after this many seconds
+const MILP_TIME_LIMIT: f64 = 120.0;
+
+// Global deadline of the portfolio, which returns the best schedule of its engines by then
+const PORTFOLIO_DEADLINE: f64 = 60.0;
+
+// Results come back with each tutor listed once and the tables as columns; the UI decodes them
+const OUTPUT_FORMAT: &str = "columnar";
+
+// Progress lines are newline-delimited JSON objects with "event": "progress"
+fn is_progress(message: &Value) -> bool {
+    message.get("event").and_then(|e| e.as_str()) == Some("progress")
+}
+
+fn spawn_sidecar(app: &tauri::AppHandle, binary_name: &str) -> Result<Sidecar, String> {
+    let mut args = vec!["--serve".to_string()];
+
+    // Parsed inputs and deterministic results are cached on disk across app restarts
+    if let Ok(cache_dir) = app.path().app_cache_dir() {
+        args.push("--cache-dir".to_string());
+        args.push(cache_dir.join("sidecar-cache").to_string_lossy().into_owned());
+    }
+
+    let (rx, child) = app
+        .shell()
+        .sidecar(binary_name)
+        .map_err(|e| format!("Failed to create sidecar command: {}", e))?
+        .args(args)
+        .spawn()
+        .map_err(|e| format!("Failed to execute program: {}", e))?;
+
+    let pending: Pending = Arc::new(Mutex::new(HashMap::new()));
+    tauri::async_runtime::spawn(route_output(binary_name.to_string(), rx, pending.clone()));
+    Ok(Sidecar { child, pending })
+}
+
+// Hands each stdout line of a sidecar to the request with its id until the sidecar ends
+async fn route_output(binary_name: String, mut rx: Receiver<CommandEvent>, pending: Pending) {
+    let mut error = String::new();
+
+    let failure = loop {
+        match rx.recv().await {
+            Some(CommandEvent::Stdout(line)) => {
+                // Parsed straight from the bytes, without copying the line into a String first
+                let message = match serde_json::from_slice::<Value>(&line) {
+                    Ok(message) => message,
+                    // The line may have been a response, whose request would otherwise wait forever
+                    Err(e) => break format!("Failed to parse algorithm output as JSON: {}", e),
+                };
+                let sender = match message.get("id").and_then(|id| id.as_str()) {
+                    Some(id) => pending.lock().ok().and_then(|waiting| waiting.get(id).cloned()),
+                    None => None,
+                };
+                if let Some(sender) = sender {
+                    let _ = sender.send(Ok(message));
+                }
+            }
+            Some(CommandEvent::Stderr(line)) => {
+                error = String::from_utf8_lossy(&line).into_owned();
+            }
+            Some(CommandEvent::Terminated(_)) | None => {
+                break if error.is_empty() {
+                    "Process terminated unexpectedly".to_string()
+                } else {
+                    error
+                };
+            }
+            _ => {}
+        }
+    };
+
+    // The next request starts a new sidecar; the requests still waiting fail with the error
+    let mut sidecars = SIDECARS.lock().await;
+    let current = sidecars
+        .get(&binary_name)
+        .is_some_and(|sidecar| Arc::ptr_eq(&sidecar.pending, &pending));
+    if current {
+        if let Some(sidecar) = sidecars.remove(&binary_name) {
+            let _ = sidecar.child.kill();
+        }
+    }
+    if let Ok(mut waiting) = pending.lock() {
+        for (_, sender) in waiting.drain() {
+            let _ = sender.send(Err(failure.clone()));
+        }
+    }
+}
+
+fn is_active(command_id: &str) -> Result<bool, String> {
+    Ok(ACTIVE_COMMANDS
+        .lock()
+        .map_err(|_| "Lock error")?
+        .contains(command_id))
+}
+
+// Registers the request with its sidecar and writes it, restarting a sidecar that exited
+async fn write_request(
+    app: &tauri::AppHandle,
+    binary_name: &str,
+    command_id: &str,
+    request: &Value,
+    sender: UnboundedSender<Routed>,
+) -> Result<Pending, String> {
+    // Locked only while writing: requests to the same sidecar run concurrently
+    let mut sidecars = SIDECARS.lock().await;
+    let line = format!("{}\n", request);
+
+    // A sidecar that exited while idle only shows up when writing to it, so restart it once
+    if let Some(sidecar) = sidecars.get_mut(binary_name) {
+        register(&sidecar.pending, command_id, sender.clone())?;
+        if sidecar.child.write(line.as_bytes()).is_ok() {
+            return Ok(sidecar.pending.clone());
+        }
+        unregister(&sidecar.pending, command_id);
+    }
+
+    let mut sidecar = spawn_sidecar(app, binary_name)?;
+    register(&sidecar.pending, command_id, sender)?;
+    sidecar
+        .child
+        .write(line.as_bytes())
+        .map_err(|e| format!("Failed to send request: {}", e))?;
+    let pending = sidecar.pending.clone();
+    sidecars.insert(binary_name.to_string(), sidecar);
+    Ok(pending)
+}
+
+fn register(pending: &Pending, command_id: &str, sender: UnboundedSender<Routed>) -> Result<(), String> {
+    pending
+        .lock()
+        .map_err(|_| "Lock error")?
+        .insert(command_id.to_string(), sender);
+    Ok(())
+}
+
+fn unregister(pending: &Pending, command_id: &str) {
+    if let Ok(mut waiting) = pending.lock() {
+        waiting.remove(command_id);
+    }
+}
+
+// Forwards the progress of a request to the UI until its response arrives
+async fn wait_for_response(
+    app: &tauri::AppHandle,
+    binary_name: &str,
+    command_id: &str,
+    pending: &Pending,
+    rx: &mut UnboundedReceiver<Routed>,
+) -> Result<Value, String> {
+    let mut cancel_sent = false;
+
+    loop {
+        match tokio::time::timeout(CANCEL_POLL, rx.recv()).await {
+            Ok(Some(Ok(mut message))) => {
+                // Forward progress to the UI; the other line with our id is the response
+                if is_progress(&message) {
+                    if let Some(fields) = message.as_object_mut() {
+                        fields.remove("id");
+                        fields.insert(
+                            "commandId".to_string(),
+                            Value::String(command_id.to_string()),
+                        );
+                    }
+                    let _ = app.emit("algorithm-progress", message);
+                    continue;
+                }
+
+                if message.get("success").and_then(|s| s.as_bool()) == Some(true) {
+                    return Ok(message);
+                }
+                let error_msg = message
+                    .get("error")
+                    .and_then(|e| e.as_str())
+                    .unwrap_or("Unknown error");
+                return Err(error_msg.to_string());
+            }
+            Ok(Some(Err(error))) => return Err(error),
+            Ok(None) => return Err("Sidecar not running".into()),
+            Err(_) => {}
+        }
+
+        // The sidecar answers a cancel right away and stays resident for the next run
+        if !cancel_sent && !is_active(command_id)? {
+            let cancel = json!({ "op": "cancel", "id": command_id });
+            let mut sidecars = SIDECARS.lock().await;
+            // A sidecar started after ours ended does not know the request, which already failed
+            if let Some(sidecar) = sidecars
+                .get_mut(binary_name)
+                .filter(|sidecar| Arc::ptr_eq(&sidecar.pending, pending))
+            {
+                sidecar
+                    .child
+                    .write(format!("{}\n", cancel).as_bytes())
+                    .map_err(|e| e.to_string())?;
+            }
+            cancel_sent = true;
+        }
+    }
+}
+
+// Writes one request line to the resident sidecar and waits for the response with the same id
+async fn send_request(
+    app: &tauri::AppHandle,
+    binary_name: &str,
+    command_id: &str,
+    request: &Value,
+) -> Result<Value, String> {
+    let (sender, mut rx) = unbounded_channel();
+    let pending = write_request(app, binary_name, command_id, request, sender).await?;
+    let outcome = wait_for_response(app, binary_name, command_id, &pending, &mut rx).await;
+    unregister(&pending, command_id);
+    outcome
+}
+
+// Sidecar binary and default params of an algorithm
+fn algorithm_params(
+    algorithm: &str,
+    generation_number: Option<i32>,
+    population_size: Option<i32>,
+) -> (&'static str, Value) {
+    let binary_name = match algorithm {
+        "genetic" => "genetic",
+        "assignment" => "assignment",
+        "portfolio" => "portfolio",
+        _ => "integer_programming",
+    };
+
+    // Add genetic algorithm specific parameters if present
+    let params = if algorithm == "genetic" {
+        json!({
+            "generation_number": generation_number.unwrap_or(50), // Default to 50 generations
+            "population_size": population_size.unwrap_or(500), // Default to 500 population
+        })
+    } else if algorithm == "portfolio" {
+        // The portfolio races the genetic algorithm too, with the same preset
+        json!({
+            "generation_number": generation_number.unwrap_or(50),
+            "population_size": population_size.unwrap_or(500),
+            "time_limit": PORTFOLIO_DEADLINE,
+        })
+    } else if binary_name == "integer_programming" {
+        json!({ "time_limit": MILP_TIME_LIMIT })
+    } else {
+        json!({})
+    };
+
+    (binary_name, params)
+}
+
 #[command]
 pub async fn run_algorithm(
     app: tauri::AppHandle,
     command_id: String,
     algorithm: String,
-    tutors_data_file_path: String,
-    courses_data_file_path: String,
+    tutors_table: Value,
+    courses_table: Value,
     min_grade: f64,
     preference_flag: i32,
     generation_number: Option<i32>,
     population_size: Option<i32>,
 ) -> Result<Value, String> {
-    // Verify file extensions
-    for path in [&tutors_data_file_path, &courses_data_file_path] {
-        if !path.ends_with(".xlsx") {
-            return Err("Files must be XLSX files".into());
+    // Tables arrive as JSON columns and go to the sidecar inside the request line
+    for table in [&tutors_table, &courses_table] {
+        if !table.is_object() {
+            return Err("Tables must be JSON objects of columns".into());
         }
     }
 
@@ -36,101 +310,85 @@ pub async fn run_algorithm(
             .insert(command_id.clone());
     }
 
-    let result = std::thread::spawn(move || {
-        // Create the sidecar command
-        let binary_name = if algorithm == "genetic" {
-            "genetic"
-        } else {
-            "integer_programming"
-        };
-
-        // Prepare the arguments
-        let mut args = vec![
-            tutors_data_file_path,
-            courses_data_file_path,
-            min_grade.to_string(),
-            preference_flag.to_string(),
-        ];
-
-        // Add genetic algorithm specific parameters if present
-        if algorithm == "genetic" {
-            args.push(generation_number.unwrap_or(50).to_string()); // Default to 50 generations
-            args.push(population_size.unwrap_or(500).to_string()); // Default to 500 population
-        } else {
-            args.push("0".to_string());
-            args.push("0".to_string());
+    let (binary_name, params) = algorithm_params(&algorithm, generation_number, population_size);
+
+    let request = json!({
+        "op": "solve",
+        "id": command_id,
+        "students": tutors_table,
+        "courses": courses_table,
+        "min_grade": min_grade,
+        "preference_flag": preference_flag,
+        "params": params,
+        "progress_interval": PROGRESS_INTERVAL,
+        "output_format": OUTPUT_FORMAT,
+    });
+
+    let result = send_request(&app, binary_name, &command_id, &request).await;
+
+    // Remove command from active set
+    ACTIVE_COMMANDS
+        .lock()
+        .map_err(|_| "Lock error")?
+        .remove(&command_id);
+
+    result
+}
+
+// Solves a list of scenarios ({name, min_grade, preference_flag, params}) over tables sent once;
+// the response holds a comparison table with one row per scenario
+#[command]
+pub async fn run_scenarios(
+    app: tauri::AppHandle,
+    command_id: String,
+    algorithm: String,
+    tutors_table: Value,
+    courses_table: Value,
+    min_grade: f64,
+    preference_flag: i32,
+    scenarios: Value,
+    generation_number: Option<i32>,
+    population_size: Option<i32>,
+) -> Result<Value, String> {
+    for table in [&tutors_table, &courses_table] {
+        if !table.is_object() {
+            return Err("Tables must be JSON objects of columns".into());
         }
+    }
+    if !scenarios.is_array() {
+        return Err("Scenarios must be a JSON array".into());
+    }
 
-        let (mut rx, child) = app
-            .shell()
-            .sidecar(binary_name)
-            .expect("failed to create sidecar command")
-            .args(args)
-            .spawn()
-            .map_err(|e| format!("Failed to execute program: {}", e))?;
-
-        let mut output = String::new();
-        let mut error = String::new();
-
-        // Create a tokio runtime for async operations
-        let rt = tokio::runtime::Runtime::new().map_err(|e| e.to_string())?;
-
-        rt.block_on(async {
-            while let Some(event) = rx.recv().await {
-                match event {
-                    CommandEvent::Stdout(line) => {
-                        output = String::from_utf8_lossy(&line).into_owned();
-                    }
-                    CommandEvent::Stderr(line) => {
-                        error = String::from_utf8_lossy(&line).into_owned();
-                    }
-                    CommandEvent::Terminated(status) => {
-                        // Remove command from active set
-                        ACTIVE_COMMANDS
-                            .lock()
-                            .map_err(|_| "Lock error")?
-                            .remove(&command_id);
-
-                        if status.code == Some(0) {
-                            return serde_json::from_str(&output).map_err(|e| {
-                                format!("Failed to parse algorithm output as JSON: {}", e)
-                            });
-                        } else {
-                            match serde_json::from_str::<Value>(&error) {
-                                Ok(error_json) => {
-                                    if let Some(error_msg) =
-                                        error_json.get("error").and_then(|e| e.as_str())
-                                    {
-                                        return Err(error_msg.to_string());
-                                    }
-                                }
-                                Err(_) => {}
-                            }
-                            return Err(error);
-                        }
-                    }
-                    _ => {}
-                }
+    {
+        ACTIVE_COMMANDS
+            .lock()
+            .map_err(|_| "Lock error")?
+            .insert(command_id.clone());
+    }
 
-                // Check if command was cancelled
-                let is_active = ACTIVE_COMMANDS
-                    .lock()
-                    .map_err(|_| "Lock error")?
-                    .contains(&command_id);
+    let (binary_name, params) = algorithm_params(&algorithm, generation_number, population_size);
 
-                if !is_active {
-                    child.kill().map_err(|e| e.to_string())?;
-                    return Err("Command cancelled".into());
-                }
-            }
+    let request = json!({
+        "op": "scenarios",
+        "id": command_id,
+        "students": tutors_table,
+        "courses": courses_table,
+        "min_grade": min_grade,
+        "preference_flag": preference_flag,
+        "params": params,
+        "scenarios": scenarios,
+        "progress_interval": PROGRESS_INTERVAL,
+        "output_format": OUTPUT_FORMAT,
+    });
 
-            Err("Process terminated unexpectedly".into())
-        })
-    })
-    .join()
-    .map_err(|_| "Thread panic occurred".to_string())??;
+    let result = send_request(&app, binary_name, &command_id, &request).await;
+
+    ACTIVE_COMMANDS
+        .lock()
+        .map_err(|_| "Lock error")?
+        .remove(&command_id);
 
-    Ok(result)
+    result
 }
 
 #[command]
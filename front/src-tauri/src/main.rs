@@ -11,6 +11,7 @@ fn main() {
         .plugin(tauri_plugin_process::init())
         .invoke_handler(tauri::generate_handler![
             commands::run_algorithm,
+            commands::run_scenarios,
             commands::cancel_algorithm
         ])
         .run(tauri::generate_context!())
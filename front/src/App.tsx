@@ -1,13 +1,14 @@
 import { useState } from "react";
 import { Loader2, Settings } from "lucide-react";
 import { exit } from "@tauri-apps/plugin-process";
-import { writeFile, BaseDirectory, mkdir } from "@tauri-apps/plugin-fs";
-import { appConfigDir, join } from "@tauri-apps/api/path";
 import { invoke } from "@tauri-apps/api/core";
-import * as XLSX from "xlsx";
+import { listen, UnlistenFn } from "@tauri-apps/api/event";
 import { useToast } from "@/hooks/use-toast";
 import { Button } from "@/components/ui/button";
 import Stepper, { StepStatus } from "./components/widgets/Stepper";
+import AlgorithmProgress, {
+	AlgorithmProgressEvent,
+} from "./components/widgets/AlgorithmProgress";
 
 import CourseInputStep, {
 	CourseData,
@@ -15,8 +16,11 @@ import CourseInputStep, {
 import StudentInputStep, {
 	StudentData,
 } from "./components/steps/StudentInputStep";
-import AlgorithmStep from "./components/steps/AlgorithmStep";
+import AlgorithmStep, {
+	ALGORITHM_NAMES,
+} from "./components/steps/AlgorithmStep";
 import ResultsStep, { AllocationResult } from "./components/steps/ResultsStep";
+import { decodeResult, SidecarResult } from "@/lib/results";
 
 const App = () => {
 	const [currentCommand, setCurrentCommand] = useState<string | null>(null);
@@ -37,6 +41,10 @@ const App = () => {
 	const [usePreference, setUsePreference] = useState(1);
 	const [selectedPreset, setSelectedPreset] = useState("balanced");
 	const [forcedStep, setForcedStep] = useState<number | undefined>(undefined);
+	const [progress, setProgress] = useState<AlgorithmProgressEvent | null>(
+		null
+	);
+	const [progressHistory, setProgressHistory] = useState<number[]>([]);
 
 	const { toast } = useToast();
 
@@ -87,78 +95,50 @@ const App = () => {
 		setIsProcessing(true);
 		const commandId = crypto.randomUUID();
 		setCurrentCommand(commandId);
+		setProgress(null);
+		setProgressHistory([]);
+
+		let unlisten: UnlistenFn | undefined;
 
 		try {
+			// Live progress streamed by the sidecar while it runs
+			unlisten = await listen<AlgorithmProgressEvent>(
+				"algorithm-progress",
+				(event) => {
+					if (event.payload.commandId !== commandId) return;
+					setProgress(event.payload);
+					const best =
+						event.payload.best_fitness ?? event.payload.incumbent;
+					if (best !== undefined) {
+						setProgressHistory((prev) => [...prev, best]);
+					}
+				}
+			);
+
 			toast({
 				title: "Processing Data",
 				description: "Starting allocation process...",
 			});
 
-			// Prepare student data
-			const processedStudentData = studentData.map((student) => ({
-				"Student ID": parseInt(student.studentId),
-				"Course Name": student.course,
-				Grade: student.grade,
-				Preference: student.preference,
-			}));
-
-			// Create workbook for student data
-			const studentWs = XLSX.utils.json_to_sheet(processedStudentData);
-			const studentWb = XLSX.utils.book_new();
-			XLSX.utils.book_append_sheet(studentWb, studentWs, "Data");
-
-			// Convert to array buffer
-			const studentWbout = XLSX.write(studentWb, {
-				bookType: "xlsx",
-				type: "array",
-			});
-			const studentBuffer = new Uint8Array(studentWbout);
-
-			// Prepare course data
-			const processedCourseData = courseData.map((course) => ({
-				"Course Name": course.course,
-				"Number of Classes": course.classes,
-			}));
-
-			// Create workbook for course data
-			const courseWs = XLSX.utils.json_to_sheet(processedCourseData);
-			const courseWb = XLSX.utils.book_new();
-			XLSX.utils.book_append_sheet(courseWb, courseWs, "Data");
-
-			// Convert to array buffer
-			const courseWbout = XLSX.write(courseWb, {
-				bookType: "xlsx",
-				type: "array",
-			});
-			const courseBuffer = new Uint8Array(courseWbout);
-
-			// Ensure directory exists
-			await mkdir("", {
-				baseDir: BaseDirectory.AppConfig,
-				recursive: true,
-			});
-
-			// Write student data file
-			const studentFilename = "temp_student_data.xlsx";
-			await writeFile(studentFilename, studentBuffer, {
-				baseDir: BaseDirectory.AppConfig,
-			});
-
-			// Write course data file
-			const courseFilename = "temp_course_data.xlsx";
-			await writeFile(courseFilename, courseBuffer, {
-				baseDir: BaseDirectory.AppConfig,
-			});
+			// The tables go to the sidecar as JSON columns, without temporary files
+			const tutorsTable = {
+				"Student ID": studentData.map((student) =>
+					parseInt(student.studentId)
+				),
+				"Course Name": studentData.map((student) => student.course),
+				Grade: studentData.map((student) => student.grade),
+				Preference: studentData.map((student) => student.preference),
+			};
 
-			// Get the absolute file paths
-			const configDir = await appConfigDir();
-			const tutorsDataFilePath = await join(configDir, studentFilename);
-			const coursesDataFilePath = await join(configDir, courseFilename);
+			const coursesTable = {
+				"Course Name": courseData.map((course) => course.course),
+				"Number of Classes": courseData.map((course) => course.classes),
+			};
 
 			const params = {
 				algorithm: selectedAlgorithm,
-				tutorsDataFilePath,
-				coursesDataFilePath,
+				tutorsTable,
+				coursesTable,
 				commandId,
 				minGrade: algorithmParameters.minGrade,
 				preferenceFlag: algorithmParameters.usePreference,
@@ -173,10 +153,10 @@ const App = () => {
 			// console.log(result);
 
 			if (typeof result === "object" && result !== null) {
-				const typedResult = result as { data?: AllocationResult };
+				const typedResult = result as { data?: SidecarResult };
 				if (typedResult.data) {
 					setIsProcessing(false);
-					setAllocationResult(typedResult.data);
+					setAllocationResult(decodeResult(typedResult.data));
 					toast({
 						title: "Success",
 						description: "Allocation completed successfully!",
@@ -201,6 +181,7 @@ const App = () => {
 			}
 			return false;
 		} finally {
+			unlisten?.();
 			if (commandId === currentCommand) {
 				setIsProcessing(false);
 				setCurrentCommand(null);
@@ -239,11 +220,10 @@ const App = () => {
 			</p>
 			<p className="text-sm text-muted-foreground">
 				Using{" "}
-				{selectedAlgorithm === "integer_programming"
-					? "Integer Programming"
-					: "Genetic"}{" "}
+				{ALGORITHM_NAMES[selectedAlgorithm] ?? "Genetic"}{" "}
 				Algorithm
 			</p>
+			<AlgorithmProgress progress={progress} history={progressHistory} />
 		</div>
 	);
 
@@ -27,8 +27,23 @@ const ALGORITHM_DESCRIPTIONS = {
 		"Uses integer programming to find the optimal allocation that maximizes overall preferences and grades. Guarantees the best possible solution but may take longer for large datasets.",
 	genetic:
 		"Uses genetic algorithms to evolve good solutions over multiple generations. Can quickly find good (but not necessarily optimal) solutions, especially useful for large datasets.",
+	assignment:
+		"Solves the allocation as a weighted bipartite matching with the Hungarian method. Finds the same optimal allocation as integer programming, usually in milliseconds.",
+	portfolio:
+		"Runs a greedy heuristic, the genetic algorithm and integer programming at the same time under one deadline, and keeps the best allocation. Stops as soon as integer programming proves the optimum.",
 };
 
+export const ALGORITHM_NAMES: Record<string, string> = {
+	integer_programming: "Integer Programming",
+	genetic: "Genetic",
+	assignment: "Assignment",
+	portfolio: "Portfolio",
+};
+
+// Algorithms that run the genetic algorithm and take its preset
+export const usesGenetic = (algorithm: string) =>
+	algorithm === "genetic" || algorithm === "portfolio";
+
 type GeneticPreset = {
 	name: string;
 	description: string;
@@ -94,7 +109,7 @@ const AlgorithmStep = ({
 }: AlgorithmStepProps) => {
 	const handleAlgorithmChange = (value: string) => {
 		onAlgorithmChange(value);
-		if (value === "genetic") {
+		if (usesGenetic(value)) {
 			const preset = GENETIC_PRESETS[selectedPreset];
 			onParametersChange({
 				minGrade,
@@ -124,7 +139,7 @@ const AlgorithmStep = ({
 		// Allow empty input for better UX while typing
 		if (value === "") {
 			onMinGradeChange(0);
-			if (selectedAlgorithm === "genetic") {
+			if (usesGenetic(selectedAlgorithm)) {
 				const preset = GENETIC_PRESETS[selectedPreset];
 				onParametersChange({
 					minGrade: 0,
@@ -147,7 +162,7 @@ const AlgorithmStep = ({
 		// Only update if it's a valid number between 0 and 10
 		if (!isNaN(grade) && grade >= 0 && grade <= 10) {
 			onMinGradeChange(grade);
-			if (selectedAlgorithm === "genetic") {
+			if (usesGenetic(selectedAlgorithm)) {
 				const preset = GENETIC_PRESETS[selectedPreset];
 				onParametersChange({
 					minGrade: grade,
@@ -166,7 +181,7 @@ const AlgorithmStep = ({
 
 	const handleUsePreferenceChange = (checked: boolean) => {
 		onUsePreferenceChange(checked ? 1 : 0);
-		if (selectedAlgorithm === "genetic") {
+		if (usesGenetic(selectedAlgorithm)) {
 			const preset = GENETIC_PRESETS[selectedPreset];
 			onParametersChange({
 				minGrade,
@@ -219,6 +234,22 @@ const AlgorithmStep = ({
 											{ALGORITHM_DESCRIPTIONS.genetic}
 										</p>
 									</div>
+									<div>
+										<h4 className="text-sm font-semibold">
+											Assignment Algorithm
+										</h4>
+										<p className="text-sm">
+											{ALGORITHM_DESCRIPTIONS.assignment}
+										</p>
+									</div>
+									<div>
+										<h4 className="text-sm font-semibold">
+											Portfolio
+										</h4>
+										<p className="text-sm">
+											{ALGORITHM_DESCRIPTIONS.portfolio}
+										</p>
+									</div>
 								</div>
 							</HoverCardContent>
 						</HoverCard>
@@ -237,6 +268,12 @@ const AlgorithmStep = ({
 							<SelectItem value="genetic">
 								Genetic Algorithm
 							</SelectItem>
+							<SelectItem value="assignment">
+								Assignment Algorithm
+							</SelectItem>
+							<SelectItem value="portfolio">
+								Portfolio (best of all)
+							</SelectItem>
 						</SelectContent>
 					</Select>
 				</div>
@@ -303,7 +340,7 @@ const AlgorithmStep = ({
 								/>
 							</div>
 
-							{selectedAlgorithm === "genetic" && (
+							{usesGenetic(selectedAlgorithm) && (
 								<div className="space-y-3">
 									<div className="flex items-center gap-2">
 										<Label>Configuration Preset</Label>
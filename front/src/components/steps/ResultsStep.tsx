@@ -2,12 +2,15 @@ import { Card, CardHeader, CardTitle, CardContent } from "@/components/ui/card";
 import { DataTableColumn } from "@/components/widgets/data-table";
 import { DataTable } from "@/components/widgets/data-table";
 import { Separator } from "@/components/ui/separator";
+import { ALGORITHM_NAMES, usesGenetic } from "@/components/steps/AlgorithmStep";
 
 export interface AllocationMetrics {
 	number_classes_allocated: number;
 	total_classes: number;
 	execution_time: number;
-	average_grade: number;
+	average_grade: number | null;
+	// Engine whose allocation the portfolio returned
+	winner?: string;
 }
 
 export interface AllocationResult {
@@ -15,7 +18,7 @@ export interface AllocationResult {
 	results: AllocationRow[];
 }
 
-interface AllocationRow {
+export interface AllocationRow {
 	class: string;
 	student: string;
 	grade: number | string;
@@ -103,9 +106,8 @@ const ResultsStep = ({
 									Algorithm Used
 								</dt>
 								<dd className="text-2xl font-bold">
-									{selectedAlgorithm === "integer_programming"
-										? "Integer Programming"
-										: "Genetic"}
+									{ALGORITHM_NAMES[selectedAlgorithm] ??
+										"Genetic"}
 								</dd>
 							</div>
 							<div>
@@ -143,9 +145,20 @@ const ResultsStep = ({
 									Average Grade Allocated
 								</dt>
 								<dd className="text-2xl font-bold">
-									{metrics.average_grade.toFixed(2)}
+									{metrics.average_grade?.toFixed(2) ?? "-"}
 								</dd>
 							</div>
+							{metrics.winner && (
+								<div>
+									<dt className="text-sm font-medium text-muted-foreground">
+										Winning Engine
+									</dt>
+									<dd className="text-2xl font-bold">
+										{ALGORITHM_NAMES[metrics.winner] ??
+											"Greedy"}
+									</dd>
+								</div>
+							)}
 						</div>
 
 						{algorithmParameters && (
@@ -177,7 +190,7 @@ const ResultsStep = ({
 													: "No"}
 											</dd>
 										</div>
-										{selectedAlgorithm === "genetic" && (
+										{usesGenetic(selectedAlgorithm) && (
 											<>
 												<div>
 													<dt className="text-sm font-medium text-muted-foreground">
@@ -0,0 +1,90 @@
+export interface AlgorithmProgressEvent {
+	commandId: string;
+	elapsed: number;
+	phase?: string;
+	island?: number;
+	generation?: number;
+	best_fitness?: number;
+	mean_fitness?: number;
+	stop_reason?: string;
+	incumbent?: number;
+	objective?: number;
+	variables?: number;
+	constraints?: number;
+}
+
+interface AlgorithmProgressProps {
+	progress: AlgorithmProgressEvent | null;
+	history: number[];
+}
+
+const PHASE_LABELS: Record<string, string> = {
+	load: "Loading data",
+	preprocess: "Preparing data",
+	decompose: "Splitting into independent groups",
+	components: "Solving independent groups",
+	evolve: "Evolving population",
+	build: "Building model",
+	solve: "Solving model",
+	polish: "Improving schedule with local search",
+	postprocess: "Writing results",
+	scenarios: "Comparing scenarios",
+	race: "Racing solvers",
+};
+
+const ConvergenceChart = ({ history }: { history: number[] }) => {
+	if (history.length < 2) return null;
+
+	const width = 240;
+	const height = 60;
+	const min = Math.min(...history);
+	const max = Math.max(...history);
+	const range = max - min || 1;
+	const points = history
+		.map(
+			(value, index) =>
+				`${(index / (history.length - 1)) * width},${
+					height - ((value - min) / range) * height
+				}`
+		)
+		.join(" ");
+
+	return (
+		<svg width={width} height={height} className="text-primary">
+			<polyline
+				points={points}
+				fill="none"
+				stroke="currentColor"
+				strokeWidth={2}
+			/>
+		</svg>
+	);
+};
+
+const AlgorithmProgress = ({ progress, history }: AlgorithmProgressProps) => {
+	if (!progress) return null;
+
+	return (
+		<div className="flex flex-col items-center space-y-2 text-sm text-muted-foreground">
+			{progress.phase && (
+				<p>{PHASE_LABELS[progress.phase] ?? progress.phase}</p>
+			)}
+			{progress.generation !== undefined && (
+				<p>
+					Generation {progress.generation}
+					{progress.best_fitness !== undefined &&
+						` · best ${progress.best_fitness.toFixed(2)}`}
+					{progress.mean_fitness !== undefined &&
+						` · mean ${progress.mean_fitness.toFixed(2)}`}
+				</p>
+			)}
+			{progress.incumbent !== undefined && (
+				<p>Best solution so far: {progress.incumbent.toFixed(2)}</p>
+			)}
+			<ConvergenceChart history={history} />
+			<p>{progress.elapsed.toFixed(1)} s elapsed</p>
+		</div>
+	);
+};
+
+export default AlgorithmProgress;
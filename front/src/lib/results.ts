@@ -0,0 +1,85 @@
+import type {
+	AllocationMetrics,
+	AllocationResult,
+	AllocationRow,
+} from "@/components/steps/ResultsStep";
+
+// Sidecar responses list each tutor once, with preferences by course, and refer to
+// tutors by index; "columnar" sends each table as { column: values[] }
+type TutorEntry = { student: string; preference: Record<string, number> };
+type ResultEntry = { class: string; tutor: number | null; grade: number | null };
+
+type Table<T> = T[] | { [K in keyof T]: T[K][] };
+
+export interface SidecarResult {
+	metrics: AllocationMetrics;
+	format?: "compact" | "columnar";
+	tutors?: Table<TutorEntry>;
+	results: Table<ResultEntry> | AllocationRow[];
+}
+
+const toRows = <T,>(table: Table<T>): T[] => {
+	if (Array.isArray(table)) return table;
+	const columns = Object.entries(table as Record<string, unknown[]>);
+	const length = columns.length > 0 ? columns[0][1].length : 0;
+	return Array.from(
+		{ length },
+		(_, i) =>
+			Object.fromEntries(
+				columns.map(([key, values]) => [key, values[i]])
+			) as T
+	);
+};
+
+// Classes are named "<course> - Class <n>" by the sidecars
+const courseOf = (className: string): string => {
+	const index = className.lastIndexOf(" - Class ");
+	return index === -1 ? className : className.slice(0, index);
+};
+
+export const decodeResult = (data: SidecarResult): AllocationResult => {
+	// Without "format" the sidecar answered in the legacy row shape
+	if (!data.format || !data.tutors) {
+		return {
+			metrics: data.metrics,
+			results: data.results as AllocationRow[],
+		};
+	}
+
+	const tutors = toRows(data.tutors);
+	const entries = toRows(data.results as Table<ResultEntry>);
+
+	const classesByCourse = new Map<string, string[]>();
+	for (const entry of entries) {
+		const course = courseOf(entry.class);
+		const classes = classesByCourse.get(course) ?? [];
+		classes.push(entry.class);
+		classesByCourse.set(course, classes);
+	}
+
+	const results: AllocationRow[] = entries.map((entry) => {
+		if (entry.tutor === null) {
+			return {
+				class: entry.class,
+				student: "No tutor",
+				grade: "No preference",
+				preference: {},
+			};
+		}
+		const tutor = tutors[entry.tutor];
+		const preference: Record<string, number> = {};
+		for (const [course, score] of Object.entries(tutor.preference)) {
+			for (const className of classesByCourse.get(course) ?? []) {
+				preference[className] = score;
+			}
+		}
+		return {
+			class: entry.class,
+			student: tutor.student,
+			grade: entry.grade ?? "No preference",
+			preference,
+		};
+	});
+
+	return { metrics: data.metrics, results };
+};